@@ -1,7 +1,14 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from uaaccess.app import main
+import multiprocessing
+import sys
 
 if __name__ == "__main__":
+    # Plug-in host processes are spawned from this entry point, including in packaged builds.
+    multiprocessing.freeze_support()
+    from uaaccess.cli import is_cli_invocation
+    if is_cli_invocation(sys.argv[1:]):
+        from uaaccess.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    from uaaccess.app import main
     main().main_loop()
-
@@ -1,69 +1,43 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import asyncio
-import cProfile
 import json
 import os
 import sys
 import time
 import traceback
 import zipfile
-from ipaddress import IPv4Address, IPv6Address
-from typing import Optional, Union
+from typing import Optional
 
-import aiofiles
-import clipboard
 import toga
 from blinker import signal
-from github import Github, GithubException
-from packaging import version
-from packaging.version import InvalidVersion
 from toga.style import Pack
 from toga.style.pack import COLUMN
 
-from . import events, network, speech
+from . import discovery, events, network, plugin_host, profiling, speech, tree, watchdog
 from .connection_requester import ConnectionRequester
-from .dialogs import PreampEffectsDialog, SendsDialog, SendsType
-
-if sys.platform == "win32":
-	import io
-	from ctypes import byref, c_int32, c_ulong, create_unicode_buffer
-
-	from win32more.Windows.Win32.Foundation import (
-		ERROR_NO_MORE_ITEMS,
-		ERROR_SUCCESS,
-	)
-	from win32more.Windows.Win32.System.ApplicationInstallationAndServicing import (
-		INSTALLPROPERTY_INSTALLEDPRODUCTNAME,
-		INSTALLSTATE_DEFAULT,
-		MSIINSTALLCONTEXT_MACHINE,
-		MSIINSTALLCONTEXT_USERMANAGED,
-		MSIINSTALLCONTEXT_USERUNMANAGED,
-		MsiEnumProductsEx,
-		MsiGetProductInfoEx,
-		MsiQueryProductState,
-	)
-else:
-	import plistlib
-import socket
-
-from .updater_dialog import UpdaterDialog
+from .descriptors import InvalidValueError
+from .dialogs import MetricsDialog, PreampEffectsDialog, ProfilingDialog, QuickJumpDialog, ScenesDialog, SendsDialog, SendsMatrixDialog, SendsType
+from .profiling import ProfileScope
+# Anything only needed by the update check, the crash handler or the effects editor is imported where it is first
+# used rather than here, to keep those imports off the startup path. tests/test_import_time.py enforces this.
 
 
 class UAAccess(toga.App):
 	def startup(self):
 		self.loop.set_exception_handler(self.handle_exception)
-		if sys.executable.find("python") != -1:
-			self.profiler = cProfile.Profile()
-			self.profiler.enable()
+		watchdog.instance = watchdog.LoopWatchdog()
+		watchdog.instance.start(self.loop)
 		speech.init()
 		self.loop.create_task(self.do_update_check())
 		self.ui_required_input_props = ["FaderLevel", "IOType", "Mute", "RecordPreEffects", "Solo"]
 		self.ui_required_output_props = ["MixToMono", "MixInSource", "Pad", "AltMonTrim", "AltMonEnabled", "Mute", "CRMonitorLevel", "MirrorsToDigital", "DimOn"]
 		self.ui_required_aux_props = ["Gain", "Mute", "FaderLevel", "MixToMono", "Isolate", "SendPostFader"]
 		self.ui_required_preamp_props = ["Gain", "48V", "LowCut", "Pad", "Phase"]
+		self.currently_selected_device = 0
 		self.currently_selected_input, self.currently_selected_output, self.currently_selected_aux = 0, 0, 0
 		self.on_exit = self.handle_exit
+		self.instance = None
 		self.main_window = toga.MainWindow(title=f"{self.formal_name} [Loading]")
 		self.input_details_box = toga.Box()
 		self.output_details_box = toga.Box()
@@ -73,7 +47,15 @@ class UAAccess(toga.App):
 		self.main_window.content = self.main_container
 		self.loop.create_task(self.try_connecting_locally())
 		self.main_window.show()
+		self.commands.add(toga.Command(self.connect_to_another_console, "Connect to another console...", group=toga.Group("Consoles")))
+		self.commands.add(toga.Command(self.disconnect_console, "Disconnect from this console", group=toga.Group("Consoles")))
+		self.commands.add(toga.Command(self.open_quick_jump, "Quick jump...", shortcut=toga.Key.MOD_1 + "j", group=toga.Group("Mixer")))
+		self.commands.add(toga.Command(self.open_sends_matrix, "Sends matrix", group=toga.Group("Mixer")))
+		self.commands.add(toga.Command(self.open_scenes, "Capture and recall scenes...", group=toga.Group("Scenes")))
 		self.commands.add(toga.Command(self.export_tree, "Export schema tree", group=toga.Group("Debugging")))
+		self.commands.add(toga.Command(self.start_profiling, "Start profiling capture...", group=toga.Group("Debugging")))
+		self.commands.add(toga.Command(self.stop_profiling, "Stop profiling capture", group=toga.Group("Debugging")))
+		self.commands.add(toga.Command(self.show_metrics, "Show performance metrics", group=toga.Group("Debugging")))
 		if sys.executable.find("python") != -1:
 			self.commands.add(toga.Command(self.enable_packet_logging, "Enable logging of packets", group=toga.Group("Debugging")))
 		self.log_file = None
@@ -82,7 +64,7 @@ class UAAccess(toga.App):
 		self.exit()
 
 	def build_input_widgets(self, inp: int) -> Optional[toga.Box]:
-		input = self.instance.get_input(0, inp)
+		input = self.instance.get_input(self.currently_selected_device, inp)
 		if "Active" in input["properties"] and not input["properties"]["Active"]["value"]:
 			return None
 		if input is None:
@@ -93,7 +75,7 @@ class UAAccess(toga.App):
 		for name, prop in props.items():
 			if name not in self.ui_required_input_props or "value" not in prop:
 				continue
-			path = f"/devices/0/inputs/{inp}/{name}/value"
+			path = f"/devices/{self.currently_selected_device}/inputs/{inp}/{name}/value"
 			match prop["type"]:
 				case "bool":
 					toggle = toga.Switch(f"{inputname} {self.instance.prop_display_name(name)}", id=path, value=prop.get("value", False), enabled = not prop["readonly"] if "readonly" in prop else True, on_change=self.on_prop_bool_toggle)
@@ -125,7 +107,7 @@ class UAAccess(toga.App):
 						edit = toga.NumberInput(id=path, value=prop.get("value", None), readonly = prop.get("readonly", False), on_change=self.on_prop_int_change, min=prop.get("min", None), max=prop.get("max", None), step=1.0)
 					box.add(label)
 					box.add(edit)
-		preamp = self.instance.get_preamp(0, inp, 0)
+		preamp = self.instance.get_preamp(self.currently_selected_device, inp, 0)
 		if preamp is None:
 			box.add(toga.Button("&Sends", on_press=self.open_input_sends))
 			return box
@@ -133,7 +115,7 @@ class UAAccess(toga.App):
 		for name, prop in props.items():
 			if name not in self.ui_required_preamp_props:
 				continue
-			path = f"/devices/0/inputs/{inp}/preamps/0/{name}/value"
+			path = f"/devices/{self.currently_selected_device}/inputs/{inp}/preamps/0/{name}/value"
 			match prop["type"]:
 				case "bool":
 					toggle = toga.Switch(f"{inputname} Preamp {self.instance.prop_display_name(name)}", id=path, value=prop.get("value", False), enabled = not prop["readonly"] if "readonly" in prop else True, on_change=self.on_prop_bool_toggle)
@@ -171,7 +153,7 @@ class UAAccess(toga.App):
 		return box
 
 	def build_output_widgets(self, outp: int) -> Optional[toga.Box]:
-		output = self.instance.get_output(0, outp)
+		output = self.instance.get_output(self.currently_selected_device, outp)
 		if output is None:
 			return None
 		box = toga.Box(style=Pack(direction = COLUMN, padding=5))
@@ -180,7 +162,7 @@ class UAAccess(toga.App):
 		for name, prop in props.items():
 			if name not in self.ui_required_output_props or "value" not in prop:
 				continue
-			path = f"/devices/0/outputs/{outp}/{name}/value"
+			path = f"/devices/{self.currently_selected_device}/outputs/{outp}/{name}/value"
 			match prop["type"]:
 				case "bool":
 					toggle = toga.Switch(f"{outputname} {self.instance.prop_display_name(name)}", id=path, value=prop.get("value", False), enabled = not prop["readonly"] if "readonly" in prop else True, on_change=self.on_prop_bool_toggle)
@@ -215,7 +197,7 @@ class UAAccess(toga.App):
 		return box
 
 	def build_aux_widgets(self, auxp: int) -> Optional[toga.Box]:
-		aux = self.instance.get_aux(0, auxp)
+		aux = self.instance.get_aux(self.currently_selected_device, auxp)
 		if "Active" in aux["properties"] and not aux["properties"]["Active"]["value"]:
 			return None
 		if aux is None:
@@ -226,7 +208,7 @@ class UAAccess(toga.App):
 		for name, prop in props.items():
 			if name not in self.ui_required_aux_props or "value" not in prop:
 				continue
-			path = f"/devices/0/auxs/{auxp}/{name}/value"
+			path = f"/devices/{self.currently_selected_device}/auxs/{auxp}/{name}/value"
 			match prop["type"]:
 				case "bool":
 					toggle = toga.Switch(f"{auxname} {self.instance.prop_display_name(name)}", id=path, value=prop.get("value", False), enabled = not prop["readonly"] if "readonly" in prop else True, on_change=self.on_prop_bool_toggle)
@@ -262,11 +244,20 @@ class UAAccess(toga.App):
 		return box
 
 	async def try_connecting_locally(self):
+		discovery.instance = discovery.DiscoveryCache(self.paths.cache / "discovery.json")
+		# This machine and every console used recently are probed at once and the first to answer wins, so a console
+		# that has gone away costs nothing and startup never waits on a TCP connect timeout.
+		candidates = {("127.0.0.1", network.DEFAULT_PORT): None}
+		for console in discovery.instance.recent():
+			candidates.setdefault((console.host, console.port), None)
 		try:
-			network.instance = network.NetworkManager()
+			found = await discovery.first_responder(candidates)
+			if found is None:
+				raise ConnectionError("No console answered")
+			await network.registry.connect(self.connection_name(found.host, found.port), found.host, found.port)
+			discovery.instance.remember(found.host, found.port, found.name)
 			self.instance = network.instance
-			await self.instance.preload_tree("127.0.0.1")
-			await self.initialize()
+			await profiling.scoped(ProfileScope.UI, self.initialize())
 		except Exception:
 			if await self.main_window.dialog(toga.QuestionDialog("Alert", "It does not appear that the UA console is running on this system. Would you like to connect to a remote UA console?")):
 				try:
@@ -278,20 +269,118 @@ class UAAccess(toga.App):
 			else:
 				self.exit()
 
-	async def handle_connection_selection(self, ipaddr: Union[IPv4Address, IPv6Address]):
+	def connection_name(self, host: str, port: int) -> str:
+		return host if port == network.DEFAULT_PORT else f"{host}:{port}"
+
+	async def handle_connection_selection(self, host: str, port: int = network.DEFAULT_PORT):
+		first = len(network.registry) == 0
+		name = self.connection_name(host, port)
 		try:
-			network.instance = network.NetworkManager()
-			self.instance = network.instance
-			await self.instance.preload_tree(ipaddr)
-			await self.initialize()
+			await network.registry.connect(name, host, port)
 		except Exception as e:
 			await self.main_window.dialog(toga.ErrorDialog("Error", f"No connection to the remote UA console could be established. Reason: {str(e)}"))
-			self.exit()
+			if first:
+				self.exit()
+			return
+		discovery.instance.remember(host, port)
+		if first:
+			self.instance = network.instance
+			await profiling.scoped(ProfileScope.UI, self.initialize())
+		else:
+			self.refresh_console_switcher()
+			speech.speak(f"Connected to {self.console_label(network.registry.get(name))}")
+
+	def connect_to_another_console(self, command, **kwargs):
+		self.connection_dialog = ConnectionRequester(self.handle_connection_selection)
+		self.connection_dialog.show()
+
+	async def disconnect_console(self, command, **kwargs):
+		if self.instance is None:
+			await self.main_window.dialog(toga.ErrorDialog("Error", "UAAccess is not connected to a device!"))
+			return
+		if len(network.registry) == 1:
+			await self.main_window.dialog(toga.ErrorDialog("Error", "This is the only connected console. Connect to another console first."))
+			return
+		name = self.instance.name
+		network.registry.remove(name)
+		self.switch_console(network.registry.active)
+		speech.speak(f"Disconnected from {name}")
+
+	def console_label(self, manager: network.NetworkManager) -> str:
+		devices = manager.device_ids()
+		return f"{manager.get(f'/devices/{devices[0]}/DeviceName/value') if devices else 'No devices'} ({manager.name})"
+
+	def first_device(self) -> int:
+		# preload_tree loads the first device up front; the others are loaded when they are selected.
+		devices = self.instance.device_ids()
+		return int(devices[0]) if devices else 0
+
+	def device_label(self, device: str) -> str:
+		return self.instance.get(f"/devices/{device}/DeviceName/value") or f"Device {int(device) + 1}"
+
+	def refresh_device_switcher(self):
+		handler = self.ui_devices.on_change
+		self.ui_devices.on_change = None
+		self.ui_devices.items = [{"label": self.device_label(device), "device_id": device} for device in self.instance.device_ids()]
+		self.ui_devices.value = next(item for item in self.ui_devices.items if item.device_id == str(self.currently_selected_device))
+		self.ui_devices.on_change = handler
+
+	async def on_device_selected(self, widget, *args, **kwargs):
+		if widget.value is None or widget.value.device_id == str(self.currently_selected_device):
+			return
+		device = widget.value.device_id
+		if not self.instance.is_device_loaded(device):
+			speech.speak(f"Loading {widget.value.label}")
+		await self.instance.load_device(device)
+		self.currently_selected_device = int(device)
+		self.currently_selected_input, self.currently_selected_output, self.currently_selected_aux = 0, 0, 0
+		with profiling.scope(ProfileScope.UI):
+			self.build_console_ui()
+
+	def refresh_console_switcher(self):
+		handler = self.ui_consoles.on_change
+		self.ui_consoles.on_change = None
+		self.ui_consoles.items = [{"label": self.console_label(manager), "name": manager.name} for manager in network.registry]
+		self.ui_consoles.value = next(item for item in self.ui_consoles.items if item.name == network.registry.active)
+		self.ui_consoles.on_change = handler
+
+	def on_console_selected(self, widget, *args, **kwargs):
+		if widget.value is None or widget.value.name == network.registry.active:
+			return
+		self.switch_console(widget.value.name)
 
+	def switch_console(self, name: str):
+		network.registry.activate(name)
+		self.instance = network.instance
+		self.currently_selected_device = self.first_device()
+		self.currently_selected_input, self.currently_selected_output, self.currently_selected_aux = 0, 0, 0
+		with profiling.scope(ProfileScope.UI):
+			self.build_console_ui()
 
 	async def initialize(self):
-		self.main_window.title = f"{self.formal_name} [{self.instance.get('/devices/0/DeviceName/value')}]"
 		events.register_events()
+		self.currently_selected_device = self.first_device()
+		self.ui_consoles_label = toga.Label("Console", style=Pack(padding=5))
+		self.ui_consoles = toga.Selection(style=Pack(padding=5), on_change=self.on_console_selected, accessor="label")
+		self.ui_devices_label = toga.Label("Device", style=Pack(padding=5))
+		self.ui_devices = toga.Selection(style=Pack(padding=5), on_change=self.on_device_selected, accessor="label")
+		self.build_console_ui()
+		for prop in self.ui_required_input_props:
+			signal(prop).connect(self.on_ui_required_input_prop_changed)
+		for prop in self.ui_required_preamp_props:
+			signal(prop).connect(self.on_ui_required_input_preamp_prop_changed)
+		for prop in self.ui_required_output_props:
+			signal(prop).connect(self.on_ui_required_output_prop_changed)
+		for prop in self.ui_required_aux_props:
+			signal(prop).connect(self.on_ui_required_aux_prop_changed)
+
+	def build_console_ui(self):
+		"""(Re)builds the main window for the active console."""
+		self.main_window.title = f"{self.formal_name} [{self.device_label(str(self.currently_selected_device))}]"
+		self.refresh_console_switcher()
+		self.refresh_device_switcher()
+		self.main_container.clear()
+		self.tab_container = toga.OptionContainer()
 		self.ui_inputs_label = toga.Label("Inputs", style=Pack(padding=5))
 		self.ui_inputs_list = toga.Selection(style=Pack(padding=5), on_change=self.on_input_selected, accessor="name")
 		self.ui_inputs_box = toga.Box()
@@ -319,17 +408,15 @@ class UAAccess(toga.App):
 		self.aux_details_box = toga.Box()
 		self.ui_auxs_box.add(self.aux_details_box)
 		self.tab_container.content.append("AUXs", self.ui_auxs_box)
+		self.main_container.add(self.ui_consoles_label)
+		self.main_container.add(self.ui_consoles)
+		self.main_container.add(self.ui_devices_label)
+		self.main_container.add(self.ui_devices)
 		self.main_container.add(self.tab_container)
-		for prop in self.ui_required_input_props:
-			signal(prop).connect(self.on_ui_required_input_prop_changed)
-		for prop in self.ui_required_preamp_props:
-			signal(prop).connect(self.on_ui_required_input_preamp_prop_changed)
-		for prop in self.ui_required_output_props:
-			signal(prop).connect(self.on_ui_required_output_prop_changed)
-		for prop in self.ui_required_aux_props:
-			signal(prop).connect(self.on_ui_required_aux_prop_changed)
 
 	async def on_ui_required_input_prop_changed(self, sender, **kwargs):
+		if sender is not self.instance:
+			return
 		path = kwargs["path"]
 		data = kwargs["data"]
 		widget = None
@@ -347,6 +434,8 @@ class UAAccess(toga.App):
 		widget.on_change = handler
 
 	async def on_ui_required_input_preamp_prop_changed(self, sender, **kwargs):
+		if sender is not self.instance:
+			return
 		path = kwargs["path"]
 		data = kwargs["data"]
 		widget = None
@@ -364,6 +453,8 @@ class UAAccess(toga.App):
 		widget.on_change = handler
 
 	async def on_ui_required_output_prop_changed(self, sender, **kwargs):
+		if sender is not self.instance:
+			return
 		path = kwargs["path"]
 		data = kwargs["data"]
 		widget = None
@@ -381,6 +472,8 @@ class UAAccess(toga.App):
 		widget.on_change = handler
 
 	async def on_ui_required_aux_prop_changed(self, sender, **kwargs):
+		if sender is not self.instance:
+			return
 		path = kwargs["path"]
 		data = kwargs["data"]
 		widget = None
@@ -398,7 +491,7 @@ class UAAccess(toga.App):
 		widget.on_change = handler
 
 	def build_inputs_list(self):
-		inputs = self.instance.get_inputs(0)
+		inputs = self.instance.get_inputs(self.currently_selected_device)
 		data = []
 		for id, input in inputs.items():
 			if "Active" in input["properties"] and not input["properties"]["Active"]["value"]:
@@ -408,7 +501,7 @@ class UAAccess(toga.App):
 		self.ui_inputs_list.value = self.ui_inputs_list.items[0]
 
 	def build_outputs_list(self):
-		outputs = self.instance.get_outputs(0)
+		outputs = self.instance.get_outputs(self.currently_selected_device)
 		data = []
 		for id, output in outputs.items():
 			data.append({"name": output["properties"]["Name"]["value"], "output_id": id})
@@ -416,7 +509,7 @@ class UAAccess(toga.App):
 		self.ui_outputs_list.value = self.ui_outputs_list.items[0]
 
 	def build_auxs_list(self):
-		auxs = self.instance.get_auxs(0)
+		auxs = self.instance.get_auxs(self.currently_selected_device)
 		data = []
 		for id, aux in auxs.items():
 			if "Active" in aux["properties"] and not aux["properties"]["Active"]["value"]:
@@ -425,30 +518,37 @@ class UAAccess(toga.App):
 		self.ui_auxs_list.items = data
 		self.ui_auxs_list.value = self.ui_auxs_list.items[0]
 
+	async def set_from_widget(self, widget):
+		try:
+			await self.instance.set_value(widget.id, widget.value)
+		except InvalidValueError as e:
+			speech.speak(str(e))
+
 	async def on_prop_bool_toggle(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {str(widget.value).lower()}")
+		await self.set_from_widget(widget)
 
 	async def on_prop_string_enum_change(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {widget.value}")
+		await self.set_from_widget(widget)
 
 	async def on_prop_string_change(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {widget.value}")
+		await self.set_from_widget(widget)
 
 	async def on_prop_int_enum_change(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {widget.value}")
+		await self.set_from_widget(widget)
 
 	async def on_prop_int_change(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {widget.value}")
+		await self.set_from_widget(widget)
 
 	async def on_prop_float_change(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {widget.value}")
+		await self.set_from_widget(widget)
 
 	def on_input_selected(self, widget, *args, **kwargs):
 		if widget.value is None:
 			return
 		self.input_details_box.clear()
 		self.currently_selected_input = widget.value.input_id
-		box = self.build_input_widgets(int(widget.value.input_id))
+		with profiling.scope(ProfileScope.UI):
+			box = self.build_input_widgets(int(widget.value.input_id))
 		if box is None:
 			return
 		self.input_details_box.add(box)
@@ -458,7 +558,8 @@ class UAAccess(toga.App):
 			return
 		self.output_details_box.clear()
 		self.currently_selected_output = widget.value.output_id
-		box = self.build_output_widgets(int(widget.value.output_id))
+		with profiling.scope(ProfileScope.UI):
+			box = self.build_output_widgets(int(widget.value.output_id))
 		if box is None:
 			return
 		self.output_details_box.add(box)
@@ -468,23 +569,88 @@ class UAAccess(toga.App):
 			return
 		self.aux_details_box.clear()
 		self.currently_selected_aux = widget.value.aux_id
-		box = self.build_aux_widgets(int(widget.value.aux_id))
+		with profiling.scope(ProfileScope.UI):
+			box = self.build_aux_widgets(int(widget.value.aux_id))
 		if box is None:
 			return
 		self.aux_details_box.add(box)
 
 	def open_input_sends(self, widget, *args, **kwargs):
-		dialog = SendsDialog(0, SendsType.INPUT, self.currently_selected_input)
-		dialog.build()
+		with profiling.scope(ProfileScope.UI):
+			dialog = SendsDialog(self.currently_selected_device, SendsType.INPUT, self.currently_selected_input)
+			dialog.build()
 		dialog.show()
 
 	def open_aux_sends(self, widget, *args, **kwargs):
-		dialog = SendsDialog(0, SendsType.AUX, self.currently_selected_aux)
-		dialog.build()
+		with profiling.scope(ProfileScope.UI):
+			dialog = SendsDialog(self.currently_selected_device, SendsType.AUX, self.currently_selected_aux)
+			dialog.build()
+		dialog.show()
+
+	async def open_quick_jump(self, command, **kwargs):
+		if self.instance is None:
+			await self.main_window.dialog(toga.ErrorDialog("Error", "UAAccess is not connected to a device!"))
+			return
+		with profiling.scope(ProfileScope.UI):
+			dialog = QuickJumpDialog(self.jump_to)
+		dialog.show()
+
+	async def jump_to(self, entry):
+		"""Shows what a Quick jump result refers to: selects its device, tab and channel and focuses its control."""
+		parts = entry.path.strip('/').split('/')
+		if parts[0] == "plugins":
+			status = self.instance.get(f"{entry.path}/Status/value")
+			speech.speak(f"{entry.label}{f', {status}' if status else ''}")
+			return
+		device, section, channel = int(parts[1]), parts[2], parts[3]
+		if device != self.currently_selected_device:
+			await self.instance.load_device(device)
+			self.currently_selected_device = device
+			with profiling.scope(ProfileScope.UI):
+				self.build_console_ui()
+		tabs = {"inputs": (0, self.ui_inputs_list, "input_id", self.input_details_box), "outputs": (1, self.ui_outputs_list, "output_id", self.output_details_box), "auxs": (2, self.ui_auxs_list, "aux_id", self.aux_details_box)}
+		tab, channels, id_field, details = tabs[section]
+		self.tab_container.current_tab = tab
+		item = next((item for item in channels.items if getattr(item, id_field) == channel), None)
+		if item is None:
+			speech.speak(f"{entry.label} is not active")
+			return
+		# Setting the value runs the selection handler, which builds the channel's controls.
+		channels.value = item
+		if entry.kind == "send":
+			if section == "inputs":
+				self.open_input_sends(None)
+			elif section == "auxs":
+				self.open_aux_sends(None)
+			return
+		for box in details.children:
+			for widget in box.children:
+				if widget.id == entry.path:
+					widget.focus()
+					return
+		value = self.instance.get(entry.path) if entry.path.endswith("/value") else None
+		if value is not None:
+			speech.speak(f"{entry.label} {value}")
+		channels.focus()
+
+	async def open_sends_matrix(self, command, **kwargs):
+		if self.instance is None:
+			await self.main_window.dialog(toga.ErrorDialog("Error", "UAAccess is not connected to a device!"))
+			return
+		with profiling.scope(ProfileScope.UI):
+			dialog = SendsMatrixDialog(self.currently_selected_device)
+		dialog.show()
+
+	async def open_scenes(self, command, **kwargs):
+		if self.instance is None:
+			await self.main_window.dialog(toga.ErrorDialog("Error", "UAAccess is not connected to a device!"))
+			return
+		dialog = ScenesDialog(self.currently_selected_device)
 		dialog.show()
 
 	def open_preamp_effects_dialog(self, widget, *args, **kwargs):
-		dialog = PreampEffectsDialog(0, self.currently_selected_input)
+		with profiling.scope(ProfileScope.UI):
+			dialog = PreampEffectsDialog(self.currently_selected_device, self.currently_selected_input)
 		dialog.show()
 
 	async def handle_exit(self, app, **kwargs):
@@ -492,9 +658,10 @@ class UAAccess(toga.App):
 		if not self.is_bundled and self.log_file is not None and not self.log_file.closed:
 			await self.log_file.close()
 			signal("NewPacket").disconnect(self.on_new_packet)
-		if not self.is_bundled and self.profiler is not None:
-			self.profiler.disable()
-			self.profiler.print_stats()
+		profiling.stop()
+		watchdog.instance.stop()
+		if plugin_host.pool is not None:
+			plugin_host.pool.stop()
 		return True
 
 	async def export_tree(self, command, **kwargs):
@@ -505,18 +672,44 @@ class UAAccess(toga.App):
 		if fname is None:
 			await self.main_window.dialog(toga.ErrorDialog("Error", "Please specify a file name for schema export."))
 			return
+		# Updates keep arriving while the zip is written; the snapshot keeps the export consistent.
+		data = self.instance.snapshot().data
 		with zipfile.ZipFile(fname, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9, allowZip64=True) as zipf:
-			await self.add_properties_to_zip(zipf, self.instance.tree["data"]["properties"], '')
-			await self.add_commands_to_zip(zipf, self.instance.tree["data"]["commands"], '')
-			if "children" in self.instance.tree["data"]:
-				await self.recurse_children(zipf, self.instance.tree["data"]["children"], '')
+			await self.add_properties_to_zip(zipf, data["properties"], '')
+			await self.add_commands_to_zip(zipf, data["commands"], '')
+			if "children" in data:
+				await self.recurse_children(zipf, data["children"], '')
 			await self.main_window.dialog(toga.InfoDialog("Done", f"Schema exported to {fname}. Please visit https://github.com/uaaccess/uaaccess/issues, click 'New issue', select 'Schema Dump', enter all requested details, and attach the dump, then click submit."))
 
+	def start_profiling(self, command, **kwargs):
+		dialog = ProfilingDialog()
+		dialog.show()
+
+	async def stop_profiling(self, command, **kwargs):
+		capture = profiling.stop()
+		if capture is None:
+			await self.main_window.dialog(toga.ErrorDialog("Error", "No profiling capture is running."))
+			return
+		speech.speak(f"Profiling stopped after {capture.stopped_at - capture.started_at:.1F} seconds")
+		extension = capture.format.value
+		fname = await self.main_window.dialog(toga.SaveFileDialog("Specify profile file name", f"uaaccess.{extension}", [extension]))
+		if fname is None:
+			return
+		try:
+			capture.save(fname)
+		except OSError as e:
+			await self.main_window.dialog(toga.ErrorDialog("Error", f"Could not save the profile: {e!s}"))
+
+	def show_metrics(self, command, **kwargs):
+		dialog = MetricsDialog()
+		dialog.show()
+
 	async def enable_packet_logging(self, command, **kwargs):
 		fname = await self.main_window.dialog(toga.SaveFileDialog("Specify packet log file", "packets.log", ["log", "txt"]))
 		if fname is None:
 			await self.main_window.dialog(self.ErrorDialog("Error", "Please specify a file name for schema export."))
 			return
+		import aiofiles
 		try:
 			if self.log_file is not None and not self.log_file.closed:
 				await self.log_file.close()
@@ -537,11 +730,11 @@ class UAAccess(toga.App):
 			self.instance.packet_log.clear()
 
 	async def add_properties_to_zip(self, zipf, properties, path):
-		json_data = json.dumps(properties, indent=4)
+		json_data = json.dumps(properties, indent=4, default=tree.to_json)
 		zipf.writestr(os.path.join(path, "properties.json"), json_data)
 
 	async def add_commands_to_zip(self, zipf, properties, path):
-		json_data = json.dumps(properties, indent=4)
+		json_data = json.dumps(properties, indent=4, default=tree.to_json)
 		zipf.writestr(os.path.join(path, "commands.json"), json_data)
 
 	async def recurse_children(self, zipf, children, base_path):
@@ -568,22 +761,30 @@ class UAAccess(toga.App):
 			ctx.append(f"{key}: {value}")
 		ctx.append("Traceback:")
 		ctx.append(''.join(traceback.format_exception(context["exception"])))
+		import clipboard
 		clipboard.copy(os.linesep.join(ctx))
 		self.exit()
 
-	async def is_internet_available(self) -> bool:
-		try:
-			reader, writer = await asyncio.wait_for(asyncio.open_connection("google.com", 80, limit=2**32), 0.3)
-			_ = await reader.read()
-			writer.close()
-			await writer.wait_closed()
-			return True
-		except (socket.error, TimeoutError):
-			return False
-
 	async def is_installed(self)->bool:
 		is_installed = False
 		if sys.platform == "win32":
+			import io
+			from ctypes import byref, c_int32, c_ulong, create_unicode_buffer
+
+			from win32more.Windows.Win32.Foundation import (
+				ERROR_NO_MORE_ITEMS,
+				ERROR_SUCCESS,
+			)
+			from win32more.Windows.Win32.System.ApplicationInstallationAndServicing import (
+				INSTALLPROPERTY_INSTALLEDPRODUCTNAME,
+				INSTALLSTATE_DEFAULT,
+				MSIINSTALLCONTEXT_MACHINE,
+				MSIINSTALLCONTEXT_USERMANAGED,
+				MSIINSTALLCONTEXT_USERUNMANAGED,
+				MsiEnumProductsEx,
+				MsiGetProductInfoEx,
+				MsiQueryProductState,
+			)
 			guid = create_unicode_buffer(39)
 			product_name = create_unicode_buffer(io.DEFAULT_BUFFER_SIZE)
 			context=c_int32(0)
@@ -607,6 +808,9 @@ class UAAccess(toga.App):
 					break
 				i += 1
 		else:
+			import plistlib
+
+			import aiofiles
 			try:
 				async with aiofiles.open(f"/var/db/receipts/{self.app_id}.uaaccess.plist", "rb") as f:
 					data = await f.read()
@@ -631,32 +835,34 @@ class UAAccess(toga.App):
 		return next((asset for asset in assets if asset.name.lower().endswith(desired_extension)), None)
 
 	async def do_update_check(self):
-		if not await self.is_internet_available():
+		from packaging import version
+		from packaging.version import InvalidVersion
+
+		from .updater_dialog import UpdaterDialog
+		from .updates import ReleaseChecker
+		checker = ReleaseChecker(self.paths.cache / "latest_release.json")
+		latest_release = await checker.latest_release()
+		if latest_release is None:
 			return
-		g = Github()
-		repo = g.get_repo("uaaccess/uaaccess")
 		try:
-			latest_release = repo.get_latest_release()
-			tag_name = latest_release.tag_name.lstrip('vV')
-			parsed_version = version.parse(tag_name)
+			parsed_version = version.parse(latest_release.tag_name.lstrip('vV'))
 			current_version = version.parse(self.app.version.lstrip('vV'))
-			if parsed_version > current_version:
-				is_installed = await self.is_installed()
-				if not is_installed:
-					await self.dialog(toga.InfoDialog("Update available", f"UAAccess {parsed_version!s} is available! Please visit https://uaaccess.org to download it."))
-					return
-				perform_update = await self.dialog(toga.QuestionDialog("Update available", "An update to UAAccess is available. Would you like to upgrade now?"))
-				if perform_update:
-					try:
-						assets = latest_release.get_assets()
-						required_asset = await self.get_required_asset(assets, is_installed)
-						dialog = UpdaterDialog(required_asset)
-						dialog.show()
-					except GithubException:
-						await self.dialog(toga.ErrorDialog("Error", "The update package could not be acquired. Please try again later."))
-						return
-		except (GithubException, InvalidVersion):
+		except InvalidVersion:
+			return
+		if parsed_version <= current_version:
+			return
+		is_installed = await self.is_installed()
+		if not is_installed:
+			await self.dialog(toga.InfoDialog("Update available", f"UAAccess {parsed_version!s} is available! Please visit https://uaaccess.org to download it."))
 			return
+		perform_update = await self.dialog(toga.QuestionDialog("Update available", "An update to UAAccess is available. Would you like to upgrade now?"))
+		if perform_update:
+			required_asset = await self.get_required_asset(latest_release.assets, is_installed)
+			if required_asset is None:
+				await self.dialog(toga.ErrorDialog("Error", "The update package could not be acquired. Please try again later."))
+				return
+			dialog = UpdaterDialog(required_asset, latest_release.assets)
+			dialog.show()
 
 def main():
 	return UAAccess()
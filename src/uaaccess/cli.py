@@ -0,0 +1,194 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+cli.py
+
+Headless command line interface, for scripts and scheduled jobs: `python -m uaaccess get|set|watch|apply|proxy ...`.
+
+Talks to the console through NetworkManager without importing Toga or the speech engine, so it starts quickly and
+stays small. Runs on uvloop when it is installed.
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+from . import tree
+from .network import DEFAULT_PORT, NetworkManager, parse_address, property_changed
+from .scenes import diff_values
+
+COMMANDS = ("get", "set", "watch", "apply", "proxy")
+
+class CommandError(Exception):
+	pass
+
+def is_cli_invocation(argv: list[str]) -> bool:
+	"""Whether argv (without the program name) asks for a headless command rather than the GUI."""
+	return any(arg in COMMANDS or arg in ("-h", "--help") for arg in argv)
+
+def parse_value(text: str) -> tree.Value:
+	"""Parses a command line value: JSON literals (true, 1.5, "text") as such, anything else as a plain string."""
+	try:
+		value = json.loads(text)
+	except ValueError:
+		return text
+	if isinstance(value, (dict, list)) or value is None:
+		raise CommandError(f"Not a property value: {text}")
+	return value
+
+def format_value(value: Any) -> str:
+	return json.dumps(value, default=tree.to_json)
+
+def load_values(file: Path) -> dict[str, tree.Value]:
+	"""Reads `{path: value}` from file. Saved scenes are accepted too; their values are used."""
+	try:
+		with open(file, encoding="utf-8") as f:
+			data = json.load(f)
+	except (OSError, ValueError) as e:
+		raise CommandError(f"Could not read {file}: {e!s}") from e
+	if isinstance(data, dict) and isinstance(data.get("values"), dict):
+		data = data["values"]
+	if not isinstance(data, dict):
+		raise CommandError(f"{file} does not contain an object of paths and values")
+	return data
+
+def build_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(prog="uaaccess", description="Control a UA console without the graphical interface.")
+	parser.add_argument("--host", default="127.0.0.1", help="console IP address or hostname, optionally with :port (default: %(default)s)")
+	parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="console port (default: %(default)s)")
+	parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default="auto", help="event loop implementation (default: uvloop if installed)")
+	commands = parser.add_subparsers(dest="command", required=True)
+	get = commands.add_parser("get", help="print the value of one or more paths as JSON")
+	get.add_argument("paths", nargs="+", metavar="path")
+	set_ = commands.add_parser("set", help="set one or more values, pipelined into a single write")
+	set_.add_argument("assignments", nargs="+", metavar="path value", help="alternating paths and values")
+	watch = commands.add_parser("watch", help="print changes to paths matching glob patterns until interrupted")
+	watch.add_argument("patterns", nargs="+", metavar="pattern", help="for example /devices/0/inputs/*/Mute/value")
+	watch.add_argument("--count", type=int, default=None, help="exit after this many changes")
+	apply = commands.add_parser("apply", help="apply a JSON file of paths and values (or a saved scene), sending only what differs")
+	apply.add_argument("file", type=Path)
+	apply.add_argument("--force", action="store_true", help="send every value, even those that already match")
+	proxy = commands.add_parser("proxy", help="share one console connection between several clients")
+	proxy.add_argument("--listen-host", default="127.0.0.1", help="address to accept clients on (default: %(default)s)")
+	proxy.add_argument("--listen-port", type=int, default=DEFAULT_PORT, help="port to accept clients on (default: %(default)s)")
+	return parser
+
+async def connect(args: argparse.Namespace, load_tree: bool = True) -> NetworkManager:
+	try:
+		host, port = parse_address(args.host, args.port)
+	except ValueError as e:
+		raise CommandError(str(e)) from e
+	manager = NetworkManager(log_packets=False)
+	if load_tree:
+		await manager.preload_tree(host, port)
+	else:
+		await manager.connect_to_server(host, port)
+	return manager
+
+async def command_get(manager: NetworkManager, args: argparse.Namespace) -> int:
+	status = 0
+	await manager.load_devices_for(args.paths)
+	for path in args.paths:
+		value = manager.get(path)
+		if value is None:
+			print(f"{path}: not found", file=sys.stderr)
+			status = 1
+		elif len(args.paths) == 1:
+			print(format_value(value))
+		else:
+			print(f"{path} {format_value(value)}")
+	return status
+
+async def command_set(manager: NetworkManager, args: argparse.Namespace) -> int:
+	if len(args.assignments) % 2 != 0:
+		raise CommandError("set expects pairs of paths and values")
+	pairs = zip(args.assignments[::2], args.assignments[1::2])
+	await manager.send_requests([f"set {path} {tree.encode_value(parse_value(value))}" for path, value in pairs])
+	return 0
+
+async def command_watch(manager: NetworkManager, args: argparse.Namespace) -> int:
+	done = asyncio.Event()
+	seen = 0
+	await manager.load_all_devices()
+
+	async def on_change(sender, **kwargs):
+		nonlocal seen
+		path = kwargs["path"]
+		if not any(fnmatch.fnmatchcase(path, pattern) for pattern in args.patterns):
+			return
+		print(f"{path} {format_value(kwargs['data'])}", flush=True)
+		seen += 1
+		if args.count is not None and seen >= args.count:
+			done.set()
+	property_changed.connect(on_change)
+	waiter = asyncio.ensure_future(done.wait())
+	try:
+		await asyncio.wait([waiter, manager.receive_task], return_when=asyncio.FIRST_COMPLETED)
+	finally:
+		waiter.cancel()
+		property_changed.disconnect(on_change)
+	if manager.receive_task.done():
+		# The console closed the connection; re-raises whatever ended the receive loop.
+		manager.receive_task.result()
+		raise CommandError("the console closed the connection")
+	return 0
+
+async def command_apply(manager: NetworkManager, args: argparse.Namespace) -> int:
+	values = load_values(args.file)
+	await manager.load_devices_for(list(values))
+	changes = list(values.items()) if args.force else diff_values(values, manager.snapshot())
+	await manager.send_requests([f"set {path} {tree.encode_value(value)}" for path, value in changes])
+	print(f"{len(changes)} of {len(values)} values sent")
+	return 0
+
+async def command_proxy(manager: NetworkManager, args: argparse.Namespace) -> int:
+	from .proxy import ConsoleProxy
+	proxy = ConsoleProxy(manager)
+	await manager.load_all_devices()
+	await manager.handle_events_normally.wait()
+	# A proxy runs unattended for long stretches, so a connection that silently died must end it rather than hang it.
+	manager.start_health_monitor()
+	await proxy.start(args.listen_host, args.listen_port)
+	print(f"Proxying {args.host}:{args.port} on {args.listen_host}:{proxy.port}", flush=True)
+	try:
+		await manager.receive_task
+	finally:
+		await proxy.stop()
+	raise CommandError("the console closed the connection")
+
+HANDLERS = {"get": command_get, "set": command_set, "watch": command_watch, "apply": command_apply, "proxy": command_proxy}
+
+async def run(args: argparse.Namespace) -> int:
+	manager = await connect(args, load_tree=args.command != "set")
+	try:
+		return await HANDLERS[args.command](manager, args)
+	finally:
+		manager.close()
+
+def loop_factory(name: str) -> Optional[Any]:
+	if name == "asyncio":
+		return None
+	try:
+		import uvloop
+	except ImportError:
+		if name == "uvloop":
+			raise CommandError("uvloop is not installed")
+		return None
+	return uvloop.new_event_loop
+
+def main(argv: Optional[list[str]] = None) -> int:
+	args = build_parser().parse_args(argv)
+	try:
+		return asyncio.run(run(args), loop_factory=loop_factory(args.loop))
+	except CommandError as e:
+		print(f"uaaccess: {e!s}", file=sys.stderr)
+		return 2
+	except (OSError, asyncio.IncompleteReadError) as e:
+		print(f"uaaccess: connection to {args.host}:{args.port} failed: {e!s}", file=sys.stderr)
+		return 1
+	except KeyboardInterrupt:
+		return 130
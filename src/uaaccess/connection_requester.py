@@ -1,39 +1,75 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import inspect
-from ipaddress import ip_address
 
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
+from . import discovery, network, speech
+
 
 class ConnectionRequester(toga.Window):
 	def __init__(self, on_submit):
-		super().__init__(title="Enter connection information", size=(400, 200))
+		super().__init__(title="Enter connection information", size=(400, 300))
 		self.on_submit = on_submit
 
 		self.content = toga.Box(style=Pack(direction=COLUMN, padding=10))
 		self.content.add(toga.Label("Enter connection information"))
 
 		self.ipaddr = toga.TextInput(on_confirm =self.connect)
-		self.content.add(toga.Label('Enter IP address:'))
+		self.content.add(toga.Label('Enter IP address or hostname, optionally followed by :port:'))
 		self.content.add(self.ipaddr)
 		self.ipaddr.focus()
 
+		# Recently used consoles and those found by the last scan are offered straight away; scanning again refreshes them.
+		self.consoles = toga.Selection(accessor="label", on_change=self.on_console_selected)
+		self.content.add(toga.Label('Or choose a console found on the network:'))
+		self.content.add(self.consoles)
+		if discovery.instance is not None:
+			self.show_consoles(discovery.instance.recent() + discovery.instance.consoles())
+
 		button_box = toga.Box(style=Pack(direction=ROW, padding_top=15))
 		btn_connect = toga.Button('Connect', on_press=self.connect, style=Pack(flex=1))
+		self.btn_scan = toga.Button('Scan network', on_press=self.scan, style=Pack(flex=1))
 		button_box.add(btn_connect)
+		button_box.add(self.btn_scan)
 		self.content.add(button_box)
 
+	def show_consoles(self, consoles):
+		seen = set()
+		items = []
+		for console in consoles:
+			if (console.host, console.port) not in seen:
+				seen.add((console.host, console.port))
+				items.append({"label": console.label, "address": console.address})
+		self.consoles.items = items
+
+	def on_console_selected(self, widget, *args, **kwargs):
+		if widget.value is not None:
+			self.ipaddr.value = widget.value.address
+
+	async def scan(self, widget):
+		self.btn_scan.enabled = False
+		speech.speak("Scanning the network for consoles")
+		try:
+			consoles = await discovery.scan_local_network()
+		finally:
+			self.btn_scan.enabled = True
+		if discovery.instance is not None:
+			discovery.instance.store_scan(consoles)
+		self.show_consoles(consoles)
+		speech.speak(f"Found {len(consoles)} {'console' if len(consoles) == 1 else 'consoles'}")
+		if consoles:
+			self.consoles.focus()
+
 	def connect(self, widget):
 		try:
-			addr = ip_address(self.ipaddr.value)
+			host, port = network.parse_address(self.ipaddr.value)
 			if inspect.iscoroutinefunction(self.on_submit):
-				self.app.loop.create_task(self.on_submit(addr))
+				self.app.loop.create_task(self.on_submit(host, port))
 			else:
-				self.on_submit(addr)
+				self.on_submit(host, port)
 			self.close()
 		except ValueError as e:
 			self.error_dialog("Error", str(e))
-
@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+descriptors.py
+
+Typed, validated values for `set` requests.
+
+A property's metadata (`type`, `min`, `max`, `values`, `readonly`) is compiled once into a PropertyDescriptor that
+checks and converts whatever a widget or script hands over: Selection items arrive as strings and NumberInput values
+as Decimals. Numbers are clamped to the property's range, enumerations only accept their listed values, and read-only
+properties refuse every value, all before anything is sent, so the console never has to reject a request. Compact
+property nodes share interned schemas, so descriptors are cached per schema and most properties reuse one.
+"""
+
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Optional
+
+from .tree import PropertyNode, PropertySchema, Value, encode_value
+
+TRUE_STRINGS = {"true", "on", "yes", "1"}
+FALSE_STRINGS = {"false", "off", "no", "0"}
+INTEGER_TYPES = {"int", "int64", "pointer"}
+# How far a number may be from an enumerated float value and still select it; the UI shows these to one decimal.
+FLOAT_VALUE_TOLERANCE = 0.05
+
+class InvalidValueError(ValueError):
+	pass
+
+@dataclass(frozen=True)
+class PropertyDescriptor:
+	type: str
+	readonly: bool = False
+	minimum: Optional[float] = None
+	maximum: Optional[float] = None
+	values: Optional[tuple[Value, ...]] = None
+
+	def coerce(self, value: Any) -> Value:
+		"""Returns value converted to the property's type and clamped to its range. Raises InvalidValueError."""
+		if self.readonly:
+			raise InvalidValueError("This property is read-only")
+		match self.type:
+			case "bool":
+				return self.coerce_bool(value)
+			case "string":
+				return self.coerce_string(value)
+			case "float":
+				return self.coerce_float(value)
+			case _ if self.type in INTEGER_TYPES:
+				return self.coerce_int(value)
+		# A type this version does not know about is passed through for the console to judge.
+		return value
+
+	def encode(self, value: Any) -> str:
+		"""The argument of a `set` request for value."""
+		return encode_value(self.coerce(value))
+
+	def coerce_bool(self, value: Any) -> bool:
+		if isinstance(value, bool):
+			return value
+		if isinstance(value, (int, Decimal)) and value in (0, 1):
+			return bool(value)
+		if isinstance(value, str) and value.strip().lower() in TRUE_STRINGS | FALSE_STRINGS:
+			return value.strip().lower() in TRUE_STRINGS
+		raise InvalidValueError(f"{value!r} is not on or off")
+
+	def coerce_string(self, value: Any) -> str:
+		if not isinstance(value, str):
+			raise InvalidValueError(f"{value!r} is not text")
+		if self.values is not None and value not in self.values:
+			raise InvalidValueError(f"{value} is not one of {', '.join(map(str, self.values))}")
+		return value
+
+	def number(self, value: Any) -> float:
+		if isinstance(value, bool):
+			raise InvalidValueError(f"{value!r} is not a number")
+		try:
+			number = float(value)
+		except (TypeError, ValueError):
+			raise InvalidValueError(f"{value!r} is not a number") from None
+		if not math.isfinite(number):
+			raise InvalidValueError(f"{value!r} is not a finite number")
+		return number
+
+	def clamp(self, number: float) -> float:
+		if self.minimum is not None and number < self.minimum:
+			return self.minimum
+		if self.maximum is not None and number > self.maximum:
+			return self.maximum
+		return number
+
+	def coerce_float(self, value: Any) -> float:
+		number = self.number(value)
+		if self.values is not None:
+			nearest = min(self.values, key=lambda v: abs(v - number))
+			if abs(nearest - number) > FLOAT_VALUE_TOLERANCE:
+				raise InvalidValueError(f"{value} is not one of the allowed values")
+			return float(nearest)
+		return float(self.clamp(number))
+
+	def coerce_int(self, value: Any) -> int:
+		number = self.number(value)
+		if not number.is_integer():
+			raise InvalidValueError(f"{value} is not a whole number")
+		number = int(number)
+		if self.values is not None:
+			if number not in self.values:
+				raise InvalidValueError(f"{number} is not one of the allowed values")
+			return number
+		return int(self.clamp(number))
+
+def compile_descriptor(prop: Mapping) -> PropertyDescriptor:
+	values = prop.get("values")
+	return PropertyDescriptor(
+		prop.get("type", ""),
+		bool(prop.get("readonly", False)),
+		prop.get("min"),
+		prop.get("max"),
+		tuple(values) if isinstance(values, list) else None,
+	)
+
+# Schemas are interned and never freed, so they can key the cache directly.
+cache: dict[PropertySchema, PropertyDescriptor] = {}
+
+def descriptor_for(prop: Mapping) -> PropertyDescriptor:
+	if isinstance(prop, PropertyNode):
+		descriptor = cache.get(prop.schema)
+		if descriptor is None:
+			descriptor = cache[prop.schema] = compile_descriptor(prop)
+		return descriptor
+	return compile_descriptor(prop)
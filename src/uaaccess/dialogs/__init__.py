@@ -1,7 +1,12 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from .effect_parameters_dialog import EffectParametersDialog
+from .metrics_dialog import MetricsDialog
 from .preamp_effects_dialog import PreampEffectsDialog
+from .profiling_dialog import ProfilingDialog
+from .quick_jump_dialog import QuickJumpDialog
+from .scenes_dialog import ScenesDialog
 from .sends_dialog import SendsDialog, SendsType
+from .sends_matrix_dialog import SendsMatrixDialog
 
-__all__ = ["SendsType", "SendsDialog", "PreampEffectsDialog", "EffectParametersDialog"]
+__all__ = ["SendsType", "SendsDialog", "PreampEffectsDialog", "EffectParametersDialog", "ProfilingDialog", "MetricsDialog", "SendsMatrixDialog", "ScenesDialog", "QuickJumpDialog"]
@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import platform
+from typing import Optional
 
 import toga
 from blinker import signal
-from pedalboard import load_plugin
 
-from .. import network
+from .. import network, plugin_cache, plugin_host
+from ..plugin_cache import PluginMetadata, PluginMetadataCache
+from ..plugin_host import PluginHostError, PluginHostPool
+from ..preset_index import Preset
 
 
 class EffectParametersDialog(toga.Window):
@@ -14,122 +16,143 @@ class EffectParametersDialog(toga.Window):
 		plugindata = network.instance.get(f"/plugins/{plugin}")
 		pname = plugindata["properties"]["Name"]["value"]
 		pcat = plugindata["properties"]["Categories"]["value"].split(',')[0].replace('&', "and")
-		signal("NormalizedValue").connect(self.on_remote_parameter_changed)
 		self.instance = network.instance
+		signal("NormalizedValue").connect(self.on_remote_parameter_changed, sender=self.instance)
 		super().__init__(title=f"Effect parameters editor: {pname}")
-		common_path = ""
-		match platform.system():
-			case "Windows":
-				common_path = r"C:\Program Files\Common Files\VST3\Universal Audio"
-				self.plugin_instance = load_plugin(rf"{common_path}\{pcat}\{pname}.vst3\Contents\x86_64-win\{pname}.vst3")
-			case "Darwin":
-				common_path = "/Library/Audio/Plug-Ins/VST3/Universal Audio"
-				self.plugin_instance = load_plugin(rf"{common_path}/{pcat}/{pname}.vst3/Contents/MacOS/{pname}")
-			case _:
-				return
-		self.params = list(self.plugin_instance.parameters.keys())
-		if self.params.index("master_bypass") != -1:
-			self.params.pop(self.params.index("master_bypass"))
-			presets = ["None"]
-		data = self.instance.get(f"/plugins/{plugin}/Preset/values")
-		results = []
-		top_level_values = data
-		stack = [(item, "") for item in top_level_values]
-		while stack:
-			current, parent_value = stack.pop()
-			if current.get("type") == "file":
-				if parent_value:
-					results.append(f"{parent_value}: {current['value']}")
-				else:
-					results.append(current['value'])
-			elif current.get("type") == "folder":
-				current_value = current.get("value", "")
-				if "children" in current:
-					for child in current["children"]:
-						stack.append((child, current_value))
-			else:
-				results.append(current_value)
-		results.reverse()
-		presets.extend(results)
-		cur_preset = None
+		self.metadata: Optional[PluginMetadata] = None
 		if for_preamp:
-			cur_preset = self.instance.get(f"/devices/{device}/inputs/{input}/preamps/{preamp}/effects/{effect}/Preset/value")
+			self.effect_path = f"/devices/{device}/inputs/{input}/preamps/{preamp}/effects/{effect}"
 		else:
-			cur_preset = self.instance.get(f"/devices/{device}/inputs/{input}/effects/{effect}/Preset/value")
+			self.effect_path = f"/devices/{device}/inputs/{input}/effects/{effect}"
+		bundle = plugin_cache.plugin_bundle_path(pname, pcat)
+		if bundle is None:
+			return
+		if plugin_cache.instance is None:
+			plugin_cache.instance = PluginMetadataCache(self.app.paths.cache / "plugins")
+		binary = plugin_cache.plugin_binary_path(bundle, pname)
+		self.presets = self.instance.get_preset_index(str(plugin))
+		cur_preset = self.instance.get(f"{self.effect_path}/Preset/value")
+		if not cur_preset:
+			cur_preset = "Default" if self.presets.locate("Default") is not None else "None"
+		located = self.presets.locate(cur_preset)
+		folder = "" if located is None else located.folder
 		self.box = toga.Box()
+		self.preset_search_label = toga.Label("Search presets")
+		self.preset_search = toga.TextInput(on_change=self.on_preset_search_changed)
+		self.preset_folder_label = toga.Label("Preset folder")
+		self.preset_folder = toga.Selection(items=[folder or "Top level" for folder in self.presets.folders()], value=folder or "Top level", on_change=self.on_preset_folder_changed)
 		self.preset_label = toga.Label("Preset")
-		self.preset = None
-		if for_preamp:
-			self.preset = toga.Selection(id=f"/devices/{device}/inputs/{input}/preamps/{preamp}/effects/{effect}/Preset", items=presets, value=cur_preset if len(cur_preset) > 0 else "Default" if "Default" in presets else "None", on_change=self.set_preset)
-		else:
-			self.preset = toga.Selection(id=f"/devices/{device}/inputs/{input}/effects/{effect}/Preset", items=presets, value=cur_preset if len(cur_preset) > 0 else "Default" if "Default" in presets else "None", on_change=self.set_preset)
+		self.preset = toga.Selection(id=f"{self.effect_path}/Preset", accessor="label", on_change=self.set_preset)
+		self.show_preset_folder(folder, cur_preset)
+		self.box.add(self.preset_search_label)
+		self.box.add(self.preset_search)
+		self.box.add(self.preset_folder_label)
+		self.box.add(self.preset_folder)
 		self.box.add(self.preset_label)
 		self.box.add(self.preset)
+		self.parameters_box = toga.Box()
+		self.box.add(self.parameters_box)
+		self.box.add(toga.Button("Close", on_press=self.close_editor))
+		self.content = self.box
 		self.actual_params = {}
-		for param_python_name in self.params:
-			param = self.plugin_instance.parameters[param_python_name]
-			param_strings = []
-			for value in param.valid_values:
-				setattr(self.plugin_instance, param.python_name, value)
-				param_strings.append(param.string_value)
-			self.plugin_instance.reset()
-			if param.type is bool:
-				if for_preamp:
-					self.actual_params[param_python_name] = toga.Switch(f"{param.name}{f" ({param.units})" if param.units is not None else ""}", on_change=self.on_param_bool_toggle, id=f"/devices/{device}/inputs/{input}/preamps/{preamp}/effects/{effect}/parameters/{self.params.index(param_python_name)}")
-				else:
-					self.actual_params[param_python_name] = toga.Switch(f"{param.name}{f" ({param.units})" if param.units is not None else ""}", on_change=self.on_param_bool_toggle, id=f"/devices/{device}/inputs/{input}/effects/{effect}/parameters/{self.params.index(param_python_name)}")
-				self.box.add(self.actual_params[param_python_name])
-			elif param.type is str or param.type is float:
-				self.actual_params[f"{param_python_name}_label"] = toga.Label(f"{param.name}{f" ({param.units})" if param.units is not None else ""}")
-				if for_preamp:
-					self.actual_params[param_python_name] = toga.Selection(items=param_strings, on_change=self.on_choice_param_change, id=f"/devices/{device}/inputs/{input}/preamps/{preamp}/effects/{effect}/parameters/{self.params.index(param_python_name)}")
-				else:
-					self.actual_params[param_python_name] = toga.Selection(items=param_strings, on_change=self.on_choice_param_change, id=f"/devices/{device}/inputs/{input}/effects/{effect}/parameters/{self.params.index(param_python_name)}")
-				self.box.add(self.actual_params[f"{param_python_name}_label"])
-				self.box.add(self.actual_params[param_python_name])
+		metadata = plugin_cache.instance.cached(pname, bundle, binary)
+		if metadata is not None:
+			self.build_parameters(metadata)
+		else:
+			# Describing the plug-in means loading it, which happens in a plug-in host process so the UI stays responsive.
+			self.parameters_box.add(toga.Label("Loading plug-in parameters..."))
+			self.app.loop.create_task(self.load_parameters(pname, bundle, binary))
+		self.app.loop.create_task(self.instance.send_request(f"subscribe {self.effect_path}/parameters?recursive=1"))
+
+	async def load_parameters(self, pname, bundle, binary):
+		if plugin_host.pool is None:
+			plugin_host.pool = PluginHostPool()
+		try:
+			metadata = await plugin_cache.instance.load_async(pname, bundle, binary, plugin_host.pool)
+		except PluginHostError as e:
+			self.parameters_box.clear()
+			self.parameters_box.add(toga.Label("The plug-in could not be loaded."))
+			await self.dialog(toga.ErrorDialog("Error", f"The parameters of {pname} could not be loaded: {e!s}"))
+			return
+		self.parameters_box.clear()
+		self.build_parameters(metadata)
+
+	def build_parameters(self, metadata: PluginMetadata):
+		self.metadata = metadata
+		for index, param in enumerate(metadata.parameters):
+			param_python_name = param.python_name
+			if param.type == "bool":
+				self.actual_params[param_python_name] = toga.Switch(param.label, on_change=self.on_param_bool_toggle, id=f"{self.effect_path}/parameters/{index}")
+				self.parameters_box.add(self.actual_params[param_python_name])
+			elif param.type == "str" or param.type == "float":
+				self.actual_params[f"{param_python_name}_label"] = toga.Label(param.label)
+				self.actual_params[param_python_name] = toga.Selection(items=param.display_values, on_change=self.on_choice_param_change, id=f"{self.effect_path}/parameters/{index}")
+				self.parameters_box.add(self.actual_params[f"{param_python_name}_label"])
+				self.parameters_box.add(self.actual_params[param_python_name])
 			else:
 				print(f"Warning: type {param.type} is unknown")
-		self.box.add(toga.Button("Close", on_press=self.close_editor))
-		self.content = self.box
-		self.app.loop.create_task(self.instance.send_request(f"subscribe /devices/{device}/inputs/{input}/effects/{effect}/parameters?recursive=1"))
 
 	async def on_remote_parameter_changed(self, sender, *args, **kwargs):
 		path = kwargs["path"]
 		data = kwargs["data"]
+		if self.metadata is None or not path.startswith(f"{self.effect_path}/"):
+			return
 		components = path.strip("/").split("/")
-		param_name = self.params[int(components[components.index("parameters")+1])]
-		self.plugin_instance.parameters[param_name].raw_value = float(data)
-		handler = self.actual_params[param_name].on_change
-		self.actual_params[param_name].on_change = None
-		if self.plugin_instance.parameters[param_name].type is bool:
-			self.actual_params[param_name].value = bool(self.plugin_instance.parameters[param_name].raw_value)
+		param = self.metadata.parameter(int(components[components.index("parameters")+1]))
+		widget = self.actual_params[param.python_name]
+		handler = widget.on_change
+		widget.on_change = None
+		if param.type == "bool":
+			widget.value = bool(param.value_for(float(data)))
 		else:
-			self.actual_params[param_name].value = self.plugin_instance.parameters[param_name].string_value
-		self.actual_params[param_name].on_change = handler
-		self.plugin_instance.reset()
+			widget.value = param.display_value_for(float(data))
+		widget.on_change = handler
 
 	async def on_param_bool_toggle(self, widget, *args, **kwargs):
 		components = widget.id.strip("/").split("/")
-		param_name = self.params[int(components[components.index("parameters")+1])]
-		normalized_value = self.plugin_instance.parameters[param_name].get_raw_value_for(widget.value)
+		normalized_value = self.metadata.parameter(int(components[components.index("parameters")+1])).raw_value_for(widget.value)
 		await self.instance.send_request(f"set {widget.id}/NormalizedValue {normalized_value}")
 
 	async def on_choice_param_change(self, widget, *args, **kwargs):
 		components = widget.id.strip("/").split("/")
-		param_name = self.params[int(components[components.index("parameters")+1])]
-		normalized_value = self.plugin_instance.parameters[param_name].get_raw_value_for(widget.value)
+		normalized_value = self.metadata.parameter(int(components[components.index("parameters")+1])).raw_value_for(widget.value)
 		await self.instance.send_request(f"set {widget.id}/NormalizedValue {normalized_value}")
 
+	def show_presets(self, presets: list[Preset], current: Optional[str] = None):
+		"""Replaces the preset list with presets, selecting current if it is among them."""
+		handler = self.preset.on_change
+		self.preset.on_change = None
+		self.preset.items = [{"label": preset.label, "name": preset.name} for preset in presets]
+		for item in self.preset.items:
+			if item.name == current:
+				self.preset.value = item
+				break
+		self.preset.on_change = handler
+
+	def show_preset_folder(self, folder: str, current: Optional[str] = None):
+		presets = [Preset("", "None")] if folder == "" else []
+		presets.extend(Preset("", name) for name in self.presets.presets(folder))
+		self.show_presets(presets, current)
+
+	def on_preset_folder_changed(self, widget, *args, **kwargs):
+		if widget.value is None:
+			return
+		self.show_preset_folder("" if widget.value == "Top level" else widget.value)
+
+	def on_preset_search_changed(self, widget, *args, **kwargs):
+		if not widget.value.strip():
+			self.on_preset_folder_changed(self.preset_folder)
+			return
+		self.show_presets(self.presets.search(widget.value))
+
 	async def set_preset(self, widget, *args, **kwargs):
-		if widget.value == "None":
+		if widget.value is None:
+			return
+		if widget.value.name == "None":
 			await self.instance.send_request(f"set {widget.id} \"\"")
 			return
-		preset = widget.value
-		if widget.value.find(": ") != -1:
-			preset = preset.split(": ")[-1]
-		await self.instance.send_request(f"set {widget.id} \"{preset}\"")
+		await self.instance.send_request(f"set {widget.id} \"{widget.value.name}\"")
 
 	def close_editor(self, widget, *args, **kwargs):
-		del self.plugin_instance
 		signal("NormalizedValue").disconnect(self.on_remote_parameter_changed)
 		self.close()
@@ -0,0 +1,26 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import toga
+from toga.style import Pack
+from toga.style.pack import COLUMN
+
+from .. import metrics
+
+
+class MetricsDialog(toga.Window):
+	def __init__(self):
+		super().__init__(title="Performance metrics", size=(500, 400))
+		self.box = toga.Box(style=Pack(direction=COLUMN, padding=10))
+		self.report = toga.MultilineTextInput(value=metrics.report(), readonly=True, style=Pack(flex=1))
+		self.box.add(self.report)
+		self.box.add(toga.Button("&Refresh", on_press=self.refresh))
+		self.box.add(toga.Button("&Close", on_press=self.close_window))
+		self.content = self.box
+		self.report.focus()
+
+	def refresh(self, widget, *args, **kwargs):
+		self.report.value = metrics.report()
+		self.report.focus()
+
+	def close_window(self, widget, *args, **kwargs):
+		self.close()
@@ -14,7 +14,10 @@ class PreampEffectsDialog(toga.Window):
 		self.input = input
 		self.effects = self.instance.get_all_preamp_effects(device, input)
 		self.box = toga.Box()
+		self.catalog = self.instance.get_plugin_catalog()
 		self.show_authorized_plugins_only_switch = toga.Switch("&Show authorized plug-ins only", on_change=self.rescan_plugins)
+		self.category_label = toga.Label("Category")
+		self.category = toga.Selection(items=["All categories", *self.catalog.categories()], on_change=self.rescan_plugins)
 		self.plugins = [{"name": "None", "id": -1}]
 		self.plugins.extend(self.scan_all_plugins())
 		self.plugins_list_label = toga.Label("Select a plug-in")
@@ -28,6 +31,8 @@ class PreampEffectsDialog(toga.Window):
 			self.current_plugin_selection = [plugin.id for plugin in self.plugins_list.items if plugin.name == self.effects['0']["properties"]["EffectName"]["value"]][0]
 			self.parameters_button.enabled = True
 		self.box.add(self.show_authorized_plugins_only_switch)
+		self.box.add(self.category_label)
+		self.box.add(self.category)
 		self.box.add(self.plugins_list_label)
 		self.box.add(self.plugins_list)
 		self.box.add(self.apply_button)
@@ -36,39 +41,17 @@ class PreampEffectsDialog(toga.Window):
 		self.content = self.box
 		self.show_authorized_plugins_only_switch.focus()
 
-	def scan_all_plugins(self) -> list[str]:
-		plugins = self.instance.get_all_plugins()
-		ids_to_remove = set()
-		if self.show_authorized_plugins_only_switch.value:
-			# Filter by plugins that are authorized
-			for id, plugin in plugins.items():
-				if plugin["properties"]["Status"]["value"].find("Authorized") == -1:
-					ids_to_remove.add(id)
-		if len(ids_to_remove) > 0:
-			for id in ids_to_remove:
-				plugins.pop(id)
-
-		ids_to_remove.clear()
-		for id, plugin in plugins.items():
-			if not plugin["properties"]["Unison"]["value"]:
-				ids_to_remove.add(id)
-
-		for id in ids_to_remove:
-			plugins.pop(id)
-
-		names = []
-		for id, plugin in plugins.items():
-			names.append({"name": plugin["properties"]["Name"]["value"], "id": id})
-
-		return names
+	def scan_all_plugins(self) -> list[dict[str, str]]:
+		category = self.category.value if self.category.value != "All categories" else None
+		entries = self.catalog.query(authorized_only=bool(self.show_authorized_plugins_only_switch.value), unison_only=True, category=category)
+		return [{"name": entry.name, "id": entry.id} for entry in entries]
 
 	def rescan_plugins(self, widget, *args, **kwargs):
-		try:
-			plugins_list = [{"name": "None", "id": -1}]
-			plugins_list.extend(self.scan_all_plugins())
-			self.plugins_list.items = plugins_list
-		except KeyError:
-			self.plugins_list.value = self.plugins_list.items[0]
+		plugins_list = [{"name": "None", "id": -1}]
+		plugins_list.extend(self.scan_all_plugins())
+		self.plugins = plugins_list
+		self.plugins_list.items = plugins_list
+		self.plugins_list.value = self.plugins_list.items[0]
 
 	def on_plugin_selected(self, widget, *args, **kwargs):
 		self.current_plugin_selection = widget.value.id
@@ -0,0 +1,40 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import toga
+from toga.style import Pack
+from toga.style.pack import COLUMN
+
+from .. import profiling, speech
+from ..profiling import ProfileFormat, ProfileScope
+
+
+class ProfilingDialog(toga.Window):
+	def __init__(self):
+		super().__init__(title="Start profiling capture", size=(400, 200))
+		self.box = toga.Box(style=Pack(direction=COLUMN, padding=10))
+		self.scope_label = toga.Label("Profile")
+		self.scope = toga.Selection(items=[scope.value for scope in ProfileScope], value=ProfileScope.ALL.value)
+		self.format_label = toga.Label("Capture type")
+		self.format = toga.Selection(items=["Deterministic (cProfile, .pstats)", "Sampling (flame graph, .folded)"])
+		self.box.add(self.scope_label)
+		self.box.add(self.scope)
+		self.box.add(self.format_label)
+		self.box.add(self.format)
+		self.box.add(toga.Button("&Start", on_press=self.start_capture))
+		self.box.add(toga.Button("&Cancel", on_press=self.close_window))
+		self.content = self.box
+		self.scope.focus()
+
+	async def start_capture(self, widget, *args, **kwargs):
+		scope = ProfileScope(self.scope.value)
+		format = ProfileFormat.PSTATS if self.format.value.endswith(".pstats)") else ProfileFormat.COLLAPSED
+		try:
+			profiling.start(scope, format)
+		except (RuntimeError, ValueError) as e:
+			await self.dialog(toga.ErrorDialog("Error", f"Could not start profiling: {e!s}"))
+			return
+		speech.speak("Profiling started")
+		self.close()
+
+	def close_window(self, widget, *args, **kwargs):
+		self.close()
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import inspect
+
+import toga
+from toga.style import Pack
+from toga.style.pack import COLUMN
+
+from .. import network, speech
+from ..search_index import RESULT_LIMIT
+
+
+class QuickJumpDialog(toga.Window):
+	def __init__(self, on_jump):
+		super().__init__(title="Quick jump", size=(400, 300))
+		self.on_jump = on_jump
+		self.box = toga.Box(style=Pack(direction=COLUMN, padding=10))
+		self.query_label = toga.Label("Find a channel, control, send or plugin")
+		self.query = toga.TextInput(on_change=self.on_query_change, on_confirm=self.jump)
+		self.results_label = toga.Label("Results")
+		self.results = toga.Selection(accessor="label")
+		self.box.add(self.query_label)
+		self.box.add(self.query)
+		self.box.add(self.results_label)
+		self.box.add(self.results)
+		self.box.add(toga.Button("&Go", on_press=self.jump))
+		self.box.add(toga.Button("&Close", on_press=self.close_window))
+		self.content = self.box
+		self.query.focus()
+
+	def on_query_change(self, widget, *args, **kwargs):
+		# Fetched on every change, so plugins inserted while the dialog is open are found too.
+		entries = network.instance.get_search_index().search(widget.value, RESULT_LIMIT)
+		self.results.items = [{"label": f"{entry.label}, {entry.kind}", "entry": entry} for entry in entries]
+		if not widget.value.strip():
+			return
+		# Read the best match as the user types, so Enter can be pressed as soon as it is the right one.
+		if entries:
+			speech.speak(f"{entries[0].label}, {len(entries)}{'+' if len(entries) >= RESULT_LIMIT else ''} {'result' if len(entries) == 1 else 'results'}")
+		else:
+			speech.speak("No results")
+
+	def jump(self, widget, *args, **kwargs):
+		if self.results.value is None:
+			return
+		entry = self.results.value.entry
+		self.close()
+		if inspect.iscoroutinefunction(self.on_jump):
+			self.app.loop.create_task(self.on_jump(entry))
+		else:
+			self.on_jump(entry)
+
+	def close_window(self, widget, *args, **kwargs):
+		self.close()
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import toga
+from toga.style import Pack
+from toga.style.pack import COLUMN
+
+from .. import network, scenes, speech
+from ..scenes import SceneError, SceneStore
+
+
+class ScenesDialog(toga.Window):
+	def __init__(self, device: int):
+		super().__init__(title=f"Scenes for {network.instance.get(f"/devices/{device}/DeviceName/value")}", size=(400, 300))
+		self.instance = network.instance
+		self.device = device
+		if scenes.instance is None:
+			scenes.instance = SceneStore(self.app.paths.data / "scenes")
+		self.box = toga.Box(style=Pack(direction=COLUMN, padding=10))
+		self.scenes_label = toga.Label("Saved scenes")
+		self.scenes = toga.Selection(items=scenes.instance.names())
+		self.name_label = toga.Label("New scene name")
+		self.name = toga.TextInput(on_confirm=self.capture_scene)
+		self.box.add(self.scenes_label)
+		self.box.add(self.scenes)
+		self.box.add(toga.Button("&Recall", on_press=self.recall_scene))
+		self.box.add(toga.Button("&Delete", on_press=self.delete_scene))
+		self.box.add(self.name_label)
+		self.box.add(self.name)
+		self.box.add(toga.Button("&Capture", on_press=self.capture_scene))
+		self.box.add(toga.Button("&Close", on_press=self.close_window))
+		self.content = self.box
+		self.scenes.focus()
+
+	def refresh(self, selected=None):
+		self.scenes.items = scenes.instance.names()
+		if selected is not None:
+			self.scenes.value = selected
+
+	async def capture_scene(self, widget, *args, **kwargs):
+		name = self.name.value.strip()
+		if not name:
+			await self.dialog(toga.ErrorDialog("Error", "Please enter a name for the scene."))
+			return
+		try:
+			scene = scenes.capture(self.instance.snapshot(), self.device, name)
+			scenes.instance.save(scene)
+		except (SceneError, OSError) as e:
+			await self.dialog(toga.ErrorDialog("Error", f"Could not capture the scene: {e!s}"))
+			return
+		self.name.value = ""
+		self.refresh(name)
+		speech.speak(f"Captured {name} with {len(scene.values)} values")
+
+	async def recall_scene(self, widget, *args, **kwargs):
+		if self.scenes.value is None:
+			return
+		try:
+			scene = scenes.instance.load(self.scenes.value)
+		except SceneError as e:
+			await self.dialog(toga.ErrorDialog("Error", str(e)))
+			return
+		changed = await scenes.recall(self.instance, scene)
+		speech.speak(f"Recalled {scene.name}, {changed} values changed")
+
+	def delete_scene(self, widget, *args, **kwargs):
+		if self.scenes.value is None:
+			return
+		name = self.scenes.value
+		scenes.instance.delete(name)
+		self.refresh()
+		speech.speak(f"Deleted {name}")
+
+	def close_window(self, widget, *args, **kwargs):
+		self.close()
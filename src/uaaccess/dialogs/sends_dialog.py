@@ -5,7 +5,8 @@ from enum import Enum
 import toga
 from blinker import signal
 
-from .. import network
+from .. import network, speech
+from ..descriptors import InvalidValueError
 
 
 class SendsType (Enum):
@@ -19,13 +20,14 @@ class SendsDialog(toga.Window):
 			super().__init__(title=f"Edit Sends for {network.instance.get(f"/devices/{device_id}/inputs/{id}/Name/value")}", size=(400, 200))
 		else:
 			super().__init__(title=f"Edit Sends for {network.instance.get(f"/devices/{device_id}/auxs/{id}/Name/value")}", size=(400, 200))
-		signal("Gain").connect(self.on_send_gain_changed)
 		self.sends_content = toga.Box()
 		self.type_id = id
 		self.device = device_id
 		self.instance = network.instance
+		signal("Gain").connect(self.on_send_gain_changed, sender=self.instance)
 		self.content = self.sends_content
 		self.sends_type = sends_type
+		self.on_close = self.handle_close
 
 	def build(self):
 		sends = None
@@ -60,7 +62,15 @@ class SendsDialog(toga.Window):
 				send_widget.on_change = handler
 
 	async def on_prop_float_change(self, widget, *args, **kwargs):
-		await self.instance.send_request(f"set {widget.id} {widget.value}")
+		try:
+			await self.instance.set_value(widget.id, widget.value)
+		except InvalidValueError as e:
+			speech.speak(str(e))
+
+	def handle_close(self, window, **kwargs):
+		signal("Gain").disconnect(self.on_send_gain_changed)
+		return True
 
 	def close_window(self, widget, *args, **kwargs):
+		self.handle_close(self)
 		self.close()
@@ -0,0 +1,146 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import toga
+from blinker import signal
+from toga.style import Pack
+from toga.style.pack import COLUMN, ROW
+
+from .. import network, speech
+from ..descriptors import InvalidValueError
+
+
+@dataclass(slots=True)
+class SendCell:
+	path: str
+	source: str
+	send: str
+	value: float
+	min: Optional[float]
+	max: Optional[float]
+
+class SendsMatrixModel:
+	"""Every send gain of a device as sources (rows) by sends (columns), indexed by the Gain value path."""
+	def __init__(self, instance: network.NetworkManager, device: int):
+		self.rows: list[str] = []
+		self.columns: list[str] = []
+		self.grid: list[list[Optional[SendCell]]] = []
+		self.cells: dict[str, SendCell] = {}
+		column_index: dict[str, int] = {}
+		sources: list[tuple[str, dict[str, Any]]] = []
+		for kind in ("inputs", "auxs"):
+			node = instance.get(f"/devices/{device}/{kind}")
+			for id, source in ({} if node is None else node.get("children", {})).items():
+				if "Active" in source["properties"] and not source["properties"]["Active"]["value"]:
+					continue
+				sources.append((f"/devices/{device}/{kind}/{id}", source))
+		rows: list[dict[int, SendCell]] = []
+		for base, source in sources:
+			row: dict[int, SendCell] = {}
+			for id, send in source.get("children", {}).get("sends", {}).get("children", {}).items():
+				props = send["properties"]
+				name = props["Name"]["value"]
+				if name not in column_index:
+					column_index[name] = len(self.columns)
+					self.columns.append(name)
+				gain = props["Gain"]
+				cell = SendCell(f"{base}/sends/{id}/Gain/value", source["properties"]["Name"]["value"], name, gain.get("value", gain.get("default", 0.0)), gain.get("min"), gain.get("max"))
+				self.cells[cell.path] = cell
+				row[column_index[name]] = cell
+			self.rows.append(source["properties"]["Name"]["value"])
+			rows.append(row)
+		self.grid = [[row.get(i) for i in range(len(self.columns))] for row in rows]
+
+	def update(self, path: str, value: float) -> Optional[SendCell]:
+		cell = self.cells.get(path)
+		if cell is not None:
+			cell.value = value
+		return cell
+
+class SendsMatrixDialog(toga.Window):
+	def __init__(self, device: int, rows_per_page: int = 4):
+		super().__init__(title=f"Sends matrix for {network.instance.get(f"/devices/{device}/DeviceName/value")}", size=(800, 600))
+		self.instance = network.instance
+		self.model = SendsMatrixModel(self.instance, device)
+		self.rows_per_page = rows_per_page
+		self.first_row = 0
+		# Only the cells currently on screen have widgets; remote updates for the rest just update the model.
+		self.visible: dict[str, toga.NumberInput] = {}
+		self.box = toga.Box(style=Pack(direction=COLUMN, padding=10))
+		self.source_label = toga.Label("Jump to source")
+		self.source = toga.Selection(items=[{"name": name, "row": row} for row, name in enumerate(self.model.rows)], accessor="name", on_change=self.on_source_selected)
+		self.rows_box = toga.Box(style=Pack(direction=COLUMN))
+		self.previous_button = toga.Button("&Previous sources", on_press=self.previous_page)
+		self.next_button = toga.Button("&Next sources", on_press=self.next_page)
+		self.box.add(self.source_label)
+		self.box.add(self.source)
+		self.box.add(self.rows_box)
+		self.box.add(self.previous_button)
+		self.box.add(self.next_button)
+		self.box.add(toga.Button("&Close", on_press=self.close_window))
+		self.content = self.box
+		self.on_close = self.handle_close
+		signal("Gain").connect(self.on_send_gain_changed, sender=self.instance)
+		self.render()
+
+	def render(self):
+		self.rows_box.clear()
+		self.visible.clear()
+		for row in range(self.first_row, min(self.first_row + self.rows_per_page, len(self.model.rows))):
+			row_box = toga.Box(style=Pack(direction=ROW, padding=5))
+			row_box.add(toga.Label(self.model.rows[row]))
+			for cell in self.model.grid[row]:
+				if cell is None:
+					continue
+				cell_box = toga.Box(style=Pack(direction=COLUMN, padding_right=5))
+				cell_box.add(toga.Label(f"{cell.source} to {cell.send}"))
+				edit = toga.NumberInput(id=cell.path, step=1.0, min=cell.min, max=cell.max, value=cell.value, on_change=self.on_cell_change)
+				cell_box.add(edit)
+				row_box.add(cell_box)
+				self.visible[cell.path] = edit
+			self.rows_box.add(row_box)
+		self.previous_button.enabled = self.first_row > 0
+		self.next_button.enabled = self.first_row + self.rows_per_page < len(self.model.rows)
+
+	def show_row(self, row: int):
+		self.first_row = max(0, min(row, len(self.model.rows) - 1))
+		self.render()
+
+	def previous_page(self, widget, *args, **kwargs):
+		self.show_row(self.first_row - self.rows_per_page)
+
+	def next_page(self, widget, *args, **kwargs):
+		self.show_row(self.first_row + self.rows_per_page)
+
+	def on_source_selected(self, widget, *args, **kwargs):
+		if widget.value is not None:
+			self.show_row(widget.value.row)
+
+	async def on_send_gain_changed(self, sender, **kwargs):
+		path = kwargs["path"]
+		if self.model.update(path, kwargs["data"]) is None:
+			return
+		widget = self.visible.get(path)
+		if widget is None:
+			return
+		handler = widget.on_change
+		widget.on_change = None
+		widget.value = kwargs["data"]
+		widget.on_change = handler
+
+	async def on_cell_change(self, widget, *args, **kwargs):
+		# The edit is emitted as a Gain change right away, which updates the model through on_send_gain_changed.
+		try:
+			await self.instance.set_value(widget.id, widget.value)
+		except InvalidValueError as e:
+			speech.speak(str(e))
+
+	def handle_close(self, window, **kwargs):
+		signal("Gain").disconnect(self.on_send_gain_changed)
+		return True
+
+	def close_window(self, widget, *args, **kwargs):
+		self.handle_close(self)
+		self.close()
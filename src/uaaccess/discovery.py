@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+discovery.py
+
+Finds UA consoles on the local network.
+
+A scan probes the console port on every address of the local IPv4 subnets. Probes run concurrently, bounded by a
+semaphore so a /24 does not open hundreds of sockets at once, and each one gives up after a short timeout. A host
+only counts as a console if it answers a `get` for its device name in the console's protocol; responders are ranked
+by round-trip time. The results and the consoles connected to recently are cached on disk, so the next launch can
+offer them, and race a reconnection to all of them, without scanning again.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from ipaddress import IPv4Address, IPv4Interface, IPv4Network
+from pathlib import Path
+from typing import Any, Optional
+
+from . import metrics
+from .network import DEFAULT_PORT, HAPPY_EYEBALLS_DELAY
+
+PROBE_TIMEOUT = 0.5
+MAX_CONCURRENT_PROBES = 64
+# Local addresses are assumed to be on a /24; scanning anything larger one address at a time is not practical.
+SUBNET_PREFIX = 24
+# How many recently used consoles are remembered.
+MAX_RECENT = 5
+
+@dataclass
+class DiscoveredConsole:
+	host: str
+	port: int
+	name: Optional[str]
+	# Seconds from sending the probe to its reply.
+	rtt: float
+
+	@property
+	def address(self) -> str:
+		"""host, or host:port when the port is not the default, in the form network.parse_address reads back."""
+		if self.port == DEFAULT_PORT:
+			return self.host
+		return f"[{self.host}]:{self.port}" if ':' in self.host else f"{self.host}:{self.port}"
+
+	@property
+	def label(self) -> str:
+		# Recently used consoles are remembered without a round-trip time.
+		return f"{self.name or 'UA console'} ({self.address}{f", {self.rtt * 1000:.0F} ms" if self.rtt else ""})"
+
+	@classmethod
+	def from_json(cls, data: dict[str, Any]) -> "DiscoveredConsole":
+		return cls(data["host"], data["port"], data.get("name"), data.get("rtt", 0.0))
+
+async def probe(host: str, port: int = DEFAULT_PORT, timeout: float = PROBE_TIMEOUT) -> Optional[DiscoveredConsole]:
+	"""Returns the console at host:port, or None if nothing there answers like one within timeout."""
+	writer = None
+	try:
+		async with asyncio.timeout(timeout):
+			reader, writer = await asyncio.open_connection(host, port, happy_eyeballs_delay=HAPPY_EYEBALLS_DELAY, interleave=1)
+			start = time.perf_counter()
+			writer.write(b"get /devices/0/DeviceName/value\x00")
+			await writer.drain()
+			reply = json.loads((await reader.readuntil(b"\x00"))[:-1])
+			rtt = time.perf_counter() - start
+	except (OSError, TimeoutError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+		return None
+	finally:
+		if writer is not None:
+			writer.close()
+	if not isinstance(reply, dict) or "path" not in reply:
+		return None
+	name = reply.get("data")
+	return DiscoveredConsole(host, port, name if isinstance(name, str) else None, rtt)
+
+async def first_responder(targets: Iterable[tuple[str, int]], timeout: float = PROBE_TIMEOUT) -> Optional[DiscoveredConsole]:
+	"""Probes every (host, port) in targets at once and returns the first console to answer, cancelling the rest."""
+	probes = [asyncio.ensure_future(probe(host, port, timeout)) for host, port in targets]
+	try:
+		for next_probe in asyncio.as_completed(probes):
+			console = await next_probe
+			if console is not None:
+				return console
+		return None
+	finally:
+		for pending in probes:
+			pending.cancel()
+
+def local_addresses() -> list[IPv4Address]:
+	"""The host's own non-loopback IPv4 addresses, found without any extra dependencies."""
+	addresses: set[IPv4Address] = set()
+	try:
+		for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+			addresses.add(IPv4Address(info[4][0]))
+	except OSError:
+		pass
+	# Connecting a UDP socket sends nothing, but makes the OS pick the address of the default route's interface.
+	try:
+		with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+			s.connect(("192.0.2.1", 9))
+			addresses.add(IPv4Address(s.getsockname()[0]))
+	except OSError:
+		pass
+	return sorted(address for address in addresses if not address.is_loopback and not address.is_link_local and not address.is_unspecified)
+
+def local_subnets(addresses: Optional[Iterable[IPv4Address]] = None) -> list[IPv4Network]:
+	networks = {IPv4Interface(f"{address}/{SUBNET_PREFIX}").network for address in (local_addresses() if addresses is None else addresses)}
+	return sorted(networks)
+
+def scan_targets(networks: Iterable[IPv4Network], port: int = DEFAULT_PORT) -> list[tuple[str, int]]:
+	"""Every host address of networks, once, paired with port. The console's own machine is always included first."""
+	targets = {("127.0.0.1", port): None}
+	for network in networks:
+		for host in network.hosts():
+			targets.setdefault((str(host), port), None)
+	return list(targets)
+
+async def scan(targets: Iterable[tuple[str, int]], timeout: float = PROBE_TIMEOUT, concurrency: int = MAX_CONCURRENT_PROBES) -> list[DiscoveredConsole]:
+	"""Probes every (host, port) in targets, at most concurrency at a time. Returns the consoles found, fastest first."""
+	semaphore = asyncio.Semaphore(concurrency)
+
+	async def bounded_probe(host: str, port: int) -> Optional[DiscoveredConsole]:
+		async with semaphore:
+			return await probe(host, port, timeout)
+	start = time.perf_counter()
+	targets = list(targets)
+	results = await asyncio.gather(*(bounded_probe(host, port) for host, port in targets))
+	consoles = sorted((console for console in results if console is not None), key=lambda console: console.rtt)
+	metrics.record("Discovery addresses probed", len(targets))
+	metrics.record("Discovery consoles found", len(consoles))
+	metrics.record("Discovery scan time (s)", time.perf_counter() - start)
+	return consoles
+
+async def scan_local_network(port: int = DEFAULT_PORT, timeout: float = PROBE_TIMEOUT) -> list[DiscoveredConsole]:
+	return await scan(scan_targets(local_subnets(), port), timeout)
+
+class DiscoveryCache:
+	"""The last scan's results and the console last connected to, in one small JSON file."""
+	def __init__(self, cache_file: Path):
+		self.cache_file = Path(cache_file)
+
+	def load(self) -> dict[str, Any]:
+		try:
+			with open(self.cache_file, encoding="utf-8") as f:
+				data = json.load(f)
+		except (OSError, ValueError):
+			return {}
+		return data if isinstance(data, dict) else {}
+
+	def save(self, data: dict[str, Any]):
+		self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+		tmp_file = self.cache_file.with_suffix(".tmp")
+		with open(tmp_file, "w", encoding="utf-8") as f:
+			json.dump(data, f)
+		os.replace(tmp_file, self.cache_file)
+
+	def consoles(self) -> list[DiscoveredConsole]:
+		try:
+			return [DiscoveredConsole.from_json(console) for console in self.load().get("consoles", [])]
+		except (KeyError, TypeError):
+			return []
+
+	def recent(self) -> list[DiscoveredConsole]:
+		"""Consoles connected to before, most recent first."""
+		try:
+			return [DiscoveredConsole.from_json(console) for console in self.load().get("recent", [])]
+		except (KeyError, TypeError):
+			return []
+
+	def last(self) -> Optional[DiscoveredConsole]:
+		recent = self.recent()
+		return recent[0] if recent else None
+
+	def store_scan(self, consoles: list[DiscoveredConsole]):
+		data = self.load()
+		data["consoles"] = [asdict(console) for console in consoles]
+		data["scanned_at"] = time.time()
+		self.save(data)
+
+	def remember(self, host: str, port: int = DEFAULT_PORT, name: Optional[str] = None):
+		"""Records the console connected to at the front of the recent list, so the next launch tries it again."""
+		data = self.load()
+		recent = [console for console in self.recent() if (console.host, console.port) != (host, port)]
+		recent.insert(0, DiscoveredConsole(host, port, name, 0.0))
+		data["recent"] = [asdict(console) for console in recent[:MAX_RECENT]]
+		self.save(data)
+
+instance: Optional[DiscoveryCache] = None
@@ -10,165 +10,174 @@ from . import network, speech
 async def on_selected_on_front_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
+	name: Optional[str] = sender.get_name(path, properties)
 	if data:
 		if name is None:
-			speech.speak("Unknown device selected")
+			speech.speak(network.registry.tag(sender, "Unknown device selected"))
 		else:
-			speech.speak(f"{name} selected")
-	network.instance.cache[path] = data
+			speech.speak(network.registry.tag(sender, f"{name} selected"))
+	sender.cache[path] = data
 
 async def on_48_v_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} 48V {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} 48V {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_cr_monitor_level_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} level {data}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} level {data}"))
+	sender.cache[path] = data
 
 async def on_device_name_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
-	speech.speak(f"Device name changed to {data}")
-	network.instance.cache[path] = data
+	speech.speak(network.registry.tag(sender, f"Device name changed to {data}"))
+	sender.cache[path] = data
 
 async def on_dim_on_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} dim {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} dim {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_gain_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} gain {data:.1F}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} gain {data:.1F}"))
+	sender.cache[path] = data
 
 async def on_hi_z_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} Hi Z {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} Hi Z {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_io_type_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} IO type {data}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} IO type {data}"))
+	sender.cache[path] = data
 
 async def on_low_cut_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} low cut {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} low cut {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_mix_to_mono_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} sum {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} sum {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_mute_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} mute {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} mute {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_pad_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} pad {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} pad {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_stereo_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} stereo link {"on" if data else"off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} stereo link {"on" if data else"off"}"))
+	sender.cache[path] = data
 
 async def on_talkback_on_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
-	speech.speak(f"Talkback {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	speech.speak(network.registry.tag(sender, f"Talkback {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_device_online_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 async def on_ua_access_initialized(sender, *args, **kwargs):
-	speech.speak("UA Access is ready")
+	speech.speak(network.registry.tag(sender, "UA Access is ready"))
+
+async def on_connection_slow(sender, **kwargs):
+	speech.speak(network.registry.tag(sender, f"Warning: the connection is slow, {kwargs['srtt'] * 1000:.0F} milliseconds"))
+
+async def on_connection_recovered(sender, **kwargs):
+	speech.speak(network.registry.tag(sender, "The connection is responsive again"))
+
+async def on_connection_lost(sender, **kwargs):
+	speech.speak(network.registry.tag(sender, f"Connection lost: nothing received for {kwargs['silence']:.0F} seconds"))
 
 async def on_phase_changed(sender, **kwargs):
 	path = kwargs["path"]
 	data = kwargs["data"]
-	if path in network.instance.cache and network.instance.cache[path] == data:
+	if path in sender.cache and sender.cache[path] == data:
 		return
 	properties: list[str] = ["Name", "EffectName", "DeviceName"]
-	name: Optional[str] = network.instance.get_name(path, properties)
-	speech.speak(f"{name} phase {"on" if data else "off"}")
-	network.instance.cache[path] = data
+	name: Optional[str] = sender.get_name(path, properties)
+	speech.speak(network.registry.tag(sender, f"{name} phase {"on" if data else "off"}"))
+	sender.cache[path] = data
 
 def register_events():
 	signal("SelectedOnFront").connect(on_selected_on_front_changed)
@@ -187,4 +196,7 @@ def register_events():
 	signal("TalkbackOn").connect(on_talkback_on_changed)
 	signal("DeviceOnline").connect(on_device_online_changed)
 	signal("UAAccessInitialized").connect(on_ua_access_initialized)
+	signal("ConnectionSlow").connect(on_connection_slow)
+	signal("ConnectionRecovered").connect(on_connection_recovered)
+	signal("ConnectionLost").connect(on_connection_lost)
 	signal("Phase").connect(on_phase_changed)
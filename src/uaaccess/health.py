@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+health.py
+
+Keeps an eye on the link to a console.
+
+Every few seconds a `get /uaaccess_ping?seq=N` is sent. The path does not exist, so the console answers at once with
+an error that echoes the parameters, the same trick the ready sentinel uses. That reply gives a round-trip time, which
+is smoothed as TCP does (RFC 6298): SRTT with gain 1/8 and the mean deviation, reported as jitter, with gain 1/4.
+
+A connection that has been silent for longer than the silence timeout (no pings answered, no updates) is treated as
+half-open and aborted, so the receive loop ends instead of waiting forever on a peer that has gone away. Crossing the
+latency threshold, coming back under it and losing the connection are announced through signals, which the
+interface turns into speech.
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+from blinker import signal
+
+from . import metrics
+
+PING_INTERVAL = 2.0
+SILENCE_TIMEOUT = 10.0
+# Smoothed RTT above which the user is warned. The warning clears once it falls below RECOVERY_FRACTION of this, so a
+# reading that hovers around the threshold does not repeat the warning on every ping.
+LATENCY_WARNING = 0.25
+RECOVERY_FRACTION = 0.8
+PING_PATH = "/uaaccess_ping"
+# Found in every ping reply, so the receive loop can recognise one without parsing it.
+PING_REPLY_MARKER = f'"{PING_PATH}"'.encode()
+
+class HealthMonitor:
+	def __init__(self, manager: Any, interval: float = PING_INTERVAL, silence_timeout: float = SILENCE_TIMEOUT, latency_warning: float = LATENCY_WARNING):
+		self.manager = manager
+		self.interval = interval
+		self.silence_timeout = silence_timeout
+		self.latency_warning = latency_warning
+		self.seq = 0
+		# Sequence number to send time of every ping not answered yet.
+		self.sent: dict[int, float] = {}
+		self.answered = 0
+		self.last_rtt: Optional[float] = None
+		self.srtt: Optional[float] = None
+		self.jitter = 0.0
+		self.slow = False
+		self.task: Optional[asyncio.Task] = None
+
+	@property
+	def section(self) -> str:
+		return f"Connection to {self.manager.name or 'console'}"
+
+	def start(self):
+		self.task = asyncio.get_running_loop().create_task(self.run())
+		metrics.register_section(self.section, self.render)
+
+	def stop(self):
+		if self.task is not None:
+			self.task.cancel()
+			self.task = None
+		metrics.unregister_section(self.section)
+
+	async def run(self):
+		while True:
+			await self.ping()
+			await asyncio.sleep(self.interval)
+			if await self.check_silence():
+				return
+
+	async def ping(self):
+		self.seq += 1
+		self.sent[self.seq] = time.monotonic()
+		# Pings that were never answered only matter for the count of lost ones.
+		for seq in [seq for seq in self.sent if seq < self.seq - 100]:
+			del self.sent[seq]
+		await self.manager.send_request(f"get {PING_PATH}?seq={self.seq}", log=False)
+
+	async def on_pong(self, seq: Any):
+		try:
+			sent = self.sent.pop(int(seq))
+		except (KeyError, TypeError, ValueError):
+			return
+		rtt = time.monotonic() - sent
+		self.answered += 1
+		self.last_rtt = rtt
+		if self.srtt is None:
+			self.srtt, self.jitter = rtt, rtt / 2
+		else:
+			self.jitter = 0.75 * self.jitter + 0.25 * abs(self.srtt - rtt)
+			self.srtt = 0.875 * self.srtt + 0.125 * rtt
+		if not self.slow and self.srtt > self.latency_warning:
+			self.slow = True
+			await signal("ConnectionSlow").send_async(self.manager, srtt=self.srtt, jitter=self.jitter)
+		elif self.slow and self.srtt < self.latency_warning * RECOVERY_FRACTION:
+			self.slow = False
+			await signal("ConnectionRecovered").send_async(self.manager, srtt=self.srtt, jitter=self.jitter)
+
+	def silence(self) -> float:
+		return time.monotonic() - self.manager.last_heard
+
+	async def check_silence(self) -> bool:
+		"""Aborts the connection if the console has been silent for too long. Returns whether it did."""
+		silence = self.silence()
+		if silence <= self.silence_timeout:
+			return False
+		await signal("ConnectionLost").send_async(self.manager, silence=silence)
+		# Aborting ends the receive loop with an error, the same way a reset from the console would.
+		self.manager.writer.transport.abort()
+		return True
+
+	def render(self) -> list[str]:
+		if self.srtt is None:
+			lines = ["Round-trip time: not measured yet"]
+		else:
+			lines = [
+				f"Smoothed round-trip time: {self.srtt * 1000:.1F} ms",
+				f"Jitter: {self.jitter * 1000:.1F} ms",
+				f"Last round-trip time: {self.last_rtt * 1000:.1F} ms",
+			]
+		lines.append(f"Last heard: {self.silence():.1F} s ago")
+		lines.append(f"Pings answered: {self.answered} of {self.seq}")
+		return lines
@@ -0,0 +1,35 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+metrics.py
+
+A tiny in-process metrics surface. Subsystems record named values or register sections that render themselves on
+demand, and the Debugging menu shows everything through `report()`.
+"""
+
+from typing import Any, Callable
+
+values: dict[str, Any] = {}
+sections: dict[str, Callable[[], list[str]]] = {}
+
+def record(name: str, value: Any):
+	values[name] = value
+
+def register_section(title: str, render: Callable[[], list[str]]):
+	sections[title] = render
+
+def unregister_section(title: str):
+	sections.pop(title, None)
+
+def format_value(value: Any) -> str:
+	if isinstance(value, float):
+		return f"{value:.3F}"
+	return str(value)
+
+def report() -> str:
+	lines: list[str] = [f"{name}: {format_value(value)}" for name, value in sorted(values.items())]
+	for title, render in sections.items():
+		lines.append("")
+		lines.append(title)
+		lines.extend(render())
+	return '\n'.join(lines)
@@ -8,19 +8,89 @@ if sys.platform == "darwin":
 	import json
 else:
 	from cysimdjson import JSONParser
+import re
 import time
-from ipaddress import IPv4Address, IPv6Address
+from collections.abc import Mapping
+from dataclasses import dataclass
+from ipaddress import IPv4Address, IPv6Address, ip_address
 from typing import Any, Optional, Union
 
 from blinker import signal
 
+from . import descriptors, profiling, tree
+from .descriptors import InvalidValueError, PropertyDescriptor
+from .health import PING_PATH, PING_REPLY_MARKER, HealthMonitor
+from .plugin_catalog import PluginCatalog
+from .preset_index import PresetIndex
+from .profiling import ProfileScope
+from .search_index import SearchIndex
+from .tree import TreeSnapshot, Value
+
+class ConsoleError(Exception):
+	"""The console answered a request with an error."""
+
+# Sent for every property change, after the signal named after the property itself.
+property_changed = signal("PropertyChanged")
+
+DEFAULT_PORT = 4710
+# Bounds the whole connection attempt, name resolution included, so an unreachable host cannot hang startup.
+CONNECT_TIMEOUT = 5.0
+# Bounds loading the tree once connected, so a console that accepts but never answers cannot hang startup.
+PRELOAD_TIMEOUT = 30.0
+# How long an attempt on one resolved address gets before the next address is tried alongside it (RFC 8305).
+HAPPY_EYEBALLS_DELAY = 0.25
+HOSTNAME_PATTERN = re.compile(r"(?!-)[A-Za-z0-9-]{1,63}(?<!-)(\.(?!-)[A-Za-z0-9-]{1,63}(?<!-))*\.?")
+
+def parse_address(text: str, default_port: int = DEFAULT_PORT) -> tuple[str, int]:
+	"""
+	Splits what a user typed into a host and port. Accepts hostnames and IP addresses, optionally followed by
+	`:port`; IPv6 addresses need brackets (`[fe80::1]:4710`) when a port is given.
+	"""
+	text = text.strip()
+	port: Union[int, str] = default_port
+	if text.startswith('['):
+		host, bracket, rest = text[1:].partition(']')
+		if not bracket or (rest and not rest.startswith(':')):
+			raise ValueError(f"{text} is not a valid address")
+		port = rest[1:] or default_port
+	elif text.count(':') == 1:
+		host, _, port = text.partition(':')
+	else:
+		host = text
+	try:
+		port = int(port)
+	except ValueError:
+		raise ValueError(f"{port} is not a valid port") from None
+	if not 0 < port < 65536:
+		raise ValueError(f"{port} is not a valid port")
+	try:
+		host = str(ip_address(host))
+	except ValueError:
+		if len(host) > 253 or not HOSTNAME_PATTERN.fullmatch(host):
+			raise ValueError(f"{host or text!r} is not a valid IP address or hostname") from None
+	return host, port
+# Seconds to wait for the console to echo an edit before asking it for the value instead.
+EDIT_TIMEOUT = 5.0
+
+@dataclass
+class PendingEdit:
+	token: int
+	value: Value
+	sent: float
+
+if sys.platform != "darwin":
+	# Shared by every connection: documents are exported as soon as they are parsed, so one parser is enough.
+	json_parser = JSONParser()
 
 class NetworkManager:
-	def __init__(self):
+	def __init__(self, log_packets: Optional[bool] = None):
 		self.writer = None
 		self.reader = None
 		self.tree = {}
 		self.cache = {}
+		self.plugin_catalog: Optional[PluginCatalog] = None
+		self.search_index: Optional[SearchIndex] = None
+		self.preset_indexes: dict[str, PresetIndex] = {}
 		self.friendly_prop_map = {
 			"CRMonitorLevel": "Level",
 			"DimOn": "Dim",
@@ -33,10 +103,24 @@ class NetworkManager:
 			"RecordPreEffects": "Record Effects",
 			"SendPostFader": "Pre/Post"
 		}
-		if sys.platform != "darwin":
-			self.json_parser = JSONParser()
+		# Identifies this console in announcements and in the console switcher.
+		self.name = ""
+		self.receive_task: Optional[asyncio.Task] = None
+		# Futures waiting for the reply to a get, by path.
+		self.pending: dict[str, list[asyncio.Future]] = {}
+		self.loaded_devices: set[str] = set()
+		self.health: Optional[HealthMonitor] = None
+		# Local edits applied to the tree before the console confirmed them: value path to the edits still awaiting
+		# their echo, oldest first, and the value the console last confirmed, to roll back to.
+		self.edits: dict[str, list[PendingEdit]] = {}
+		self.confirmed: dict[str, Value] = {}
+		self.edit_token = 0
+		# time.monotonic() of the last data received, for telling a quiet console from a half-open connection.
+		self.last_heard = 0.0
 		self.handle_events_normally = asyncio.Event()
-		if sys.executable.find("python") != -1:
+		# Packets are logged when running from source unless the caller decides otherwise.
+		self.log_packets = sys.executable.find("python") != -1 if log_packets is None else log_packets
+		if self.log_packets:
 			self.packet_log = []
 
 	def get_name(self, path: str, properties: list[str]) -> Optional[str]:
@@ -107,88 +191,282 @@ class NetworkManager:
 		plugins = self.get("/plugins")
 		return None if plugins is None else plugins["children"]
 
+	def get_plugin_catalog(self) -> PluginCatalog:
+		if self.plugin_catalog is None:
+			self.plugin_catalog = PluginCatalog(self.get_all_plugins())
+			self.plugin_catalog.connect(self)
+		return self.plugin_catalog
+
+	def get_search_index(self) -> SearchIndex:
+		"""
+		The Quick jump index over the loaded devices and the plugins. Rebuilt once another device has been loaded or
+		plugins have been inserted or removed; renames are followed by the index itself.
+		"""
+		plugins = frozenset(self.get_all_plugins() or ())
+		if self.search_index is not None and (self.search_index.devices != self.loaded_devices or self.search_index.plugins != plugins):
+			self.search_index.disconnect()
+			self.search_index = None
+		if self.search_index is None:
+			self.search_index = SearchIndex(self.snapshot().data, self.device_ids_loaded(), self.prop_display_name)
+			self.search_index.connect(self)
+		return self.search_index
+
+	def get_preset_index(self, plugin: str) -> PresetIndex:
+		values = self.get(f"/plugins/{plugin}/Preset/values") or []
+		index = self.preset_indexes.get(plugin)
+		# The index is only reused while the tree still holds the very list it was built from.
+		if index is None or index.source is not values:
+			index = self.preset_indexes[plugin] = PresetIndex(values)
+		return index
+
 	def get_all_preamp_effect_parameters(self, device: int, input: int) -> Optional[dict[str, Any]]:
 		parameters = self.get(f"/devices/{device}/inputs/{input}/preamps/0/effects/0/parameters")
 		return None if parameters is None else parameters["children"]
 
 	def get(self, path: str) -> Optional[Union[dict[str, Any], bool, int, str, float]]:
-		parts: list[str] = path.strip('/').split('/')
-		current: Any = self.tree['data']
-		for i, part in enumerate(parts):
-			if 'properties' in current and part[0].isupper():
-				if part in current['properties']:
-					current = current['properties'][part]
-				else:
-					return None	 # Part not found in properties
-			elif 'children' in current:
-				if part in current['children']:
-					current = current['children'][part]
-				else:
-					return None	 # Part not found in children
-			else:
-				# If neither 'properties' nor 'children' can handle it, check for direct key access
-				if part in current:
-					current = current[part]
-				else:
-					return None	 # Direct key not found
-
-			if current is None:
-				return None	 # Check if navigation resulted in None
-
-		return current
+		return tree.resolve(self.tree, path)
 
 	def set(self, path: str, value: Union[bool, int, str, float]):
-		parts: list[str] = path.strip('/').split('/')
-		current: Any = self.tree['data']
-		last_part: str = parts[-1]
-		for part in parts:
-			if 'properties' in current and part in current['properties']:
-				current = current['properties'][part]
-				break
-			elif 'children' in current and part in current['children']:
-				current = current['children'][part]
-			elif 'commands' in current and part in current['commands']:
-				break
-		current[last_part] = value
+		# Copy-on-write: snapshots handed out earlier keep seeing the old version.
+		self.tree = tree.assoc(self.tree, path, value)
+
+	def snapshot(self) -> TreeSnapshot:
+		"""Returns a consistent, read-only view of the current tree. Taking one is O(1)."""
+		return TreeSnapshot(self.tree)
 
-	async def preload_tree(self, ipaddr: Union[IPv4Address, IPv6Address]):
+	async def preload_tree(self, ipaddr: Union[IPv4Address, IPv6Address, str], port: int = DEFAULT_PORT, device: Optional[str] = None, timeout: float = PRELOAD_TIMEOUT):
+		"""
+		Connects and loads everything except the devices, which are only listed. Then loads and subscribes to one device
+		(device, or the first one); the others are loaded on demand by load_device. Raises ConnectionError if the
+		console drops the connection meanwhile, and TimeoutError if loading takes longer than timeout.
+		"""
 		self.loop = asyncio.get_running_loop()
-		await self.connect_to_server(ipaddr, 4710)
-		await self.send_request("get /?recursive=1")
-		await self.safe_recv()
-		await self.send_request("subscribe /?recursive=1")
+		await self.connect_to_server(ipaddr, port)
+		self.receive_task = self.loop.create_task(self.handle_responses_continuously())
+		self.receive_task.add_done_callback(self.on_receive_done)
+		async with asyncio.timeout(timeout):
+			root = await self.fetch("/", recursive=False)
+			sections = [name for name in root.get("children", {}) if name != "devices"]
+			await asyncio.gather(self.fetch("/devices", recursive=False), *(self.fetch(f"/{name}") for name in sections))
+			await self.send_requests(["subscribe /devices", *(f"subscribe /{name}?recursive=1" for name in sections)])
+			devices = self.device_ids()
+			if devices:
+				await self.load_device(device if device in devices else devices[0])
 		await self.send_request("get /uaaccess_is_ready?handle_events_normally=1")
-		self.loop.create_task(self.handle_responses_continuously())
+
+	def on_receive_done(self, task: asyncio.Task):
+		"""Fails the requests still waiting for a reply once the receive loop has ended, as none will ever come."""
+		if task.cancelled():
+			return
+		error = ConnectionError("The connection to the console was lost")
+		error.__cause__ = task.exception()
+		for futures in self.pending.values():
+			for future in futures:
+				if not future.done():
+					future.set_exception(error)
+		self.pending.clear()
+
+	async def fetch(self, path: str, recursive: bool = True) -> Any:
+		"""Sends a get for path and waits until its reply has been merged into the tree. Returns the reply's data."""
+		if self.receive_task is not None and self.receive_task.done():
+			raise ConnectionError("The connection to the console was lost")
+		key = '/' + path.strip('/')
+		future = self.loop.create_future()
+		self.pending.setdefault(key, []).append(future)
+		try:
+			await self.send_request(f"get {path}{"?recursive=1" if recursive else ""}")
+			return await future
+		finally:
+			# A fetch that timed out or was cancelled must not linger until a reply that may never come.
+			futures = self.pending.get(key)
+			if futures is not None and future in futures:
+				futures.remove(future)
+				if not futures:
+					del self.pending[key]
+
+	def resolve_pending(self, path: str, data: Any = None, error: Optional[str] = None):
+		for future in self.pending.pop('/' + path.strip('/'), []):
+			if future.done():
+				continue
+			if error is None:
+				future.set_result(data)
+			else:
+				future.set_exception(ConsoleError(f"{path}: {error}"))
+
+	def device_ids(self) -> list[str]:
+		devices = self.get("/devices")
+		if not devices:
+			return []
+		return sorted(devices.get("children", {}), key=lambda id: (len(id), id))
+
+	def device_ids_loaded(self) -> list[str]:
+		return [device for device in self.device_ids() if device in self.loaded_devices]
+
+	def is_device_loaded(self, device: str) -> bool:
+		return str(device) in self.loaded_devices
+
+	async def load_device(self, device: Union[int, str]):
+		"""Loads a device's subtree and subscribes to it, unless that has already happened."""
+		device = str(device)
+		if device in self.loaded_devices:
+			return
+		self.loaded_devices.add(device)
+		try:
+			await self.fetch(f"/devices/{device}")
+			await self.send_request(f"subscribe /devices/{device}?recursive=1")
+		except BaseException:
+			self.loaded_devices.discard(device)
+			raise
+
+	async def load_devices_for(self, paths: list[str]):
+		"""Loads the devices that any of paths lies under."""
+		devices = set(self.device_ids())
+		needed = {parts[1] for parts in (path.strip('/').split('/') for path in paths) if len(parts) > 1 and parts[0] == "devices"}
+		await asyncio.gather(*(self.load_device(device) for device in needed & devices))
+
+	async def load_all_devices(self):
+		await asyncio.gather(*(self.load_device(device) for device in self.device_ids()))
+
+	def descriptor(self, path: str) -> PropertyDescriptor:
+		"""Returns the descriptor for the property owning the value path. Raises InvalidValueError if there is none."""
+		if not path.endswith("/value"):
+			raise InvalidValueError(f"{path} is not a property value")
+		prop = self.get(path.removesuffix("/value"))
+		if not isinstance(prop, Mapping) or "type" not in prop:
+			raise InvalidValueError(f"{path} is not a property value")
+		return descriptors.descriptor_for(prop)
+
+	async def set_value(self, path: str, value: Any) -> Value:
+		"""
+		Sets a property to value after checking it against the property's metadata: converted to its type, clamped to
+		its range, and refused with InvalidValueError if it cannot be valid, without contacting the console. The
+		change is applied optimistically, as with apply_edit. Returns the value sent.
+		"""
+		value = self.descriptor(path).coerce(value)
+		await self.apply_edit(path, value)
+		return value
+
+	async def set_values(self, values: list[tuple[str, Any]]) -> list[tuple[str, Value]]:
+		"""set_value for several properties, sent in one write. Nothing is sent if any value is invalid."""
+		edits = [(path, self.descriptor(path).coerce(value)) for path, value in values]
+		await self.apply_edits(edits)
+		return edits
+
+	async def apply_edit(self, path: str, value: Any):
+		"""Sets a property the user changed. See apply_edits."""
+		await self.apply_edits([(path, value)])
+
+	async def apply_edits(self, edits: list[tuple[str, Any]]):
+		"""
+		Sets properties to already valid values, optimistically: each value path is updated in the tree and announced right
+		away, then the sets go out in one write. The console's echo of an edit is swallowed; an echo with a different
+		value, or an error, puts the tree back in line with the console.
+		"""
+		requests = []
+		for path, value in edits:
+			requests.append(f"set {path} {tree.encode_value(value)}")
+			current = self.get(path)
+			if not path.endswith("/value") or current is None or isinstance(current, dict):
+				continue
+			pending = self.edits.get(path)
+			if not pending and value == current:
+				# Nothing will change, so the console may not answer at all.
+				continue
+			if not pending:
+				pending = self.edits[path] = []
+				self.confirmed[path] = current
+			self.edit_token += 1
+			pending.append(PendingEdit(self.edit_token, value, time.monotonic()))
+			asyncio.get_running_loop().call_later(EDIT_TIMEOUT, self.expire_edit, path, self.edit_token)
+			self.set(path, value)
+			await self.emit(path, value)
+		await self.send_requests(requests)
+
+	def reconcile_edit(self, path: str, data: Any) -> bool:
+		"""
+		Matches a value from the console against the edits pending for path. Returns whether it is the echo of one of
+		them and should be dropped. Anything else ends the pending edits: the console's value wins.
+		"""
+		pending = self.edits.get(path)
+		for i, edit in enumerate(pending):
+			if edit.value == data:
+				del pending[:i + 1]
+				if pending:
+					self.confirmed[path] = data
+				else:
+					del self.edits[path]
+					del self.confirmed[path]
+				return True
+		del self.edits[path]
+		del self.confirmed[path]
+		return False
+
+	async def roll_back_edit(self, path: str):
+		"""The console refused an edit to path: restores the value it last confirmed."""
+		if path not in self.edits:
+			return
+		del self.edits[path]
+		value = self.confirmed.pop(path)
+		self.set(path, value)
+		await self.emit(path, value)
+
+	def expire_edit(self, path: str, token: int):
+		"""Gives up on the echo of an edit and asks the console for the value instead, which then settles the tree."""
+		pending = self.edits.get(path)
+		if not pending or all(edit.token != token for edit in pending) or self.writer is None or self.writer.is_closing():
+			return
+		del self.edits[path]
+		del self.confirmed[path]
+		asyncio.ensure_future(self.send_request(f"get {path}"))
 
 	async def safe_recv(self):
 		"""Accumulate data from the socket and yield complete messages."""
 		data_buffer: bytearray = bytearray()
 		tmp_buffer: bytearray = await self.reader.readuntil(b'\x00')
+		self.last_heard = time.monotonic()
 		data_buffer.extend(tmp_buffer)
 		while b'\x00' not in data_buffer:
 			tmp_buffer = await self.reader.readuntil(b'\x00')
 			data_buffer.extend(tmp_buffer)
 		while b'\x00' in data_buffer:
 			message, _, data_buffer = data_buffer.partition(b'\x00')
-			if sys.executable.find("python") != -1:
+			# Ping replies arrive every few seconds for as long as the app runs and would bury the real traffic.
+			if self.log_packets and PING_REPLY_MARKER not in message:
 				self.packet_log.append({"time": time.time(), "type": "recv", "message": message.decode()})
 				await signal("NewPacket").send_async(self, packet=self.packet_log[-1])
-			await self.process_message(bytes(message))
+			await profiling.scoped(ProfileScope.NETWORK, self.process_message(bytes(message)))
 
-	async def send_request(self,  request: str):
+	async def send_request(self,  request: str, log: bool = True):
 		"""Sends a request to the server, ensuring it ends with '\x00'."""
-		if sys.executable.find("python") != -1:
-			self.packet_log.append({"time": time.time(), "type": "send", "message": request})
-			await signal("NewPacket").send_async(self, packet=self.packet_log[-1])
-		if not request.endswith('\x00'):
-			request += '\x00'
-		request = request.encode()
-		self.writer.write(request)
+		await self.send_requests([request], log)
+
+	async def send_requests(self, requests: list[str], log: bool = True):
+		"""
+		Sends several requests pipelined into a single write, waiting for the transport to drain only once. log=False
+		keeps them out of the packet log.
+		"""
+		if not requests:
+			return
+		payload = bytearray()
+		for request in requests:
+			if self.log_packets and log:
+				self.packet_log.append({"time": time.time(), "type": "send", "message": request})
+				await signal("NewPacket").send_async(self, packet=self.packet_log[-1])
+			if not request.endswith('\x00'):
+				request += '\x00'
+			payload += request.encode()
+		self.writer.write(payload)
 		await self.writer.drain()
 
-	async def connect_to_server(self, address: Union[IPv4Address, IPv6Address], port: int):
-		self.reader, self.writer = await asyncio.open_connection(str(address), 4710, limit=2**32)
-		if sys.executable.find("python") != -1:
+	async def connect_to_server(self, address: Union[IPv4Address, IPv6Address, str], port: int, timeout: float = CONNECT_TIMEOUT):
+		"""
+		Resolves address and connects to it. When a hostname resolves to several addresses, IPv6 and IPv4 ones are
+		interleaved and raced Happy Eyeballs style: the first connection to succeed is kept and the others are closed.
+		"""
+		async with asyncio.timeout(timeout):
+			self.reader, self.writer = await asyncio.open_connection(str(address), port, limit=2**32, happy_eyeballs_delay=HAPPY_EYEBALLS_DELAY, interleave=1)
+		self.last_heard = time.monotonic()
+		if self.log_packets:
 			self.packet_log.append({"time": time.time(), "type": "conn", "message": None})
 
 	async def process_message(self, message: bytes):
@@ -196,13 +474,19 @@ class NetworkManager:
 		if sys.platform == "darwin":
 			resp = json.loads(message.decode())
 		else:
-			resp = self.json_parser.loads(message.decode()).export()
+			resp = json_parser.loads(message.decode()).export()
 		if "path" in resp and resp["path"] == "/uaaccess_is_ready" and "parameters" in resp and "handle_events_normally" in resp["parameters"]:
 			self.handle_events_normally.set()
 			await signal("UAAccessInitialized").send_async(self)
 			return
+		if resp.get("path") == PING_PATH:
+			if self.health is not None:
+				await self.health.on_pong(resp.get("parameters", {}).get("seq"))
+			return
 		if "error" in resp:
 			print (f"Warning: {resp["path"]}: {resp["error"]}")
+			self.resolve_pending(resp["path"], error=resp["error"])
+			await self.roll_back_edit(resp["path"])
 			return
 		if "data" not in resp or "path" not in resp:
 			print(f"Warning: received invalid response: {message}")
@@ -210,18 +494,134 @@ class NetworkManager:
 		data: Union[dict[str, Any], int, float, bool] = resp['data']
 		path: str = resp['path']
 		if not isinstance(data, dict) or "children" not in data or "properties" not in data:
+			if self.edits and path in self.edits and self.reconcile_edit(path, data):
+				return
 			self.set(path, data)
+			self.resolve_pending(path, data)
 			if not self.handle_events_normally.is_set():
 				return
-			components: list[str] = path.strip('/').split('/')
-			propname: str = components[-2] if components[-1] == "value" else components[-1]
-			sig = signal(propname)
-			await sig.send_async(self, path=path, data=data)
+			await self.emit(path, data)
 		else:
-			self.tree = resp
+			plugins = self.get("/plugins") if self.tree else None
+			# Only the differences are applied, so references into unchanged subtrees stay valid.
+			self.tree, changes = tree.merge(self.tree, path, tree.compact(data))
+			if self.get("/plugins") is not plugins:
+				if self.plugin_catalog is not None:
+					self.plugin_catalog.disconnect()
+					self.plugin_catalog = None
+				if self.search_index is not None:
+					self.search_index.disconnect()
+					self.search_index = None
+			self.resolve_pending(path, data)
+			if not self.handle_events_normally.is_set():
+				return
+			for changed_path, value in changes:
+				await self.emit(changed_path, value)
+
+	async def emit(self, path: str, data: Union[bool, int, str, float]):
+		components: list[str] = path.strip('/').split('/')
+		propname: str = components[-2] if components[-1] == "value" else components[-1]
+		sig = signal(propname)
+		await sig.send_async(self, path=path, data=data)
+		if property_changed.receivers:
+			await property_changed.send_async(self, path=path, data=data)
 
 	async def handle_responses_continuously(self):
 		while True:
 			await self.safe_recv()
 
-instance: Optional[NetworkManager] = None
\ No newline at end of file
+	def start_health_monitor(self, **kwargs):
+		"""Starts pinging the console to measure latency and detect a dead connection. See health.HealthMonitor."""
+		if self.health is None:
+			self.health = HealthMonitor(self, **kwargs)
+			self.health.start()
+
+	def close(self):
+		self.edits.clear()
+		self.confirmed.clear()
+		if self.health is not None:
+			self.health.stop()
+			self.health = None
+		for futures in self.pending.values():
+			for future in futures:
+				future.cancel()
+		self.pending.clear()
+		if self.receive_task is not None:
+			self.receive_task.cancel()
+		if self.writer is not None:
+			self.writer.close()
+		if self.plugin_catalog is not None:
+			self.plugin_catalog.disconnect()
+			self.plugin_catalog = None
+		if self.search_index is not None:
+			self.search_index.disconnect()
+			self.search_index = None
+
+class ConnectionRegistry:
+	"""
+	Every console this session is connected to, by name. `network.instance` always refers to the active one.
+
+	All connections share the running event loop and the process-wide signals: events carry the NetworkManager that
+	received them as their sender, so handlers can tell consoles apart (or subscribe to a single one with blinker's
+	`sender=` argument).
+	"""
+	def __init__(self):
+		self.consoles: dict[str, NetworkManager] = {}
+		self.active: Optional[str] = None
+
+	def __len__(self) -> int:
+		return len(self.consoles)
+
+	def __iter__(self):
+		return iter(self.consoles.values())
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.consoles
+
+	def get(self, name: str) -> Optional[NetworkManager]:
+		return self.consoles.get(name)
+
+	def add(self, name: str, manager: NetworkManager) -> NetworkManager:
+		manager.name = name
+		self.consoles[name] = manager
+		manager.start_health_monitor()
+		if self.active is None:
+			self.activate(name)
+		return manager
+
+	async def connect(self, name: str, address: Union[IPv4Address, IPv6Address, str], port: int = DEFAULT_PORT) -> NetworkManager:
+		"""Connects to another console and loads its tree. The first console connected becomes the active one."""
+		if name in self.consoles:
+			raise ValueError(f"Already connected to {name}")
+		manager = NetworkManager()
+		manager.name = name
+		try:
+			await manager.preload_tree(address, port)
+		except BaseException:
+			manager.close()
+			raise
+		return self.add(name, manager)
+
+	def activate(self, name: str):
+		global instance
+		self.active = name
+		instance = self.consoles[name]
+
+	def remove(self, name: str):
+		global instance
+		manager = self.consoles.pop(name, None)
+		if manager is None:
+			return
+		manager.close()
+		if self.active == name:
+			self.active = None
+			instance = None
+			if self.consoles:
+				self.activate(next(iter(self.consoles)))
+
+	def tag(self, sender: NetworkManager, text: str) -> str:
+		"""Prefixes text with the console it concerns, once there is more than one to tell apart."""
+		return f"{sender.name}: {text}" if len(self.consoles) > 1 and sender.name else text
+
+instance: Optional[NetworkManager] = None
+registry = ConnectionRegistry()
\ No newline at end of file
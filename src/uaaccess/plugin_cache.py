@@ -0,0 +1,210 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+plugin_cache.py
+
+Precomputed parameter metadata for UAD plugins.
+
+Describing a plugin means walking every valid value of every parameter on a live instance to read back its display
+string and normalized value, which is slow and requires loading the VST3 binary. The result is therefore stored on
+disk, keyed by plugin name, version and binary modification time, so later opens of the effect editor never need to
+load the plugin at all. Live parameter automation is translated through per-parameter lookup tables built from that
+metadata, so it never touches the plugin either.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import plistlib
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from itertools import pairwise
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+# Parameters the console manages itself and which are not part of the parameters subtree.
+IGNORED_PARAMETERS = {"master_bypass"}
+PARAMETER_TYPES = {bool: "bool", str: "str", float: "float"}
+
+@dataclass
+class ParameterMetadata:
+	python_name: str
+	name: str
+	type: str
+	units: Optional[str]
+	# Parallel lists: each valid value, its display string and its normalized (raw) value.
+	values: list[Union[bool, str, float]]
+	display_values: list[str]
+	raw_values: list[float]
+
+	@property
+	def label(self) -> str:
+		return f"{self.name}{f" ({self.units})" if self.units else ""}"
+
+	@cached_property
+	def lookup(self) -> "ParameterLookup":
+		return ParameterLookup(self)
+
+	def raw_value_for(self, value: Union[bool, str]) -> float:
+		"""Returns the normalized value for a switch state or display string."""
+		if self.type == "bool":
+			return self.lookup.raw_by_value[bool(value)]
+		return self.lookup.raw_by_display[value]
+
+	def display_value_for(self, raw_value: float) -> str:
+		return self.display_values[self.lookup.index_for(raw_value)]
+
+	def value_for(self, raw_value: float) -> Union[bool, str, float]:
+		return self.values[self.lookup.index_for(raw_value)]
+
+class ParameterLookup:
+	"""
+	Conversion tables for one parameter.
+
+	Normalized values are kept sorted in an array together with the midpoints between neighbours, so the nearest
+	valid value for an incoming normalized float is a single binary search over the midpoints. The reverse direction
+	is a dictionary lookup.
+	"""
+	def __init__(self, parameter: ParameterMetadata):
+		order = sorted(range(len(parameter.raw_values)), key=parameter.raw_values.__getitem__)
+		self.raw_values = array("d", (parameter.raw_values[i] for i in order))
+		self.indexes = array("l", order)
+		self.midpoints = array("d", ((low + high) / 2 for low, high in pairwise(self.raw_values)))
+		self.raw_by_display: dict[str, float] = {}
+		self.raw_by_value: dict[Union[bool, str, float], float] = {}
+		# setdefault keeps the first entry when several valid values share a display string.
+		for display, value, raw in zip(parameter.display_values, parameter.values, parameter.raw_values):
+			self.raw_by_display.setdefault(display, raw)
+			self.raw_by_value.setdefault(value, raw)
+
+	def index_for(self, raw_value: float) -> int:
+		"""Returns the position (in the metadata's lists) of the valid value nearest to raw_value."""
+		return self.indexes[bisect_right(self.midpoints, raw_value)]
+
+@dataclass
+class PluginMetadata:
+	name: str
+	version: str
+	mtime: float
+	parameters: list[ParameterMetadata]
+
+	@classmethod
+	def from_json(cls, data: dict[str, Any]) -> "PluginMetadata":
+		return cls(data["name"], data["version"], data["mtime"], [ParameterMetadata(**p) for p in data["parameters"]])
+
+	def parameter(self, index: int) -> ParameterMetadata:
+		return self.parameters[index]
+
+def describe_parameter(plugin: Any, param: Any) -> ParameterMetadata:
+	original = param.raw_value
+	values, display_values, raw_values = [], [], []
+	for value in param.valid_values:
+		setattr(plugin, param.python_name, value)
+		values.append(value)
+		display_values.append(param.string_value)
+		raw_values.append(param.raw_value)
+	param.raw_value = original
+	return ParameterMetadata(param.python_name, param.name, PARAMETER_TYPES.get(param.type, str(param.type)), param.units, values, display_values, raw_values)
+
+def describe_plugin(plugin: Any, name: str, version: str, mtime: float) -> PluginMetadata:
+	"""Walks a loaded plugin (anything shaped like a pedalboard plugin) once and records everything the editor needs."""
+	parameters = [describe_parameter(plugin, param) for python_name, param in plugin.parameters.items() if python_name not in IGNORED_PARAMETERS]
+	plugin.reset()
+	return PluginMetadata(name, version, mtime, parameters)
+
+def plugin_bundle_path(name: str, category: str) -> Optional[Path]:
+	match platform.system():
+		case "Windows":
+			return Path(r"C:\Program Files\Common Files\VST3\Universal Audio") / category / f"{name}.vst3"
+		case "Darwin":
+			return Path("/Library/Audio/Plug-Ins/VST3/Universal Audio") / category / f"{name}.vst3"
+		case _:
+			return None
+
+def plugin_binary_path(bundle: Path, name: str) -> Path:
+	if platform.system() == "Windows":
+		return bundle / "Contents" / "x86_64-win" / f"{name}.vst3"
+	return bundle / "Contents" / "MacOS" / name
+
+def plugin_version(bundle: Path) -> str:
+	"""Reads the plugin version from the bundle's metadata, without loading the plugin."""
+	try:
+		with open(bundle / "Contents" / "Resources" / "moduleinfo.json", encoding="utf-8") as f:
+			return str(json.load(f).get("Version", ""))
+	except (OSError, ValueError):
+		pass
+	try:
+		with open(bundle / "Contents" / "Info.plist", "rb") as f:
+			return str(plistlib.load(f).get("CFBundleShortVersionString", ""))
+	except (OSError, plistlib.InvalidFileException):
+		return ""
+
+def load_vst3(path: str) -> Any:
+	from pedalboard import load_plugin
+	return load_plugin(path)
+
+class PluginMetadataCache:
+	def __init__(self, directory: Path):
+		self.directory = Path(directory)
+		self.memory: dict[str, PluginMetadata] = {}
+
+	def cache_file(self, name: str) -> Path:
+		# The readable part loses characters file systems reject, so a hash of the exact name keeps "Neve 1073" and
+		# "Neve_1073" apart.
+		digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:12]
+		return self.directory / f"{re.sub(r'[^A-Za-z0-9._-]', '_', name)[:64]}-{digest}.json"
+
+	def get(self, name: str, version: str, mtime: float) -> Optional[PluginMetadata]:
+		metadata = self.memory.get(name)
+		if metadata is None:
+			try:
+				with open(self.cache_file(name), encoding="utf-8") as f:
+					metadata = PluginMetadata.from_json(json.load(f))
+			except (OSError, ValueError, KeyError, TypeError):
+				return None
+		if metadata.name != name or metadata.version != version or metadata.mtime != mtime:
+			return None
+		self.memory[name] = metadata
+		return metadata
+
+	def put(self, metadata: PluginMetadata):
+		self.memory[metadata.name] = metadata
+		self.directory.mkdir(parents=True, exist_ok=True)
+		tmp_file = self.cache_file(metadata.name).with_suffix(".tmp")
+		with open(tmp_file, "w", encoding="utf-8") as f:
+			json.dump(asdict(metadata), f)
+		os.replace(tmp_file, self.cache_file(metadata.name))
+
+	def key(self, bundle: Path, binary: Path) -> tuple[str, float]:
+		try:
+			mtime = os.path.getmtime(binary)
+		except OSError:
+			mtime = 0.0
+		return plugin_version(bundle), mtime
+
+	def cached(self, name: str, bundle: Path, binary: Path) -> Optional[PluginMetadata]:
+		return self.get(name, *self.key(bundle, binary))
+
+	def load(self, name: str, bundle: Path, binary: Path, loader: Callable[[str], Any]) -> PluginMetadata:
+		"""Returns the plugin's metadata from the cache, describing it with loader(binary path) on a miss."""
+		version, mtime = self.key(bundle, binary)
+		metadata = self.get(name, version, mtime)
+		if metadata is None:
+			metadata = describe_plugin(loader(str(binary)), name, version, mtime)
+			self.put(metadata)
+		return metadata
+
+	async def load_async(self, name: str, bundle: Path, binary: Path, host: Any) -> PluginMetadata:
+		"""Like load, but describes the plugin in a plugin host process (see plugin_host) so the caller never blocks."""
+		version, mtime = self.key(bundle, binary)
+		metadata = self.get(name, version, mtime)
+		if metadata is None:
+			metadata = PluginMetadata.from_json(await host.describe(str(binary), name, version, mtime))
+			self.put(metadata)
+		return metadata
+
+instance: Optional[PluginMetadataCache] = None
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+plugin_catalog.py
+
+An index over the console's plugin list.
+
+The catalog reads `/plugins` once, without copying or mutating the tree, and keeps facet sets (authorized,
+unison-capable, per category) that are updated in place from `Status` and `Name` change events. Query results are
+memoized per filter combination until something changes, so repeated queries cost O(result).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from blinker import ANY, signal
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+	id: str
+	name: str
+	status: str
+	unison: bool
+	categories: tuple[str, ...]
+
+	@property
+	def authorized(self) -> bool:
+		return self.status.find("Authorized") != -1
+
+class PluginCatalog:
+	def __init__(self, plugins: Optional[dict[str, Any]]):
+		self.entries: dict[str, CatalogEntry] = {}
+		self.authorized: set[str] = set()
+		self.unison: set[str] = set()
+		self.by_category: dict[str, set[str]] = {}
+		self.results: dict[tuple[bool, bool, Optional[str]], list[CatalogEntry]] = {}
+		for id, plugin in (plugins or {}).items():
+			props = plugin["properties"]
+			categories = tuple(c.strip() for c in props.get("Categories", {}).get("value", "").split(',') if c.strip())
+			self.add(CatalogEntry(id, props["Name"]["value"], props["Status"]["value"], bool(props["Unison"]["value"]), categories))
+
+	def add(self, entry: CatalogEntry):
+		self.entries[entry.id] = entry
+		if entry.authorized:
+			self.authorized.add(entry.id)
+		if entry.unison:
+			self.unison.add(entry.id)
+		for category in entry.categories:
+			self.by_category.setdefault(category, set()).add(entry.id)
+		self.results.clear()
+
+	def get(self, id: str) -> Optional[CatalogEntry]:
+		return self.entries.get(id)
+
+	def categories(self) -> list[str]:
+		return sorted(self.by_category)
+
+	def query(self, authorized_only: bool = False, unison_only: bool = False, category: Optional[str] = None) -> list[CatalogEntry]:
+		"""Returns matching plugins sorted by name. The returned list is shared and must not be modified."""
+		key = (authorized_only, unison_only, category)
+		result = self.results.get(key)
+		if result is not None:
+			return result
+		facets = []
+		if authorized_only:
+			facets.append(self.authorized)
+		if unison_only:
+			facets.append(self.unison)
+		if category is not None:
+			facets.append(self.by_category.get(category, set()))
+		if facets:
+			facets.sort(key=len)
+			ids = facets[0].intersection(*facets[1:])
+		else:
+			ids = self.entries.keys()
+		result = self.results[key] = sorted((self.entries[id] for id in ids), key=lambda entry: entry.name.casefold())
+		return result
+
+	def set_status(self, id: str, status: str):
+		entry = self.entries.get(id)
+		if entry is None or entry.status == status:
+			return
+		entry.status = status
+		if entry.authorized:
+			self.authorized.add(id)
+		else:
+			self.authorized.discard(id)
+		self.results.clear()
+
+	def set_name(self, id: str, name: str):
+		entry = self.entries.get(id)
+		if entry is None or entry.name == name:
+			return
+		entry.name = name
+		self.results.clear()
+
+	def connect(self, sender: Any = ANY):
+		"""Follows Status and Name changes, from sender only if given (the console the catalog was built from)."""
+		signal("Status").connect(self.on_status_changed, sender=sender)
+		signal("Name").connect(self.on_name_changed, sender=sender)
+
+	def disconnect(self):
+		signal("Status").disconnect(self.on_status_changed)
+		signal("Name").disconnect(self.on_name_changed)
+
+	@staticmethod
+	def plugin_id(path: str) -> Optional[str]:
+		components = path.strip('/').split('/')
+		return components[1] if len(components) in (3, 4) and components[0] == "plugins" else None
+
+	async def on_status_changed(self, sender, **kwargs):
+		id = self.plugin_id(kwargs["path"])
+		if id is not None:
+			self.set_status(id, kwargs["data"])
+
+	async def on_name_changed(self, sender, **kwargs):
+		id = self.plugin_id(kwargs["path"])
+		if id is not None:
+			self.set_name(id, kwargs["data"])
@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+plugin_host.py
+
+A small pool of worker processes that load VST3 plugins on behalf of the UI.
+
+Instantiating a UAD plugin can take seconds and a misbehaving plugin can crash the process that loaded it, so
+plugins are never loaded in the UI process. Each worker keeps its most recently used plugins loaded (evicting the
+least recently used one once it holds `capacity` of them), and requests for the same plugin are always routed to the
+same worker so it stays warm. Requests travel over a pipe and are awaited from the event loop without blocking it. A
+worker that does not answer in time, or whose request is cancelled, is killed, so a late reply can never be taken for
+the answer to the next request.
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, Optional
+
+from .plugin_cache import describe_plugin
+
+DEFAULT_LOADER = "uaaccess.plugin_cache:load_vst3"
+# Generous, as describing a plugin instantiates it, but a plugin that hangs must not hold its worker forever.
+REQUEST_TIMEOUT = 30.0
+
+class PluginHostError(Exception):
+	pass
+
+def resolve_loader(spec: str) -> Callable[[str], Any]:
+	module, _, function = spec.partition(':')
+	return getattr(importlib.import_module(module), function)
+
+def host_main(conn, loader_spec: str, capacity: int):
+	"""Entry point of a worker process: answers requests from conn until told to shut down or the pipe closes."""
+	loader = resolve_loader(loader_spec)
+	plugins: OrderedDict[str, Any] = OrderedDict()
+
+	def get_plugin(path: str) -> Any:
+		if path in plugins:
+			plugins.move_to_end(path)
+			return plugins[path]
+		plugin = plugins[path] = loader(path)
+		while len(plugins) > capacity:
+			plugins.popitem(last=False)
+		return plugin
+
+	while True:
+		try:
+			op, path, args = conn.recv()
+		except EOFError:
+			return
+		if op == "shutdown":
+			return
+		try:
+			plugin = get_plugin(path)
+			match op:
+				case "describe":
+					result = asdict(describe_plugin(plugin, *args))
+				case "to_string":
+					python_name, raw_value = args
+					parameter = plugin.parameters[python_name]
+					parameter.raw_value = raw_value
+					result = parameter.string_value
+				case "to_raw":
+					python_name, value = args
+					result = plugin.parameters[python_name].get_raw_value_for(value)
+				case "loaded":
+					result = list(plugins)
+				case _:
+					raise ValueError(f"Unknown plugin host request {op}")
+			conn.send(("ok", result))
+		except Exception as e:
+			conn.send(("error", f"{type(e).__name__}: {e!s}"))
+
+class PluginHost:
+	def __init__(self, context, loader: str, capacity: int, timeout: float = REQUEST_TIMEOUT):
+		self.context = context
+		self.loader = loader
+		self.capacity = capacity
+		self.timeout = timeout
+		self.lock = asyncio.Lock()
+		self.process = None
+		self.conn = None
+
+	def start(self):
+		self.conn, child_conn = self.context.Pipe()
+		self.process = self.context.Process(target=host_main, args=(child_conn, self.loader, self.capacity), name="uaaccess-plugin-host", daemon=True)
+		self.process.start()
+		child_conn.close()
+
+	@property
+	def alive(self) -> bool:
+		return self.process is not None and self.process.is_alive()
+
+	def stop(self, kill: bool = False):
+		"""Shuts the worker down, or with kill, ends it at once: a busy worker would not see the shutdown request."""
+		if self.process is None:
+			return
+		if not kill:
+			try:
+				self.conn.send(("shutdown", None, ()))
+			except (OSError, ValueError):
+				pass
+			self.process.join(1)
+		if self.process.is_alive():
+			self.process.kill()
+			self.process.join()
+		self.conn.close()
+		self.process = None
+
+	def receive(self, conn) -> Any:
+		"""Waits for the reply to the request in flight on conn. Runs in a thread."""
+		if not conn.poll(self.timeout):
+			raise TimeoutError
+		return conn.recv()
+
+	async def request(self, op: str, path: str, *args) -> Any:
+		async with self.lock:
+			if not self.alive:
+				self.stop()
+				self.start()
+			try:
+				self.conn.send((op, path, args))
+				status, result = await asyncio.to_thread(self.receive, self.conn)
+			except TimeoutError as e:
+				self.stop(kill=True)
+				raise PluginHostError(f"The plug-in host did not answer in time while handling {path}") from e
+			except asyncio.CancelledError:
+				# The reply is still on its way; only a new worker is safe to ask again.
+				self.stop(kill=True)
+				raise
+			except (EOFError, OSError) as e:
+				# The plugin took the worker down with it; start a fresh one for the next request.
+				self.stop()
+				raise PluginHostError(f"The plug-in host crashed while handling {path}") from e
+		if status == "error":
+			raise PluginHostError(result)
+		return result
+
+class PluginHostPool:
+	def __init__(self, size: int = 2, loader: str = DEFAULT_LOADER, capacity: int = 4, timeout: float = REQUEST_TIMEOUT):
+		context = multiprocessing.get_context("spawn")
+		self.hosts = [PluginHost(context, loader, capacity, timeout) for _ in range(size)]
+		self.affinity: dict[str, PluginHost] = {}
+		self.next_host = 0
+
+	def start(self):
+		for host in self.hosts:
+			if not host.alive:
+				host.start()
+
+	def stop(self):
+		for host in self.hosts:
+			host.stop()
+		self.affinity.clear()
+
+	def host_for(self, path: str) -> PluginHost:
+		host = self.affinity.get(path)
+		if host is None:
+			host = self.affinity[path] = self.hosts[self.next_host]
+			self.next_host = (self.next_host + 1) % len(self.hosts)
+		return host
+
+	async def request(self, op: str, path: str, *args) -> Any:
+		try:
+			return await self.host_for(path).request(op, path, *args)
+		except PluginHostError:
+			self.affinity.pop(path, None)
+			raise
+
+	async def describe(self, path: str, name: str, version: str, mtime: float) -> dict[str, Any]:
+		return await self.request("describe", path, name, version, mtime)
+
+	async def to_string(self, path: str, python_name: str, raw_value: float) -> str:
+		return await self.request("to_string", path, python_name, raw_value)
+
+	async def to_raw(self, path: str, python_name: str, value: Any) -> float:
+		return await self.request("to_raw", path, python_name, value)
+
+pool: Optional[PluginHostPool] = None
@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+preset_index.py
+
+A lazily expanded index over a plugin's preset tree (`/plugins/{id}/Preset/values`).
+
+Only the folder being browsed is ever materialized: a folder's children are split into subfolders and presets the
+first time it is opened and cached from then on. Search walks the tree once to build a sorted name table, then
+answers prefix queries with a binary search and falls back to a substring scan.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Optional
+
+FOLDER_SEPARATOR = " / "
+
+@dataclass(frozen=True, slots=True, order=True)
+class Preset:
+	folder: str
+	name: str
+
+	@property
+	def label(self) -> str:
+		return f"{self.folder}: {self.name}" if self.folder else self.name
+
+class PresetIndex:
+	def __init__(self, values: list[dict[str, Any]]):
+		self.source = values
+		self.expanded: dict[str, tuple[list[str], list[str]]] = {}
+		self.folder_nodes: dict[str, list[dict[str, Any]]] = {"": values}
+		self.all_folders: Optional[list[str]] = None
+		self.names: Optional[list[tuple[str, Preset]]] = None
+
+	def expand(self, folder: str) -> tuple[list[str], list[str]]:
+		"""Returns the (subfolder paths, preset names) directly inside folder."""
+		result = self.expanded.get(folder)
+		if result is not None:
+			return result
+		subfolders, presets = [], []
+		for node in self.folder_nodes.get(folder, []):
+			if node.get("type") == "folder":
+				path = f"{folder}{FOLDER_SEPARATOR}{node.get('value', '')}" if folder else node.get("value", "")
+				self.folder_nodes[path] = node.get("children", [])
+				subfolders.append(path)
+			elif "value" in node:
+				presets.append(node["value"])
+		result = self.expanded[folder] = (subfolders, presets)
+		return result
+
+	def subfolders(self, folder: str = "") -> list[str]:
+		return self.expand(folder)[0]
+
+	def presets(self, folder: str = "") -> list[str]:
+		return self.expand(folder)[1]
+
+	def folders(self) -> list[str]:
+		"""Every folder path, depth first. Expands folders but never materializes a preset list other than their own."""
+		if self.all_folders is None:
+			self.all_folders = []
+			stack = [""]
+			while stack:
+				folder = stack.pop()
+				self.all_folders.append(folder)
+				stack.extend(reversed(self.subfolders(folder)))
+		return self.all_folders
+
+	def build_names(self) -> list[tuple[str, Preset]]:
+		if self.names is None:
+			self.names = sorted((name.casefold(), Preset(folder, name)) for folder in self.folders() for name in self.presets(folder))
+		return self.names
+
+	def search(self, query: str, limit: int = 100) -> list[Preset]:
+		"""Returns presets whose name starts with query, followed by those that merely contain it."""
+		query = query.strip().casefold()
+		if not query:
+			return []
+		names = self.build_names()
+		results: list[Preset] = []
+		i = bisect_left(names, (query,))
+		while i < len(names) and names[i][0].startswith(query) and len(results) < limit:
+			results.append(names[i][1])
+			i += 1
+		if len(results) < limit:
+			for key, preset in names:
+				if query in key and not key.startswith(query):
+					results.append(preset)
+					if len(results) >= limit:
+						break
+		return results
+
+	def locate(self, name: str) -> Optional[Preset]:
+		names = self.build_names()
+		key = name.casefold()
+		i = bisect_left(names, (key,))
+		while i < len(names) and names[i][0] == key:
+			if names[i][1].name == name:
+				return names[i][1]
+			i += 1
+		return None
@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+profiling.py
+
+On-demand profiling captures, started and stopped from the Debugging menu.
+
+A capture either records a deterministic cProfile trace (saved as a .pstats file) or periodically samples the
+stack of the event loop thread (saved as collapsed stacks, one "frame;frame;frame count" line per unique stack,
+which is the input format of flamegraph.pl, speedscope and friends). Captures can be limited to a scope, in which
+case only code running inside a matching `scope()` block or `scoped()` coroutine is recorded.
+
+Scopes are tracked with a single depth counter, which is only correct while nothing else can run: `scope()` is for
+synchronous blocks, and a coroutine is wrapped in `scoped()`, which is inside its scope only while it is actually
+running and leaves it every time it suspends, so other tasks and UI callbacks that run meanwhile are not recorded.
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Generator
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Optional
+
+
+class ProfileScope(Enum):
+	ALL = "Everything"
+	NETWORK = "Network handling"
+	UI = "UI building"
+
+class ProfileFormat(Enum):
+	PSTATS = "pstats"
+	COLLAPSED = "folded"
+
+class ProfileCapture:
+	def __init__(self, scope: ProfileScope, format: ProfileFormat, interval: float = 0.001):
+		self.scope = scope
+		self.format = format
+		self.interval = interval
+		self.depth = 0
+		self.started_at: Optional[float] = None
+		self.stopped_at: Optional[float] = None
+		self.profiler: Optional[cProfile.Profile] = None
+		self.stacks: Counter[str] = Counter()
+		self.sampler: Optional[threading.Thread] = None
+		self.stop_sampling = threading.Event()
+		self.target_thread: Optional[int] = None
+
+	@property
+	def running(self) -> bool:
+		return self.started_at is not None and self.stopped_at is None
+
+	def start(self):
+		"""Starts the capture. Must be called from the thread that should be profiled (the event loop thread)."""
+		self.started_at = time.monotonic()
+		self.target_thread = threading.get_ident()
+		if self.format == ProfileFormat.PSTATS:
+			self.profiler = cProfile.Profile()
+			if self.scope == ProfileScope.ALL:
+				self.profiler.enable()
+		else:
+			self.sampler = threading.Thread(target=self.sample_continuously, name="uaaccess-profiler", daemon=True)
+			self.sampler.start()
+
+	def stop(self):
+		self.stopped_at = time.monotonic()
+		if self.profiler is not None:
+			self.profiler.disable()
+		if self.sampler is not None:
+			self.stop_sampling.set()
+			self.sampler.join()
+
+	def enter(self, scope: ProfileScope):
+		if scope != self.scope or not self.running:
+			return
+		self.depth += 1
+		if self.depth == 1 and self.profiler is not None:
+			self.profiler.enable()
+
+	def leave(self, scope: ProfileScope):
+		if scope != self.scope or self.depth == 0:
+			return
+		self.depth -= 1
+		if self.depth == 0 and self.profiler is not None:
+			self.profiler.disable()
+
+	def sample_continuously(self):
+		while not self.stop_sampling.wait(self.interval):
+			if self.scope != ProfileScope.ALL and self.depth == 0:
+				continue
+			frame = sys._current_frames().get(self.target_thread)
+			if frame is None:
+				continue
+			self.stacks[collapse_stack(frame)] += 1
+
+	def save(self, path: str):
+		if self.format == ProfileFormat.PSTATS:
+			self.profiler.dump_stats(path)
+			return
+		with open(path, "w", encoding="utf-8") as f:
+			for stack, count in self.stacks.most_common():
+				f.write(f"{stack} {count}\n")
+
+def collapse_stack(frame) -> str:
+	"""Renders a frame and its callers as a single collapsed-stack line, outermost frame first."""
+	names: list[str] = []
+	while frame is not None:
+		code = frame.f_code
+		names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":"))
+		frame = frame.f_back
+	names.reverse()
+	return ';'.join(names)
+
+capture: Optional[ProfileCapture] = None
+
+def start(scope: ProfileScope, format: ProfileFormat) -> ProfileCapture:
+	global capture
+	if capture is not None and capture.running:
+		raise RuntimeError("A profiling capture is already running")
+	capture = ProfileCapture(scope, format)
+	capture.start()
+	return capture
+
+def stop() -> Optional[ProfileCapture]:
+	global capture
+	finished, capture = capture, None
+	if finished is not None and finished.running:
+		finished.stop()
+	return finished
+
+@contextmanager
+def scope(name: ProfileScope):
+	"""
+	Marks a synchronous block as belonging to a profiling scope. Costs a single global lookup when no capture is
+	running. Never await inside it; use scoped() instead.
+	"""
+	current = capture
+	if current is None:
+		yield
+		return
+	current.enter(name)
+	try:
+		yield
+	finally:
+		current.leave(name)
+
+class scoped:
+	"""
+	Awaits awaitable with each of its steps marked as belonging to a profiling scope:
+	`await profiling.scoped(ProfileScope.UI, self.initialize())`.
+	"""
+	__slots__ = ("name", "awaitable")
+
+	def __init__(self, name: ProfileScope, awaitable: Awaitable):
+		self.name = name
+		self.awaitable = awaitable
+
+	def __await__(self) -> Generator[Any, Any, Any]:
+		steps = self.awaitable.__await__()
+		value: Any = None
+		error: Optional[BaseException] = None
+		while True:
+			current = capture
+			if current is not None:
+				current.enter(self.name)
+			try:
+				if error is not None:
+					yielded = steps.throw(error)
+				else:
+					yielded = steps.send(value)
+			except StopIteration as e:
+				return e.value
+			finally:
+				if current is not None:
+					current.leave(self.name)
+			# Suspended: whatever the loop runs until the result comes back is outside the scope.
+			value, error = None, None
+			try:
+				value = yield yielded
+			except BaseException as e:
+				error = e
@@ -0,0 +1,163 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+proxy.py
+
+A local proxy that lets several clients share one console connection.
+
+The proxy holds a single upstream NetworkManager that has loaded and subscribed to the whole tree. Downstream
+clients speak the console protocol to it: `get` requests are answered from the cached tree (the encoded full tree is
+reused until the tree changes), `subscribe` registers interest in a subtree and value updates from the console are
+encoded once and fanned out to every subscribed client, and `set` requests are forwarded upstream unchanged. A client
+that stops reading is disconnected once its send buffer grows past a limit, so it cannot hold up the others.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import parse_qsl
+
+from . import metrics, tree
+from .network import NetworkManager, property_changed
+
+# Bytes of unsent updates a client may fall behind by before it is disconnected.
+MAX_CLIENT_BUFFER = 16 * 2**20
+
+@dataclass(eq=False)
+class ProxyClient:
+	writer: asyncio.StreamWriter
+	# Recursive subscriptions cover a whole subtree, the others only the node's own properties.
+	subscriptions: set[str] = field(default_factory=set)
+	recursive_subscriptions: set[str] = field(default_factory=set)
+
+	def is_subscribed(self, path: str) -> bool:
+		for prefix in self.recursive_subscriptions:
+			if prefix == "/" or path == prefix or path.startswith(prefix + "/"):
+				return True
+		if self.subscriptions:
+			node = path.removesuffix("/value").rpartition('/')[0] or "/"
+			return node in self.subscriptions
+		return False
+
+	def subscribe(self, path: str, recursive: bool):
+		(self.recursive_subscriptions if recursive else self.subscriptions).add(path)
+
+	def unsubscribe(self, path: str):
+		self.subscriptions.discard(path)
+		self.recursive_subscriptions.discard(path)
+
+def encode(message: dict[str, Any]) -> bytes:
+	return json.dumps(message, default=tree.to_json).encode() + b"\x00"
+
+class ConsoleProxy:
+	def __init__(self, manager: NetworkManager, max_client_buffer: int = MAX_CLIENT_BUFFER):
+		self.manager = manager
+		self.max_client_buffer = max_client_buffer
+		self.clients: dict[asyncio.StreamWriter, ProxyClient] = {}
+		self.server: Optional[asyncio.Server] = None
+		self.encoded_root: Optional[dict[str, Any]] = None
+		self.encoded_tree = b""
+		self.fanned_out = 0
+		self.forwarded = 0
+
+	async def start(self, host: str, port: int) -> asyncio.Server:
+		property_changed.connect(self.on_property_changed)
+		self.server = await asyncio.start_server(self.handle_client, host, port)
+		return self.server
+
+	async def stop(self):
+		property_changed.disconnect(self.on_property_changed)
+		if self.server is not None:
+			self.server.close()
+		for writer in list(self.clients):
+			writer.close()
+		self.clients.clear()
+		if self.server is not None:
+			await self.server.wait_closed()
+			self.server = None
+		self.record_metrics()
+
+	@property
+	def port(self) -> int:
+		return self.server.sockets[0].getsockname()[1]
+
+	def record_metrics(self):
+		metrics.record("Proxy clients", len(self.clients))
+		metrics.record("Proxy updates fanned out", self.fanned_out)
+		metrics.record("Proxy requests forwarded", self.forwarded)
+
+	def full_tree(self) -> bytes:
+		root = self.manager.snapshot().root
+		if root is not self.encoded_root:
+			self.encoded_tree = encode(root)
+			self.encoded_root = root
+		return self.encoded_tree
+
+	def reply_for(self, target: str, query: str) -> bytes:
+		parameters = dict(parse_qsl(query))
+		recursive = parameters.get("recursive") == "1"
+		if target.strip('/') == "" and recursive:
+			return self.full_tree()
+		data = self.manager.snapshot().data if target.strip('/') == "" else self.manager.get(target)
+		if data is None:
+			# Same shape as the console's reply for an unknown path, parameters included.
+			return encode({"path": target, "parameters": parameters, "error": "Path not found"})
+		if isinstance(data, dict) and "children" in data and not recursive:
+			data = {**data, "children": {name: {} for name in data["children"]}}
+		return encode({"path": target, "data": data})
+
+	def send(self, client: ProxyClient, payload: bytes):
+		if client.writer.transport.get_write_buffer_size() > self.max_client_buffer:
+			self.drop(client)
+			return
+		client.writer.write(payload)
+
+	def drop(self, client: ProxyClient):
+		self.clients.pop(client.writer, None)
+		client.writer.close()
+		self.record_metrics()
+
+	async def on_property_changed(self, sender, **kwargs):
+		if sender is not self.manager or not self.clients:
+			return
+		path = kwargs["path"]
+		payload = None
+		for client in list(self.clients.values()):
+			if client.is_subscribed(path):
+				if payload is None:
+					payload = encode({"path": path, "data": kwargs["data"]})
+				self.send(client, payload)
+				self.fanned_out += 1
+
+	async def handle_request(self, client: ProxyClient, message: str):
+		command, _, rest = message.partition(' ')
+		target, _, query = rest.strip().partition('?')
+		match command:
+			case "get":
+				self.send(client, self.reply_for(target, query))
+				await client.writer.drain()
+			case "subscribe":
+				client.subscribe('/' + target.strip('/'), dict(parse_qsl(query)).get("recursive") == "1")
+			case "unsubscribe":
+				client.unsubscribe('/' + target.strip('/'))
+			case "set":
+				self.forwarded += 1
+				await self.manager.send_request(message)
+			case _:
+				self.send(client, encode({"path": target, "error": f"{command} is not supported through the proxy"}))
+
+	async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		client = self.clients[writer] = ProxyClient(writer)
+		self.record_metrics()
+		try:
+			while True:
+				try:
+					message = await reader.readuntil(b'\x00')
+				except (asyncio.IncompleteReadError, ConnectionError):
+					break
+				await self.handle_request(client, message[:-1].decode())
+		except ConnectionError:
+			pass
+		finally:
+			self.drop(client)
@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+scenes.py
+
+Named snapshots of a device's mixer state.
+
+A scene records the value of every writable property under `/devices/{N}`, read from a consistent tree snapshot.
+Recalling one compares it with the live tree and sends `set` requests only for the values that differ, pipelined into
+a single write, so switching between setups costs the console as few requests as possible.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from .tree import TreeSnapshot, Value
+
+
+class SceneError(Exception):
+	pass
+
+@dataclass
+class Scene:
+	name: str
+	device: int
+	created: float
+	# Value path to value, sorted by path.
+	values: dict[str, Value]
+
+	@classmethod
+	def from_json(cls, data: dict[str, Any]) -> "Scene":
+		return cls(data["name"], data["device"], data["created"], data["values"])
+
+def is_writable(prop: Any) -> bool:
+	return isinstance(prop, Mapping) and "value" in prop and not prop.get("readonly", False) and prop.get("type") != "pointer"
+
+def capture(snapshot: TreeSnapshot, device: int, name: str) -> Scene:
+	base = f"/devices/{device}"
+	root = snapshot.get(base)
+	if not isinstance(root, Mapping):
+		raise SceneError(f"Device {device} does not exist")
+	values: dict[str, Value] = {}
+	stack = [(base, root)]
+	while stack:
+		path, node = stack.pop()
+		for prop_name, prop in node.get("properties", {}).items():
+			if is_writable(prop):
+				values[f"{path}/{prop_name}/value"] = prop["value"]
+		for child_name, child in node.get("children", {}).items():
+			stack.append((f"{path}/{child_name}", child))
+	return Scene(name, device, time.time(), dict(sorted(values.items())))
+
+def diff_values(values: dict[str, Value], snapshot: TreeSnapshot) -> list[tuple[str, Value]]:
+	"""Returns the (value path, value) pairs that differ from the tree. Properties the tree does not have are skipped."""
+	result = []
+	for path, value in values.items():
+		current = snapshot.get(path)
+		if current is not None and current != value:
+			result.append((path, value))
+	return result
+
+def differences(scene: Scene, snapshot: TreeSnapshot) -> list[tuple[str, Value]]:
+	return diff_values(scene.values, snapshot)
+
+async def recall(instance: Any, scene: Scene) -> int:
+	"""Sends the sets needed to bring the console to scene. Returns how many values were changed."""
+	changes = differences(scene, instance.snapshot())
+	await instance.apply_edits(changes)
+	return len(changes)
+
+class SceneStore:
+	def __init__(self, directory: Path):
+		self.directory = Path(directory)
+
+	def scene_file(self, name: str) -> Path:
+		# The readable part loses characters file systems reject, so a hash of the exact name keeps "Mix 1" and "Mix_1" apart.
+		digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:12]
+		return self.directory / f"{re.sub(r'[^A-Za-z0-9._-]', '_', name)[:64]}-{digest}.json"
+
+	def names(self) -> list[str]:
+		names = []
+		for file in self.directory.glob("*.json"):
+			try:
+				with open(file, encoding="utf-8") as f:
+					names.append(json.load(f)["name"])
+			except (OSError, ValueError, KeyError, TypeError):
+				continue
+		return sorted(names, key=str.casefold)
+
+	def load(self, name: str) -> Scene:
+		try:
+			with open(self.scene_file(name), encoding="utf-8") as f:
+				return Scene.from_json(json.load(f))
+		except (OSError, ValueError, KeyError, TypeError) as e:
+			raise SceneError(f"Could not load scene {name}: {e!s}") from e
+
+	def save(self, scene: Scene):
+		self.directory.mkdir(parents=True, exist_ok=True)
+		tmp_file = self.scene_file(scene.name).with_suffix(".tmp")
+		with open(tmp_file, "w", encoding="utf-8") as f:
+			json.dump(asdict(scene), f, indent=4)
+		os.replace(tmp_file, self.scene_file(scene.name))
+
+	def delete(self, name: str):
+		try:
+			os.remove(self.scene_file(name))
+		except FileNotFoundError:
+			pass
+
+instance: Optional[SceneStore] = None
@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+search_index.py
+
+The index behind Quick jump: every channel, channel property, preamp setting, send and plugin of the loaded devices,
+searchable by name as the user types.
+
+Each entry is filed under the trigrams of its words and under the one and two letter prefixes of its words. A query
+word of three letters or more looks up its trigrams and is then confirmed as a substring; a shorter one must start a
+word. Entry ids follow the order entries were built in (channels and plugins first, then their properties, then
+preamps and sends), and every key keeps a sorted list of ids next to its set, so a query walks the rarest key's list
+in rank order, checks the others by set membership, and stops as soon as it has enough results. Broad queries like
+"in" therefore cost about as much as narrow ones.
+
+Labels are built from the names of the nodes they belong to ("Vox Volume" from the channel named "Vox"), so when a
+`Name` changes only the entries that mention that node are re-filed.
+"""
+
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from blinker import ANY, signal
+
+CHANNEL_SECTIONS = {"inputs": "input", "outputs": "output", "auxs": "aux"}
+# The order entries are ranked in: what the user most likely means comes first.
+RANK_ORDER = ("channel", "plugin", "property", "preamp", "send")
+# How many results a search returns by default.
+RESULT_LIMIT = 20
+
+@dataclass(slots=True)
+class SearchEntry:
+	id: int
+	# input, output, aux, plugin, property, preamp or send.
+	kind: str
+	# The value path of a property, or the node path of a channel, send or plugin.
+	path: str
+	# Node paths whose names make up the label, followed by suffix.
+	owners: tuple[str, ...]
+	suffix: str
+	label: str = ""
+	# What is actually searched: the label plus the kind, casefolded.
+	text: str = ""
+
+def index_keys(text: str) -> set[str]:
+	keys = set()
+	for word in text.split():
+		keys.add('^' + word[:1])
+		if len(word) > 1:
+			keys.add('^' + word[:2])
+		for i in range(len(word) - 2):
+			keys.add(word[i:i + 3])
+	return keys
+
+def query_keys(word: str) -> list[str]:
+	if len(word) < 3:
+		return ['^' + word]
+	return [word[i:i + 3] for i in range(len(word) - 2)]
+
+class SearchIndex:
+	def __init__(self, root: Mapping, devices: list[str], display_name: Callable[[str], str] = lambda name: name):
+		"""root is the tree's data node; devices the ids of the loaded devices, whose subtrees are indexed."""
+		self.devices = frozenset(devices)
+		self.plugins: frozenset[str] = frozenset()
+		self.display_name = display_name
+		self.entries: list[Optional[SearchEntry]] = []
+		self.names: dict[str, str] = {}
+		self.by_owner: dict[str, list[int]] = {}
+		self.postings: dict[str, list[int]] = {}
+		self.posting_sets: dict[str, set[int]] = {}
+		# Entries to add, grouped by rank: (kind, path, owners, suffix).
+		pending: dict[str, list[tuple[str, str, tuple[str, ...], str]]] = {group: [] for group in RANK_ORDER}
+		children = root.get("children", {})
+		device_nodes = children.get("devices", {}).get("children", {})
+		# Devices are only named in labels when there is more than one to tell apart.
+		several = len(devices) > 1
+		for device in devices:
+			device_node = device_nodes.get(device)
+			if not isinstance(device_node, Mapping):
+				continue
+			device_path = f"/devices/{device}"
+			prefix: tuple[str, ...] = ()
+			if several:
+				self.names[device_path] = self.node_name(device_node, device)
+				prefix = (device_path,)
+			for section, kind in CHANNEL_SECTIONS.items():
+				for channel_id, channel in device_node.get("children", {}).get(section, {}).get("children", {}).items():
+					channel_path = f"{device_path}/{section}/{channel_id}"
+					self.names[channel_path] = self.node_name(channel, f"{kind.capitalize()} {int(channel_id) + 1}")
+					owners = (*prefix, channel_path)
+					pending["channel"].append((kind, channel_path, owners, ""))
+					self.collect_properties(pending["property"], "property", channel, channel_path, owners, "")
+					for preamp_id, preamp in channel.get("children", {}).get("preamps", {}).get("children", {}).items():
+						self.collect_properties(pending["preamp"], "preamp", preamp, f"{channel_path}/preamps/{preamp_id}", owners, " Preamp")
+					for send_id, send in channel.get("children", {}).get("sends", {}).get("children", {}).items():
+						send_path = f"{channel_path}/sends/{send_id}"
+						self.names[send_path] = self.node_name(send, send_id)
+						pending["send"].append(("send", send_path, (*owners, send_path), ""))
+		plugins = children.get("plugins", {}).get("children", {})
+		self.plugins = frozenset(plugins)
+		for plugin_id, plugin in plugins.items():
+			plugin_path = f"/plugins/{plugin_id}"
+			self.names[plugin_path] = self.node_name(plugin, plugin_id)
+			pending["plugin"].append(("plugin", plugin_path, (plugin_path,), ""))
+		for group in RANK_ORDER:
+			for kind, path, owners, suffix in pending[group]:
+				self.add(kind, path, owners, suffix)
+
+	@staticmethod
+	def node_name(node: Mapping, default: str) -> str:
+		properties = node.get("properties", {})
+		for name in ("Name", "DeviceName"):
+			value = properties.get(name, {}).get("value")
+			if isinstance(value, str) and value:
+				return value
+		return default
+
+	def collect_properties(self, pending: list, kind: str, node: Mapping, node_path: str, owners: tuple[str, ...], prefix: str):
+		for name, prop in node.get("properties", {}).items():
+			if name == "Name" or not isinstance(prop, Mapping) or "value" not in prop or prop.get("readonly", False) or prop.get("type") == "pointer":
+				continue
+			pending.append((kind, f"{node_path}/{name}/value", owners, f"{prefix} {self.display_name(name)}"))
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def add(self, kind: str, path: str, owners: tuple[str, ...], suffix: str) -> SearchEntry:
+		entry = SearchEntry(len(self.entries), kind, path, owners, suffix)
+		self.entries.append(entry)
+		for owner in owners:
+			self.by_owner.setdefault(owner, []).append(entry.id)
+		self.file(entry)
+		return entry
+
+	def file(self, entry: SearchEntry):
+		entry.label = ' '.join(self.names[owner] for owner in entry.owners) + entry.suffix
+		entry.text = f"{entry.label} {entry.kind}".casefold()
+		for key in index_keys(entry.text):
+			posting = self.postings.get(key)
+			if posting is None:
+				self.postings[key] = [entry.id]
+				self.posting_sets[key] = {entry.id}
+			else:
+				# Ids only grow while building, so this is an append except when an entry is re-filed.
+				if posting[-1] < entry.id:
+					posting.append(entry.id)
+				else:
+					insort(posting, entry.id)
+				self.posting_sets[key].add(entry.id)
+
+	def unfile(self, entry: SearchEntry):
+		for key in index_keys(entry.text):
+			posting = self.postings[key]
+			del posting[bisect_left(posting, entry.id)]
+			self.posting_sets[key].discard(entry.id)
+			if not posting:
+				del self.postings[key]
+				del self.posting_sets[key]
+
+	def rename(self, node_path: str, name: str) -> int:
+		"""Updates the labels that include node_path's name. Returns how many entries were re-filed."""
+		if node_path not in self.names or self.names[node_path] == name:
+			return 0
+		self.names[node_path] = name
+		ids = self.by_owner.get(node_path, [])
+		for id in ids:
+			entry = self.entries[id]
+			self.unfile(entry)
+			self.file(entry)
+		return len(ids)
+
+	def search(self, query: str, limit: int = RESULT_LIMIT) -> list[SearchEntry]:
+		"""Returns up to limit entries matching every word of query, best ranked first."""
+		words = query.casefold().split()
+		if not words:
+			return []
+		keys = {key for word in words for key in query_keys(word)}
+		if any(key not in self.postings for key in keys):
+			return []
+		driver = min(keys, key=lambda key: len(self.postings[key]))
+		others = [self.posting_sets[key] for key in keys if key != driver]
+		# Short words are settled by their prefix key; longer ones need confirming, as trigrams can match out of order.
+		long_words = [word for word in words if len(word) >= 3]
+		results: list[SearchEntry] = []
+		for id in self.postings[driver]:
+			if all(id in other for other in others):
+				entry = self.entries[id]
+				if all(word in entry.text for word in long_words):
+					results.append(entry)
+					if len(results) >= limit:
+						break
+		return results
+
+	def connect(self, sender: Any = ANY):
+		"""Follows Name and DeviceName changes, from sender only if given (the console the index was built from)."""
+		signal("Name").connect(self.on_name_changed, sender=sender)
+		signal("DeviceName").connect(self.on_name_changed, sender=sender)
+
+	def disconnect(self):
+		signal("Name").disconnect(self.on_name_changed)
+		signal("DeviceName").disconnect(self.on_name_changed)
+
+	async def on_name_changed(self, sender, **kwargs):
+		path = kwargs["path"].removesuffix("/value")
+		data = kwargs["data"]
+		if isinstance(data, str) and data:
+			self.rename(path.rpartition('/')[0], data)
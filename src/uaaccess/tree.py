@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+tree.py
+
+The console state tree as a persistent (copy-on-write) structure.
+
+The tree is never mutated in place once it has been received. Setting a value copies only the dictionaries on the
+path from the changed leaf up to the root and shares every other subtree with the previous version, so a snapshot is
+just a reference to the current root: it costs O(1) to take and stays consistent however many updates arrive while it
+is being read.
+
+Property nodes are stored compactly: a slotted PropertyNode holds only the current value plus a reference to an
+interned PropertySchema with the rest of the metadata (type, min, max, default, values, readonly), which is shared by
+every property with an identical schema. PropertyNode is a read-only Mapping, so code that indexes properties like
+the dictionaries they were parsed from keeps working.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Hashable, Iterator, Optional, Union
+
+Value = Union[bool, int, str, float]
+
+# Marks a property that has no value (the key is absent in the original dictionary).
+MISSING: Any = object()
+
+class PropertySchema:
+	__slots__ = ("fields", "__weakref__")
+
+	def __init__(self, fields: dict[str, Any]):
+		self.fields = fields
+
+	def __repr__(self) -> str:
+		return f"PropertySchema({self.fields!r})"
+
+schemas: dict[Hashable, PropertySchema] = {}
+
+def freeze(value: Any) -> Hashable:
+	if isinstance(value, dict):
+		return (dict, tuple((k, freeze(v)) for k, v in value.items()))
+	if isinstance(value, list):
+		return (list, tuple(freeze(v) for v in value))
+	return (type(value), value)
+
+def intern_schema(fields: dict[str, Any]) -> PropertySchema:
+	"""Returns the shared schema for fields, registering it on first sight."""
+	try:
+		# Fast path for the common all-scalar schema. The types are part of the key because True == 1 == 1.0.
+		key: Hashable = (tuple(fields.items()), tuple(map(type, fields.values())))
+		schema = schemas.get(key)
+	except TypeError:
+		key = freeze(fields)
+		schema = schemas.get(key)
+	if schema is None:
+		schema = schemas[key] = PropertySchema({sys.intern(k): v for k, v in fields.items()})
+	return schema
+
+class PropertyNode(Mapping):
+	__slots__ = ("schema", "value")
+
+	def __init__(self, schema: PropertySchema, value: Any = MISSING):
+		self.schema = schema
+		self.value = value
+
+	@classmethod
+	def from_dict(cls, prop: dict[str, Any]) -> "PropertyNode":
+		fields = dict(prop)
+		value = fields.pop("value", MISSING)
+		if isinstance(value, str):
+			value = sys.intern(value)
+		return cls(intern_schema(fields), value)
+
+	def __getitem__(self, key: str) -> Any:
+		if key == "value":
+			if self.value is MISSING:
+				raise KeyError(key)
+			return self.value
+		return self.schema.fields[key]
+
+	def get(self, key: str, default: Any = None) -> Any:
+		if key == "value":
+			return default if self.value is MISSING else self.value
+		return self.schema.fields.get(key, default)
+
+	def __contains__(self, key: object) -> bool:
+		if key == "value":
+			return self.value is not MISSING
+		return key in self.schema.fields
+
+	def __iter__(self) -> Iterator[str]:
+		yield from self.schema.fields
+		if self.value is not MISSING:
+			yield "value"
+
+	def __len__(self) -> int:
+		return len(self.schema.fields) + (self.value is not MISSING)
+
+	def __eq__(self, other: object) -> bool:
+		if isinstance(other, PropertyNode):
+			return self.value == other.value and (self.schema is other.schema or self.schema.fields == other.schema.fields)
+		return super().__eq__(other)
+
+	__hash__ = None
+
+	def __repr__(self) -> str:
+		return f"PropertyNode({dict(self)!r})"
+
+	def replace(self, key: str, value: Any) -> "PropertyNode":
+		if key == "value":
+			return PropertyNode(self.schema, value)
+		fields = dict(self.schema.fields)
+		fields[key] = value
+		return PropertyNode(intern_schema(fields), self.value)
+
+def compact(node: dict[str, Any]) -> dict[str, Any]:
+	"""Converts a parsed node (and everything below it) to the compact representation, in place."""
+	properties = node.get('properties')
+	if properties:
+		node['properties'] = {sys.intern(name): PropertyNode.from_dict(prop) if isinstance(prop, dict) else prop for name, prop in properties.items()}
+	children = node.get('children')
+	if children:
+		node['children'] = {sys.intern(name): compact(child) if isinstance(child, dict) else child for name, child in children.items()}
+	return node
+
+def encode_value(value: Value) -> str:
+	"""Formats value as the argument of a `set` request."""
+	if isinstance(value, bool):
+		return "true" if value else "false"
+	if isinstance(value, str):
+		return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+	return str(value)
+
+def to_json(value: Any) -> Any:
+	"""`default` hook for json.dump(s), so compact nodes serialize like the dictionaries they came from."""
+	if isinstance(value, PropertyNode):
+		return dict(value)
+	raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def resolve(root: dict[str, Any], path: str) -> Optional[Union[dict[str, Any], Value]]:
+	"""Looks up path in a tree message (`{"path": ..., "data": ...}`). Returns None if any component is missing."""
+	parts: list[str] = path.strip('/').split('/')
+	current: Any = root['data']
+	for part in parts:
+		if 'properties' in current and part[0].isupper():
+			if part in current['properties']:
+				current = current['properties'][part]
+			else:
+				return None	 # Part not found in properties
+		elif 'children' in current:
+			if part in current['children']:
+				current = current['children'][part]
+			else:
+				return None	 # Part not found in children
+		else:
+			# If neither 'properties' nor 'children' can handle it, check for direct key access
+			if part in current:
+				current = current[part]
+			else:
+				return None	 # Direct key not found
+
+		if current is None:
+			return None	 # Check if navigation resulted in None
+
+	return current
+
+def assoc(root: dict[str, Any], path: str, value: Value) -> dict[str, Any]:
+	"""Returns a new root with path set to value. root itself is left untouched; unchanged subtrees are shared."""
+	parts: list[str] = path.strip('/').split('/')
+	current: Any = root['data']
+	last_part: str = parts[-1]
+	# Each step is (node, section, key): the node was left through node[section][key].
+	steps: list[tuple[dict[str, Any], str, str]] = []
+	for part in parts:
+		if 'properties' in current and part in current['properties']:
+			steps.append((current, 'properties', part))
+			current = current['properties'][part]
+			break
+		elif 'children' in current and part in current['children']:
+			steps.append((current, 'children', part))
+			current = current['children'][part]
+		elif 'commands' in current and part in current['commands']:
+			break
+		else:
+			# Not in the tree (for example a device that has not been loaded): nothing to update.
+			return root
+	if isinstance(current, PropertyNode):
+		replacement = current.replace(last_part, value)
+	else:
+		replacement = dict(current)
+		replacement[last_part] = value
+	return rebuild(root, steps, replacement)
+
+def rebuild(root: dict[str, Any], steps: list[tuple[dict[str, Any], str, str]], replacement: Any) -> dict[str, Any]:
+	"""Copies the nodes along steps (outermost first) so that the innermost one is replaced."""
+	for node, section, key in reversed(steps):
+		entries = dict(node.get(section, {}))
+		entries[key] = replacement
+		replacement = dict(node)
+		replacement[section] = entries
+	new_root = dict(root)
+	new_root['data'] = replacement
+	return new_root
+
+def is_stub(node: Any) -> bool:
+	"""Whether node is a placeholder for a child that a non-recursive reply did not expand."""
+	return isinstance(node, dict) and not node.get('properties') and not node.get('children')
+
+def diff(old: dict[str, Any], new: dict[str, Any], path: str, changes: list[tuple[str, Value]]) -> dict[str, Any]:
+	"""
+	Merges the incoming node new over old and returns the result, appending (value path, value) to changes for every
+	property whose value differs. Subtrees that compare equal are kept as the old objects, so the comparison runs at
+	C speed everywhere except along the paths that actually changed, and references into unchanged parts stay valid.
+	"""
+	if old == new:
+		return old
+	if is_stub(old):
+		# A node that was only listed so far is being loaded; none of its values are changes.
+		return new
+	merged = dict(new)
+	base = path.rstrip('/')
+	new_properties = new.get('properties')
+	if new_properties is not None:
+		old_properties = old.get('properties', {})
+		properties = {}
+		for name, prop in new_properties.items():
+			before = old_properties.get(name)
+			if before == prop:
+				properties[name] = before
+				continue
+			properties[name] = prop
+			if isinstance(prop, Mapping) and 'value' in prop and (not isinstance(before, Mapping) or before.get('value') != prop['value']):
+				changes.append((f"{base}/{name}/value", prop['value']))
+		merged['properties'] = properties
+	new_children = new.get('children')
+	if new_children is not None:
+		old_children = old.get('children', {})
+		children = {}
+		for name, child in new_children.items():
+			before = old_children.get(name)
+			if before is None:
+				children[name] = child
+			elif is_stub(child):
+				children[name] = before
+			else:
+				children[name] = diff(before, child, f"{base}/{name}", changes)
+		merged['children'] = children
+	if 'commands' in new and old.get('commands') == new['commands']:
+		merged['commands'] = old['commands']
+	return merged
+
+def merge(root: dict[str, Any], path: str, data: dict[str, Any]) -> tuple[dict[str, Any], list[tuple[str, Value]]]:
+	"""
+	Applies a structural reply for path to the tree. Returns the new root and the (value path, value) pairs that
+	changed. A reply for a node the tree does not have yet is inserted as is and reports no changes.
+	"""
+	if 'data' not in root:
+		return {"path": path, "data": data}, []
+	parts = [part for part in path.strip('/').split('/') if part]
+	current: Any = root['data']
+	steps: list[tuple[dict[str, Any], str, str]] = []
+	for i, part in enumerate(parts):
+		children = current.get('children', {})
+		if part not in children:
+			if i < len(parts) - 1:
+				return root, []
+			return rebuild(root, steps + [(current, 'children', part)], data), []
+		steps.append((current, 'children', part))
+		current = children[part]
+	changes: list[tuple[str, Value]] = []
+	merged = diff(current, data, '/' + '/'.join(parts), changes)
+	if merged is current:
+		return root, changes
+	return rebuild(root, steps, merged), changes
+
+class TreeSnapshot:
+	"""An immutable, consistent view of the tree as it was when the snapshot was taken."""
+	__slots__ = ("root",)
+
+	def __init__(self, root: dict[str, Any]):
+		self.root = root
+
+	@property
+	def data(self) -> dict[str, Any]:
+		return self.root.get('data', {})
+
+	def get(self, path: str) -> Optional[Union[dict[str, Any], Value]]:
+		return resolve(self.root, path)
@@ -3,45 +3,36 @@
 import asyncio
 import subprocess
 import sys
+from typing import Optional
 
-import aiofiles
-import aiohttp
 import toga
-from github import GitReleaseAsset
 from toga.style import Pack
 from toga.style.pack import COLUMN
 
+from . import updates
+from .updates import ReleaseAsset
+
 
 class UpdaterDialog(toga.Window):
-	def __init__(self, asset: GitReleaseAsset):
+	def __init__(self, asset: ReleaseAsset, assets: list[ReleaseAsset]):
 		super().__init__(title="Downloading update", size=(400, 200))
 		self.content = toga.Box(style=Pack(direction=COLUMN, padding=10))
 		self.content.add(toga.Label("Please wait while the update is downloaded"))
-		self.update_progress = toga.ProgressBar()
+		self.update_progress = toga.ProgressBar(max=100)
 		self.content.add(self.update_progress)
 		self.cancel_button = toga.Button("Cancel", on_press=self.cancel_download)
 		self.content.add(self.cancel_button)
-		self.download_task = self.app.loop.create_task(self.download_update(asset))
+		self.download_task = self.app.loop.create_task(self.download_update(asset, assets))
 
-	async def download_update(self, asset: GitReleaseAsset):
+	async def download_update(self, asset: ReleaseAsset, assets: list[ReleaseAsset]):
 		self.update_progress.start()
 		destination = self.app.paths.cache/asset.name
 		try:
-			async with aiohttp.ClientSession() as client, client.get(asset.browser_download_url) as resp:
-				resp.raise_for_status()
-				total_size = resp.headers.get('Content-Length')
-				if total_size is None:
-					total_size = asset.size
-				async with aiofiles.open(destination, "wb") as f:
-					downloaded = 0
-					chunk_size = 1024
-					async for chunk in resp.content.iter_chunked(chunk_size):
-						if chunk:
-							await f.write(chunk)
-							downloaded += len(chunk)
-							if total_size > 0:
-								progress = downloaded / total_size * 100
-								self.update_progress.value = progress
+			sha256 = await updates.published_sha256(asset, assets)
+			if sha256 is None:
+				await self.app.dialog(toga.ErrorDialog("Error", "No checksum was published for this update, so it cannot be verified. Please download it from https://uaaccess.org instead."))
+				return
+			await updates.download(asset.browser_download_url, destination, sha256, self.on_progress)
 			self.update_progress.stop()
 			await self.app.dialog(toga.InfoDialog("Done", "The update has been downloaded and is ready to be installed. Click okay to proceed with the installation."))
 			if sys.platform == "win32":
@@ -50,13 +41,18 @@ class UpdaterDialog(toga.Window):
 				subprocess.Popen(f"open {destination!s}")
 			self.app.request_exit()
 		except asyncio.CancelledError:
+			# The partial download is kept in the cache directory so the next attempt resumes it.
 			self.update_progress.stop()
-			if destination.exists():
-				await aiofiles.os.remove(destination)
 			return
 		except Exception as e:
+			self.update_progress.stop()
 			await self.app.dialog(toga.ErrorDialog("Error", f"Update download failed: {e!s}"))
 			return
 
-	async def cancel_download(self):
+	def on_progress(self, downloaded: int, total: Optional[int]):
+		if total:
+			self.update_progress.value = downloaded / total * 100
+
+	def cancel_download(self, widget, *args, **kwargs):
 		self.download_task.cancel()
+		self.close()
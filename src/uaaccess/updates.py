@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+updates.py
+
+Looks up the latest UAAccess release on GitHub without blocking the event loop.
+
+Release metadata is cached on disk together with the ETag and Last-Modified validators of the response. Within the
+TTL no request is made at all; after it, a conditional request is sent so an unchanged release costs a 304 with an
+empty body. Network failures fall back to the cached release, and connections fail fast instead of hanging startup.
+
+Installers are downloaded into a ".part" file next to their final destination. Interrupted downloads resume from
+where they stopped with an HTTP Range request, and the file is only moved into place once its SHA-256 matches the
+checksum published with the release.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import aiofiles
+import aiohttp
+
+LATEST_RELEASE_URL = "https://api.github.com/repos/uaaccess/uaaccess/releases/latest"
+CACHE_TTL = 6 * 60 * 60
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+# Chunks are sized so that one is written roughly this often, whatever the connection speed.
+CHUNK_INTERVAL = 0.25
+PROGRESS_INTERVAL = 0.1
+
+class ChecksumError(Exception):
+	pass
+
+@dataclass
+class ReleaseAsset:
+	name: str
+	browser_download_url: str
+	size: int
+	digest: Optional[str] = None
+
+@dataclass
+class Release:
+	tag_name: str
+	assets: list[ReleaseAsset] = field(default_factory=list)
+
+	@classmethod
+	def from_json(cls, data: dict[str, Any]) -> "Release":
+		assets = [ReleaseAsset(a["name"], a["browser_download_url"], a.get("size", 0), a.get("digest")) for a in data.get("assets", [])]
+		return cls(data["tag_name"], assets)
+
+class ReleaseChecker:
+	def __init__(self, cache_file: Path, url: str = LATEST_RELEASE_URL, ttl: float = CACHE_TTL, timeout: float = 5.0):
+		self.cache_file = Path(cache_file)
+		self.url = url
+		self.ttl = ttl
+		self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=min(timeout, 2.0))
+
+	async def load_cache(self) -> Optional[dict[str, Any]]:
+		try:
+			async with aiofiles.open(self.cache_file, "r", encoding="utf-8") as f:
+				return json.loads(await f.read())
+		except (OSError, ValueError):
+			return None
+
+	async def save_cache(self, cache: dict[str, Any]):
+		self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+		tmp_file = self.cache_file.with_suffix(".tmp")
+		async with aiofiles.open(tmp_file, "w", encoding="utf-8") as f:
+			await f.write(json.dumps(cache))
+		os.replace(tmp_file, self.cache_file)
+
+	async def latest_release(self) -> Optional[Release]:
+		"""Returns the latest release, from the cache if it is fresh enough, or None if it cannot be determined."""
+		cache = await self.load_cache()
+		cached_release = Release.from_json(cache["release"]) if cache is not None and "release" in cache else None
+		if cached_release is not None and time.time() - cache.get("fetched_at", 0) < self.ttl:
+			return cached_release
+		headers = {"Accept": "application/vnd.github+json"}
+		if cached_release is not None:
+			if cache.get("etag"):
+				headers["If-None-Match"] = cache["etag"]
+			if cache.get("last_modified"):
+				headers["If-Modified-Since"] = cache["last_modified"]
+		try:
+			async with aiohttp.ClientSession(timeout=self.timeout) as client, client.get(self.url, headers=headers) as resp:
+				if resp.status == 304 and cached_release is not None:
+					cache["fetched_at"] = time.time()
+					await self.save_cache(cache)
+					return cached_release
+				resp.raise_for_status()
+				release = Release.from_json(await resp.json())
+				await self.save_cache({
+					"etag": resp.headers.get("ETag"),
+					"last_modified": resp.headers.get("Last-Modified"),
+					"fetched_at": time.time(),
+					"release": asdict(release),
+				})
+				return release
+		except (aiohttp.ClientError, OSError, TimeoutError, ValueError, KeyError):
+			return cached_release
+
+async def published_sha256(asset: ReleaseAsset, assets: list[ReleaseAsset], timeout: float = 10.0) -> Optional[str]:
+	"""Returns the SHA-256 GitHub computed for the asset, or the one published in a "<name>.sha256" companion asset."""
+	if asset.digest is not None and asset.digest.startswith("sha256:"):
+		return asset.digest.removeprefix("sha256:").lower()
+	companion = next((a for a in assets if a.name == f"{asset.name}.sha256"), None)
+	if companion is None:
+		return None
+	async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as client, client.get(companion.browser_download_url) as resp:
+		resp.raise_for_status()
+		text = await resp.text()
+	return text.split()[0].lower() if text.strip() else None
+
+class PartialDownload:
+	"""A ".part" file together with the running SHA-256 of its contents."""
+	def __init__(self, path: Path):
+		self.path = path
+		self.hasher = hashlib.sha256()
+		self.size = 0
+
+	async def load(self):
+		if not self.path.exists():
+			return
+		# Hash what we already have so verification still covers the whole file after resuming.
+		async with aiofiles.open(self.path, "rb") as f:
+			while chunk := await f.read(MAX_CHUNK_SIZE):
+				self.hasher.update(chunk)
+				self.size += len(chunk)
+
+	def restart(self):
+		self.hasher = hashlib.sha256()
+		self.size = 0
+
+	async def append(self, f, data: bytes):
+		await f.write(data)
+		self.hasher.update(data)
+		self.size += len(data)
+
+async def download(url: str, destination: Path, sha256: str, on_progress: Optional[Callable[[int, Optional[int]], None]] = None, retries: int = 5, timeout: float = 30.0) -> Path:
+	"""Downloads url to destination, resuming a previous partial download and verifying the result against sha256."""
+	destination = Path(destination)
+	part = PartialDownload(destination.with_name(destination.name + ".part"))
+	await part.load()
+	attempt = 0
+	client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+	async with aiohttp.ClientSession(timeout=client_timeout) as client:
+		while True:
+			try:
+				if await download_range(client, url, part, on_progress):
+					break
+			except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, TimeoutError):
+				pass
+			attempt += 1
+			if attempt > retries:
+				raise ConnectionError(f"Download of {url} was interrupted too many times")
+			await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 10.0))
+	if part.hasher.hexdigest() != sha256.lower():
+		os.remove(part.path)
+		raise ChecksumError(f"Checksum mismatch for {destination.name}")
+	os.replace(part.path, destination)
+	return destination
+
+async def download_range(client: aiohttp.ClientSession, url: str, part: PartialDownload, on_progress: Optional[Callable[[int, Optional[int]], None]]) -> bool:
+	"""Appends everything the part file is still missing. Returns whether the download is complete."""
+	headers = {"Range": f"bytes={part.size}-"} if part.size > 0 else {}
+	async with client.get(url, headers=headers) as resp:
+		if resp.status == 416:
+			# We already have every byte the server has.
+			return True
+		resp.raise_for_status()
+		if resp.status != 206:
+			# Either a fresh download or the server ignored the range, so start over.
+			part.restart()
+		total = part.size + resp.content_length if resp.content_length is not None else None
+		chunk_size = MIN_CHUNK_SIZE
+		buffer = bytearray()
+		last_write = last_progress = time.monotonic()
+		async with aiofiles.open(part.path, "ab" if part.size > 0 else "wb") as f:
+			try:
+				async for data in resp.content.iter_any():
+					buffer.extend(data)
+					if len(buffer) < chunk_size:
+						continue
+					now = time.monotonic()
+					await part.append(f, bytes(buffer))
+					rate = len(buffer) / max(now - last_write, 1e-3)
+					chunk_size = int(min(max(rate * CHUNK_INTERVAL, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE))
+					buffer.clear()
+					last_write = now
+					if on_progress is not None and now - last_progress >= PROGRESS_INTERVAL:
+						on_progress(part.size, total)
+						last_progress = now
+			finally:
+				# Keep whatever arrived before a disconnect so the next attempt resumes after it.
+				if buffer:
+					await part.append(f, bytes(buffer))
+		if on_progress is not None:
+			on_progress(part.size, total)
+		return total is None or part.size >= total
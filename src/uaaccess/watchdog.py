@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+watchdog.py
+
+Measures event loop scheduling lag and attributes stalls to the code that caused them.
+
+A heartbeat task sleeps for a fixed interval and records how late it wakes up. Meanwhile a background thread
+notices when the heartbeat is overdue by more than the threshold and samples the stack of the event loop thread,
+so that when the loop finally resumes the stall can be blamed on the innermost UAAccess function that was running
+(for example `UAAccess.build_input_widgets` or `EffectParametersDialog.__init__`).
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from . import metrics
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@dataclass
+class SlowCallback:
+	name: str
+	count: int = 0
+	worst: float = 0.0
+	total: float = 0.0
+	last_seen: float = 0.0
+
+class LoopWatchdog:
+	def __init__(self, interval: float = 0.1, threshold: float = 0.1):
+		self.interval = interval
+		self.threshold = threshold
+		self.loop: Optional[asyncio.AbstractEventLoop] = None
+		self.loop_thread: Optional[int] = None
+		self.last_tick = time.monotonic()
+		self.lag = 0.0
+		self.max_lag = 0.0
+		self.stalls = 0
+		self.offenders: dict[str, SlowCallback] = {}
+		self.stall_samples: Counter[str] = Counter()
+		self.heartbeat_task: Optional[asyncio.Task] = None
+		self.sampler: Optional[threading.Thread] = None
+		self.stopping = threading.Event()
+
+	def start(self, loop: asyncio.AbstractEventLoop):
+		"""Starts watching. Must be called from the thread running `loop`."""
+		self.loop = loop
+		self.loop_thread = threading.get_ident()
+		self.last_tick = time.monotonic()
+		self.heartbeat_task = loop.create_task(self.heartbeat())
+		self.sampler = threading.Thread(target=self.sample_stalls, name="uaaccess-watchdog", daemon=True)
+		self.sampler.start()
+		metrics.register_section("Slow callbacks", self.render_offenders)
+
+	def stop(self):
+		self.stopping.set()
+		if self.heartbeat_task is not None:
+			self.heartbeat_task.cancel()
+		metrics.unregister_section("Slow callbacks")
+
+	async def heartbeat(self):
+		while True:
+			before = time.monotonic()
+			await asyncio.sleep(self.interval)
+			self.last_tick = time.monotonic()
+			lag = max(0.0, self.last_tick - before - self.interval)
+			# Exponentially weighted so a single hiccup doesn't dominate the reading.
+			self.lag = self.lag * 0.9 + lag * 0.1
+			self.max_lag = max(self.max_lag, lag)
+			metrics.record("Event loop lag (s)", self.lag)
+			metrics.record("Event loop max lag (s)", self.max_lag)
+			if lag >= self.threshold:
+				self.record_stall(lag)
+			self.stall_samples = Counter()
+
+	def record_stall(self, lag: float):
+		self.stalls += 1
+		metrics.record("Event loop stalls", self.stalls)
+		name = self.stall_samples.most_common(1)[0][0] if self.stall_samples else "unknown"
+		offender = self.offenders.get(name)
+		if offender is None:
+			offender = self.offenders[name] = SlowCallback(name)
+		offender.count += 1
+		offender.total += lag
+		offender.worst = max(offender.worst, lag)
+		offender.last_seen = time.time()
+
+	def sample_stalls(self):
+		while not self.stopping.wait(self.interval / 2):
+			if time.monotonic() - self.last_tick < self.interval + self.threshold:
+				continue
+			frame = sys._current_frames().get(self.loop_thread)
+			if frame is not None:
+				self.stall_samples[culprit(frame)] += 1
+
+	def worst_offenders(self, count: int = 10) -> list[SlowCallback]:
+		return sorted(self.offenders.values(), key=lambda offender: offender.worst, reverse=True)[:count]
+
+	def render_offenders(self) -> list[str]:
+		offenders = self.worst_offenders()
+		if not offenders:
+			return ["None recorded"]
+		return [f"{o.name}: worst {o.worst * 1000:.0F} ms, {o.count} times, {o.total * 1000:.0F} ms total" for o in offenders]
+
+def culprit(frame) -> str:
+	"""Returns the qualified name of the innermost frame belonging to UAAccess, or of the innermost frame if none does."""
+	innermost = frame.f_code.co_qualname
+	while frame is not None:
+		filename = frame.f_code.co_filename
+		if filename.startswith(PACKAGE_DIR) and filename != __file__:
+			return frame.f_code.co_qualname
+		frame = frame.f_back
+	return innermost
+
+instance: Optional[LoopWatchdog] = None
@@ -0,0 +1,178 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Test doubles shared by the suites: a local stand-in for the console's TCP protocol (null-terminated JSON messages on
+port 4710), a NetworkManager on a fake connection, a fake VST3 plugin and an import time probe.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+import uaaccess
+from uaaccess import tree
+from uaaccess.network import NetworkManager
+
+
+def prop(type, value, **extra):
+    return {"type": type, "value": value, **extra}
+
+
+def small_console(inputs=2, devices=1):
+    return {"properties": {}, "commands": {}, "children": {"devices": {"properties": {}, "children": {str(d): {
+        "properties": {"DeviceName": prop("string", "Apollo Twin" if d == 0 else f"Apollo x8 {d}", readonly=True)},
+        "children": {"inputs": {"properties": {}, "children": {str(i): {"properties": {
+            "Name": prop("string", f"Input {i + 1}"),
+            "Mute": prop("bool", False),
+            "FaderLevel": prop("float", 0.0, min=-144.0, max=12.0),
+        }, "children": {}} for i in range(inputs)}}},
+    } for d in range(devices)}}, "plugins": {"properties": {}, "children": {"0": {"properties": {
+        "Name": prop("string", "Pultec EQP-1A"), "Status": prop("string", "Authorized"), "Unison": prop("bool", False),
+    }, "children": {}}}}}}
+
+
+class StubConsole:
+    def __init__(self, data=None):
+        self.root = {"path": "/", "data": copy.deepcopy(data if data is not None else small_console())}
+        self.server = None
+        self.subscribers = set()
+        self.requests = []
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, "127.0.0.1", 0)
+        return self
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.subscribers):
+            writer.close()
+        await self.server.wait_closed()
+
+    def count(self, prefix):
+        return sum(1 for request in self.requests if request.startswith(prefix))
+
+    async def send(self, writer, message):
+        writer.write(json.dumps(message).encode() + b"\x00")
+        await writer.drain()
+
+    async def push(self, path, value):
+        """Changes a value on the console side and notifies subscribers, like a hardware knob turn."""
+        self.root = tree.assoc(self.root, path, value)
+        for writer in list(self.subscribers):
+            await self.send(writer, {"path": path, "data": value})
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    message = (await reader.readuntil(b"\x00"))[:-1].decode()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                self.requests.append(message)
+                command, _, rest = message.partition(" ")
+                if command == "get":
+                    target, _, query = rest.partition("?")
+                    parameters = dict(parse_qsl(query))
+                    data = self.root["data"] if target == "/" else tree.resolve(self.root, target)
+                    if data is None:
+                        await self.send(writer, {"path": target, "parameters": parameters, "error": "Path not found"})
+                        continue
+                    if isinstance(data, dict) and "children" in data and parameters.get("recursive") != "1":
+                        # Non-recursive gets list children without expanding them.
+                        data = {**data, "children": {name: {} for name in data["children"]}}
+                    await self.send(writer, {"path": target, "data": data})
+                elif command == "subscribe":
+                    self.subscribers.add(writer)
+                elif command == "set":
+                    path, _, value = rest.partition(" ")
+                    try:
+                        parsed = json.loads(value)
+                    except ValueError:
+                        parsed = value
+                    await self.push(path, parsed)
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+
+
+class FakeWriter:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+
+    async def drain(self):
+        pass
+
+
+def make_manager():
+    """A NetworkManager over a small two-input tree, writing to a FakeWriter instead of a console."""
+    manager = NetworkManager()
+    manager.tree = {"path": "/", "data": tree.compact({"properties": {}, "children": {"devices": {"properties": {}, "children": {"0": {
+        "properties": {"DeviceName": prop("string", "Apollo Twin", readonly=True)},
+        "children": {"inputs": {"properties": {}, "children": {
+            "0": {"properties": {"Name": prop("string", "Vox"), "Mute": prop("bool", False), "FaderLevel": prop("float", -6.0), "Meter": prop("float", -40.0, readonly=True)}, "children": {}},
+            "1": {"properties": {"Name": prop("string", "Gtr"), "Mute": prop("bool", True), "FaderLevel": prop("float", 0.0)}, "children": {}},
+        }}},
+    }}}}})}
+    manager.writer = FakeWriter()
+    return manager
+
+
+class FakeParameter:
+    def __init__(self, python_name, type, valid_values, strings):
+        self.python_name = python_name
+        self.name = python_name.title()
+        self.type = type
+        self.units = "dB" if type is float else None
+        self.valid_values = valid_values
+        self.strings = strings
+        self.raw_value = 0.0
+
+    @property
+    def string_value(self):
+        return self.strings[round(self.raw_value * (len(self.valid_values) - 1))]
+
+
+class FakePlugin:
+    def __init__(self):
+        self.parameters = {
+            "master_bypass": FakeParameter("master_bypass", bool, [False, True], ["Off", "On"]),
+            "gain": FakeParameter("gain", float, [-10.0, 0.0, 10.0], ["-10 dB", "0 dB", "+10 dB"]),
+            "mode": FakeParameter("mode", str, ["Clean", "Drive"], ["Clean", "Drive"]),
+            "boost": FakeParameter("boost", bool, [False, True], ["Off", "On"]),
+        }
+        self.resets = 0
+
+    def __setattr__(self, name, value):
+        if name in ("parameters", "resets"):
+            return super().__setattr__(name, value)
+        param = self.parameters[name]
+        param.raw_value = param.valid_values.index(value) / (len(param.valid_values) - 1)
+
+    def reset(self):
+        self.resets += 1
+
+
+def measure_imports(module: str = "uaaccess.app") -> dict[str, int]:
+    """Imports `module` in a fresh interpreter under -X importtime and returns cumulative microseconds per module."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(uaaccess.__file__).parent.parent), env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, capture_output=True, text=True, check=True)
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
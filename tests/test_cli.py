@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import json
+
+from tests.stub_console import StubConsole, measure_imports
+from uaaccess import cli, tree
+
+
+async def run_cli(console, *argv):
+    return await cli.run(cli.build_parser().parse_args(["--port", str(console.port), *argv]))
+
+
+def test_cli_does_not_import_the_gui():
+    timings = measure_imports("uaaccess.cli")
+    assert not {"toga", "uaaccess.app", "uaaccess.speech"} & set(timings)
+
+
+def test_dispatch_only_for_commands():
+    assert cli.is_cli_invocation(["--host", "10.0.0.2", "get", "/devices/0/DeviceName/value"])
+    assert not cli.is_cli_invocation([])
+    assert not cli.is_cli_invocation(["-psn_0_12345"])
+
+
+def test_get_set_and_apply(tmp_path, capsys):
+    async def scenario():
+        console = await StubConsole().start()
+        try:
+            assert await run_cli(console, "get", "/devices/0/inputs/1/Name/value") == 0
+            assert await run_cli(console, "set", "/devices/0/inputs/0/Mute/value", "true", "/devices/0/inputs/1/Name/value", "Bass DI") == 0
+            await asyncio.sleep(0.05)
+            assert tree.resolve(console.root, "/devices/0/inputs/0/Mute/value") is True
+            assert tree.resolve(console.root, "/devices/0/inputs/1/Name/value") == "Bass DI"
+            file = tmp_path / "values.json"
+            file.write_text(json.dumps({"/devices/0/inputs/0/Mute/value": True, "/devices/0/inputs/0/FaderLevel/value": -10.0}))
+            sets = console.count("set ")
+            assert await run_cli(console, "apply", str(file)) == 0
+            await asyncio.sleep(0.05)
+            assert console.count("set ") == sets + 1
+            assert tree.resolve(console.root, "/devices/0/inputs/0/FaderLevel/value") == -10.0
+        finally:
+            await console.stop()
+    asyncio.run(scenario())
+    assert capsys.readouterr().out.splitlines() == ['"Input 2"', "1 of 2 values sent"]
+
+
+def test_watch_prints_matching_changes(capsys):
+    async def scenario():
+        console = await StubConsole().start()
+        try:
+            watcher = asyncio.create_task(run_cli(console, "watch", "/devices/0/inputs/*/Mute/value", "--count", "2"))
+            while len(console.subscribers) == 0 or console.count("get /uaaccess_is_ready") == 0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            await console.push("/devices/0/inputs/0/FaderLevel/value", -3.0)
+            await console.push("/devices/0/inputs/1/Mute/value", True)
+            await console.push("/devices/0/inputs/0/Mute/value", True)
+            assert await asyncio.wait_for(watcher, 5) == 0
+        finally:
+            await console.stop()
+    asyncio.run(scenario())
+    assert capsys.readouterr().out.splitlines() == ["/devices/0/inputs/1/Mute/value true", "/devices/0/inputs/0/Mute/value true"]
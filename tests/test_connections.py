@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import time
+
+import pytest
+from blinker import signal
+
+from tests.stub_console import StubConsole
+from uaaccess import network
+from uaaccess.network import ConnectionRegistry, NetworkManager, parse_address
+
+
+def test_registry_keeps_several_consoles_and_tags_their_events(monkeypatch):
+    async def scenario():
+        studio_a, studio_b = await StubConsole().start(), await StubConsole().start()
+        registry = ConnectionRegistry()
+        monkeypatch.setattr(network, "registry", registry)
+        monkeypatch.setattr(network, "instance", None)
+        received = []
+
+        async def on_mute(sender, **kwargs):
+            received.append((sender.name, kwargs["path"], kwargs["data"], registry.tag(sender, "Input 1 muted")))
+        signal("Mute").connect(on_mute)
+        try:
+            a = await registry.connect("Studio A", "127.0.0.1", studio_a.port)
+            assert network.instance is a and registry.tag(a, "ready") == "ready"
+            b = await registry.connect("Studio B", "127.0.0.1", studio_b.port)
+            assert network.instance is a and len(registry) == 2
+            await asyncio.gather(a.handle_events_normally.wait(), b.handle_events_normally.wait())
+            await studio_b.push("/devices/0/inputs/0/Mute/value", True)
+            await asyncio.sleep(0.05)
+            assert received == [("Studio B", "/devices/0/inputs/0/Mute/value", True, "Studio B: Input 1 muted")]
+            assert a.get("/devices/0/inputs/0/Mute/value") is False
+            registry.activate("Studio B")
+            assert network.instance is b
+            registry.remove("Studio B")
+            assert network.instance is a and registry.active == "Studio A" and "Studio B" not in registry
+            await asyncio.sleep(0)
+            assert b.receive_task.cancelled()
+        finally:
+            signal("Mute").disconnect(on_mute)
+            for manager in list(registry):
+                registry.remove(manager.name)
+            await studio_a.stop()
+            await studio_b.stop()
+    asyncio.run(scenario())
+
+
+def test_parse_address_accepts_hostnames_and_ports():
+    assert parse_address("192.168.1.20") == ("192.168.1.20", 4710)
+    assert parse_address(" studio-mac.local:4711 ") == ("studio-mac.local", 4711)
+    assert parse_address("fe80::1") == ("fe80::1", 4710)
+    assert parse_address("[fe80::1]:4711") == ("fe80::1", 4711)
+    for text in ["", "studio:0", "studio:port", "[fe80::1", "bad_host!", "-studio"]:
+        with pytest.raises(ValueError):
+            parse_address(text)
+
+
+def test_connects_by_hostname_and_gives_up_on_dead_hosts():
+    async def scenario():
+        console = await StubConsole().start()
+        manager = NetworkManager(log_packets=False)
+        try:
+            # localhost may resolve to ::1 first, where nothing listens; the IPv4 attempt still wins.
+            await manager.preload_tree("localhost", console.port)
+            assert manager.get("/devices/0/DeviceName/value") == "Apollo Twin"
+        finally:
+            manager.close()
+            await console.stop()
+        start = time.perf_counter()
+        with pytest.raises(OSError):
+            # TEST-NET-1 is never routed: the attempt either fails at once or times out.
+            await NetworkManager(log_packets=False).connect_to_server("192.0.2.1", 4710, timeout=0.2)
+        assert time.perf_counter() - start < 2
+    asyncio.run(scenario())
+
+
+def test_preload_fails_when_the_console_closes_early_or_stays_silent():
+    async def scenario(close):
+        async def handle_client(reader, writer):
+            await reader.readuntil(b"\x00")
+            if not close:
+                # Accept requests but never answer them, until the client gives up.
+                await reader.read()
+            writer.close()
+        server = await asyncio.start_server(handle_client, "127.0.0.1", 0)
+        manager = NetworkManager(log_packets=False)
+        try:
+            start = time.perf_counter()
+            with pytest.raises(ConnectionError if close else TimeoutError):
+                await manager.preload_tree("127.0.0.1", server.sockets[0].getsockname()[1], timeout=0.3)
+            assert time.perf_counter() - start < 2
+            assert not manager.pending
+        finally:
+            manager.close()
+            server.close()
+    asyncio.run(scenario(close=True))
+    asyncio.run(scenario(close=False))
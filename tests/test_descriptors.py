@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from tests.stub_console import make_manager
+from uaaccess import descriptors, tree
+from uaaccess.descriptors import InvalidValueError, compile_descriptor
+
+
+def prop(type, value=None, **extra):
+    return {"type": type, "value": value, **extra}
+
+
+def test_values_are_converted_and_clamped():
+    assert compile_descriptor(prop("bool")).coerce("On") is True
+    assert compile_descriptor(prop("bool")).coerce(0) is False
+    fader = compile_descriptor(prop("float", min=-144.0, max=12.0))
+    assert fader.coerce(Decimal("-3.5")) == -3.5
+    assert fader.coerce("20") == 12.0
+    assert fader.encode(-200) == "-144.0"
+    assert compile_descriptor(prop("float", values=[0.0, 0.5, 1.0])).coerce("0.5") == 0.5
+    level = compile_descriptor(prop("int", min=0, max=10))
+    assert level.coerce(Decimal("4")) == 4 and level.coerce(11.0) == 10
+    assert compile_descriptor(prop("string", values=["Mic", "Line"])).encode("Line") == '"Line"'
+
+
+@pytest.mark.parametrize("metadata, value", [
+    (prop("bool"), "maybe"),
+    (prop("float"), "loud"),
+    (prop("float"), float("nan")),
+    (prop("float", values=[0.0, 0.5]), 0.3),
+    (prop("int"), 1.5),
+    (prop("int", values=[1, 2]), 3),
+    (prop("string", values=["Mic", "Line"]), "Hi-Z"),
+    (prop("string"), 5),
+    (prop("string", readonly=True), "Apollo"),
+])
+def test_invalid_values_are_refused(metadata, value):
+    with pytest.raises(InvalidValueError):
+        compile_descriptor(metadata).coerce(value)
+
+
+def test_set_value_refuses_locally_and_caches_descriptors(monkeypatch):
+    manager = make_manager()
+    compiled = []
+    monkeypatch.setattr(descriptors, "cache", {})
+    monkeypatch.setattr(descriptors, "compile_descriptor", lambda p: compiled.append(p) or compile_descriptor(p))
+
+    async def scenario():
+        await manager.set_value("/devices/0/inputs/0/Mute/value", "true")
+        await manager.set_value("/devices/0/inputs/0/Mute/value", False)
+        with pytest.raises(InvalidValueError):
+            await manager.set_value("/devices/0/inputs/0/Meter/value", 0.0)
+        with pytest.raises(InvalidValueError):
+            await manager.set_value("/devices/0/inputs/7/Mute/value", True)
+        with pytest.raises(InvalidValueError):
+            await manager.set_values([("/devices/0/inputs/0/Mute/value", True), ("/devices/0/inputs/0/Mute/value", "maybe")])
+    asyncio.run(scenario())
+    assert manager.writer.writes == [b"set /devices/0/inputs/0/Mute/value true\x00", b"set /devices/0/inputs/0/Mute/value false\x00"]
+    # Changing the value replaced the node, but not its schema, so the descriptor was compiled once.
+    assert len([p for p in compiled if p.get("type") == "bool"]) == 1
+    assert tree.resolve(manager.tree, "/devices/0/inputs/0/Mute/value") is False
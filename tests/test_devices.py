@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+
+from tests.stub_console import StubConsole, small_console
+from uaaccess import tree
+from uaaccess.network import NetworkManager, property_changed
+
+
+def test_devices_are_listed_and_loaded_on_demand():
+    async def scenario():
+        console = await StubConsole(small_console(devices=2)).start()
+        manager = NetworkManager(log_packets=False)
+        changes = []
+
+        async def on_change(sender, **kwargs):
+            changes.append(kwargs["path"])
+        property_changed.connect(on_change)
+        try:
+            await manager.preload_tree("127.0.0.1", console.port)
+            await manager.handle_events_normally.wait()
+            assert manager.device_ids() == ["0", "1"]
+            assert manager.is_device_loaded("0") and not manager.is_device_loaded("1")
+            assert tree.is_stub(manager.get("/devices/1"))
+            assert manager.get("/plugins/0/Name/value") == "Pultec EQP-1A"
+            assert console.count("get /?recursive=1") == 0
+            assert console.count("subscribe /devices/1") == 0
+            await manager.load_device(1)
+            await manager.load_device("1")
+            await asyncio.sleep(0.05)
+            assert manager.get("/devices/1/DeviceName/value") == "Apollo x8 1"
+            assert console.count("get /devices/1?recursive=1") == 1
+            assert console.count("subscribe /devices/1?recursive=1") == 1
+            # Filling in a stub is a load, not a change.
+            assert changes == []
+            await manager.load_devices_for(["/devices/1/inputs/0/Mute/value", "/devices/7/Name/value"])
+            assert console.count("get /devices/1?recursive=1") == 1
+        finally:
+            property_changed.disconnect(on_change)
+            manager.close()
+            await console.stop()
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import socket
+from ipaddress import IPv4Address, IPv4Network
+
+from tests.stub_console import StubConsole, small_console
+from uaaccess import discovery
+from uaaccess.discovery import DiscoveryCache
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_scan_finds_consoles_and_skips_other_listeners(monkeypatch):
+    async def scenario():
+        consoles = [await StubConsole().start(), await StubConsole(small_console(devices=2)).start()]
+        # Something else listening on a port: accepts, but never answers in the console's protocol.
+        silent = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        probes, active, peak = [], 0, 0
+        probe = discovery.probe
+
+        async def counting_probe(host, port, timeout):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                return await probe(host, port, timeout)
+            finally:
+                active -= 1
+                probes.append(port)
+        monkeypatch.setattr(discovery, "probe", counting_probe)
+        ports = [console.port for console in consoles]
+        targets = [("127.0.0.1", port) for port in ports]
+        targets += [("127.0.0.1", silent.sockets[0].getsockname()[1]), ("127.0.0.1", free_port())]
+        try:
+            found = await discovery.scan(targets, timeout=0.3, concurrency=2)
+        finally:
+            silent.close()
+            for console in consoles:
+                await console.stop()
+        assert sorted(console.port for console in found) == sorted(ports)
+        assert [console.rtt for console in found] == sorted(console.rtt for console in found)
+        assert {console.name for console in found} == {"Apollo Twin"}
+        assert len(probes) == 4 and peak == 2
+    asyncio.run(scenario())
+
+
+def test_first_responder_wins_and_cancels_the_rest():
+    async def scenario():
+        console = await StubConsole().start()
+        silent = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        targets = [("127.0.0.1", silent.sockets[0].getsockname()[1]), ("127.0.0.1", free_port()), ("127.0.0.1", console.port)]
+        try:
+            start = asyncio.get_running_loop().time()
+            found = await discovery.first_responder(targets, timeout=5)
+            assert found.port == console.port
+            assert asyncio.get_running_loop().time() - start < 1
+            assert await discovery.first_responder(targets[:2], timeout=0.2) is None
+        finally:
+            silent.close()
+            await console.stop()
+    asyncio.run(scenario())
+
+
+def test_scan_targets_cover_each_subnet_once():
+    networks = discovery.local_subnets([IPv4Address("192.168.1.20"), IPv4Address("192.168.1.30"), IPv4Address("10.0.0.5")])
+    assert networks == [IPv4Network("10.0.0.0/24"), IPv4Network("192.168.1.0/24")]
+    targets = discovery.scan_targets(networks)
+    assert targets[0] == ("127.0.0.1", 4710)
+    assert len(targets) == 1 + 2 * 254
+
+
+def test_cache_remembers_last_console_and_scan(tmp_path):
+    cache = DiscoveryCache(tmp_path / "discovery.json")
+    assert cache.last() is None and cache.consoles() == []
+    cache.store_scan([discovery.DiscoveredConsole("192.168.1.20", 4710, "Apollo Twin", 0.002)])
+    cache.remember("192.168.1.20", 4710, "Apollo Twin")
+    cache.remember("fe80::1", 4711)
+    cache.remember("192.168.1.20", 4710, "Apollo Twin")
+    reloaded = DiscoveryCache(tmp_path / "discovery.json")
+    assert reloaded.last().host == "192.168.1.20"
+    assert [console.label for console in reloaded.recent()] == ["Apollo Twin (192.168.1.20)", "UA console ([fe80::1]:4711)"]
+    assert reloaded.consoles()[0].label == "Apollo Twin (192.168.1.20, 2 ms)"
+    (tmp_path / "discovery.json").write_text("not json")
+    assert reloaded.last() is None
@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import json
+
+from blinker import signal
+
+from tests.stub_console import StubConsole, make_manager
+from uaaccess import network
+from uaaccess.network import NetworkManager
+
+MUTE = "/devices/0/inputs/0/Mute/value"
+FADER = "/devices/0/inputs/0/FaderLevel/value"
+
+
+def reply(path, **message):
+    return json.dumps({"path": path, **message}).encode()
+
+
+def ready_manager():
+    manager = make_manager()
+    manager.handle_events_normally.set()
+    return manager
+
+
+def collect(name, manager):
+    received = []
+
+    async def on_signal(sender, **kwargs):
+        received.append(kwargs["data"])
+    signal(name).connect(on_signal, sender=manager)
+    return received, on_signal
+
+
+def test_edits_apply_at_once_and_echoes_are_swallowed():
+    async def scenario():
+        manager = ready_manager()
+        mutes, mute_handler = collect("Mute", manager)
+        faders, fader_handler = collect("FaderLevel", manager)
+        try:
+            await manager.apply_edit(MUTE, True)
+            assert manager.get(MUTE) is True and mutes == [True]
+            assert manager.writer.writes == [f"set {MUTE} true\x00".encode()]
+            await manager.process_message(reply(MUTE, data=True))
+            assert mutes == [True] and not manager.edits
+            # A fader dragged quickly: every step shows at once, and the echoes catching up change nothing.
+            for level in [-1.0, -2.0, -3.0]:
+                await manager.apply_edit(FADER, level)
+            assert manager.get(FADER) == -3.0 and faders == [-1.0, -2.0, -3.0]
+            for level in [-1.0, -2.0, -3.0]:
+                await manager.process_message(reply(FADER, data=level))
+            assert faders == [-1.0, -2.0, -3.0] and manager.get(FADER) == -3.0 and not manager.edits
+            # Unrelated changes from the console still come through.
+            await manager.process_message(reply(MUTE, data=False))
+            assert mutes == [True, False]
+        finally:
+            signal("Mute").disconnect(mute_handler)
+            signal("FaderLevel").disconnect(fader_handler)
+    asyncio.run(scenario())
+
+
+def test_console_disagreement_and_errors_roll_back():
+    async def scenario():
+        manager = ready_manager()
+        faders, fader_handler = collect("FaderLevel", manager)
+        try:
+            await manager.apply_edit(FADER, 20.0)
+            # The console clamped the value: it wins.
+            await manager.process_message(reply(FADER, data=12.0))
+            assert manager.get(FADER) == 12.0 and faders == [20.0, 12.0] and not manager.edits
+            await manager.apply_edit(FADER, -5.0)
+            await manager.apply_edit(FADER, -7.0)
+            await manager.process_message(reply(FADER, error="Permission denied"))
+            assert manager.get(FADER) == 12.0 and faders == [20.0, 12.0, -5.0, -7.0, 12.0] and not manager.edits
+        finally:
+            signal("FaderLevel").disconnect(fader_handler)
+    asyncio.run(scenario())
+
+
+def test_unanswered_edit_is_settled_by_asking_the_console(monkeypatch):
+    monkeypatch.setattr(network, "EDIT_TIMEOUT", 0.05)
+
+    async def scenario():
+        console = await StubConsole().start()
+        manager = NetworkManager(log_packets=False)
+        try:
+            await manager.preload_tree("127.0.0.1", console.port)
+            await manager.handle_events_normally.wait()
+            # Pretend the edit went out but its echo was lost.
+            console.subscribers.clear()
+            await manager.apply_edit(MUTE, True)
+            await asyncio.sleep(0.2)
+            assert console.count(f"get {MUTE}") == 1
+            assert not manager.edits and manager.get(MUTE) is True
+        finally:
+            manager.close()
+            await console.stop()
+    asyncio.run(scenario())
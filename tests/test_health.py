@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import time
+
+import pytest
+from blinker import signal
+
+from tests.stub_console import StubConsole
+from uaaccess import metrics
+from uaaccess.network import NetworkManager
+
+
+def test_pings_measure_round_trip_time():
+    async def scenario():
+        console = await StubConsole().start()
+        manager = NetworkManager(log_packets=True)
+        manager.name = "Studio"
+        try:
+            await manager.preload_tree("127.0.0.1", console.port)
+            manager.start_health_monitor(interval=0.02)
+            while manager.health.answered < 3:
+                await asyncio.sleep(0.01)
+            assert 0 < manager.health.srtt < 0.25
+            assert console.count("get /uaaccess_ping?seq=") >= 3
+            # Pings and their replies stay out of the packet log.
+            assert manager.packet_log and not any("uaaccess_ping" in (packet["message"] or "") for packet in manager.packet_log)
+            report = metrics.report()
+            assert "Connection to Studio" in report and "Smoothed round-trip time" in report
+        finally:
+            manager.close()
+            await console.stop()
+        assert "Connection to Studio" not in metrics.report()
+    asyncio.run(scenario())
+
+
+def test_latency_warning_is_announced_once_until_recovery():
+    async def scenario():
+        console = await StubConsole().start()
+        manager = NetworkManager(log_packets=False)
+        events = []
+
+        async def on_slow(sender, **kwargs):
+            events.append("slow")
+
+        async def on_recovered(sender, **kwargs):
+            events.append("recovered")
+        signal("ConnectionSlow").connect(on_slow, sender=manager)
+        signal("ConnectionRecovered").connect(on_recovered, sender=manager)
+        try:
+            await manager.preload_tree("127.0.0.1", console.port)
+            manager.start_health_monitor(interval=60, latency_warning=0.1)
+            monitor = manager.health
+            for rtt in [0.5, 0.5, 0.001, 0.001] + [0.001] * 30:
+                monitor.seq += 1
+                monitor.sent[monitor.seq] = time.monotonic() - rtt
+                await monitor.on_pong(str(monitor.seq))
+            assert events == ["slow", "recovered"]
+            assert monitor.jitter > 0
+        finally:
+            signal("ConnectionSlow").disconnect(on_slow)
+            signal("ConnectionRecovered").disconnect(on_recovered)
+            manager.close()
+            await console.stop()
+    asyncio.run(scenario())
+
+
+def test_silent_connection_is_aborted():
+    async def scenario():
+        # Accepts the connection, then never says anything again: a half-open link as far as the client can tell.
+        server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        manager = NetworkManager(log_packets=False)
+        lost = []
+
+        async def on_lost(sender, **kwargs):
+            lost.append(kwargs["silence"])
+        signal("ConnectionLost").connect(on_lost, sender=manager)
+        try:
+            await manager.connect_to_server("127.0.0.1", server.sockets[0].getsockname()[1])
+            manager.receive_task = asyncio.create_task(manager.handle_responses_continuously())
+            manager.start_health_monitor(interval=0.05, silence_timeout=0.2)
+            with pytest.raises((asyncio.IncompleteReadError, ConnectionError)):
+                await asyncio.wait_for(manager.receive_task, 5)
+            assert len(lost) == 1 and lost[0] > 0.2
+        finally:
+            signal("ConnectionLost").disconnect(on_lost)
+            manager.close()
+            server.close()
+    asyncio.run(scenario())
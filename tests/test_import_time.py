@@ -0,0 +1,26 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Startup import budget. Run `python -m tests.test_import_time` to print the slowest imports on the startup path."""
+
+from tests.stub_console import measure_imports
+
+# Only needed by the update check, the crash handler or the effects editor, so they must stay off the startup path.
+DEFERRED_MODULES = {"aiofiles", "aiohttp", "clipboard", "github", "packaging", "pedalboard", "win32more"}
+# Generous enough for slow CI machines; the startup path measured roughly 130 ms when this budget was set.
+BUDGET_US = 500_000
+
+
+def test_deferred_modules_are_not_imported_at_startup():
+    imported = {name.split(".")[0] for name in measure_imports()}
+    assert imported.isdisjoint(DEFERRED_MODULES), f"Imported at startup: {sorted(imported & DEFERRED_MODULES)}"
+
+
+def test_startup_import_budget():
+    timings = measure_imports()
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert timings["uaaccess.app"] <= BUDGET_US, f"Startup imports took {timings['uaaccess.app']} us: {slowest}"
+
+
+if __name__ == "__main__":
+    for name, cumulative in sorted(measure_imports().items(), key=lambda item: item[1], reverse=True)[:25]:
+        print(f"{cumulative / 1000:8.1F} ms  {name}")
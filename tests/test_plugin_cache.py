@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import random
+import time
+
+from tests.stub_console import FakePlugin
+from uaaccess.plugin_cache import ParameterMetadata, PluginMetadataCache
+
+
+def test_metadata_is_described_once_and_served_from_disk(tmp_path):
+    bundle = tmp_path / "Fake.vst3"
+    binary = bundle / "Contents" / "MacOS" / "Fake"
+    binary.parent.mkdir(parents=True)
+    binary.write_bytes(b"")
+    loads = []
+
+    def loader(path):
+        loads.append(path)
+        return FakePlugin()
+
+    metadata = PluginMetadataCache(tmp_path / "cache").load("Fake", bundle, binary, loader)
+    assert [p.python_name for p in metadata.parameters] == ["gain", "mode", "boost"]
+    gain = metadata.parameter(0)
+    assert gain.label == "Gain (dB)"
+    assert gain.display_values == ["-10 dB", "0 dB", "+10 dB"]
+    assert gain.raw_value_for("+10 dB") == 1.0
+    assert gain.display_value_for(0.49) == "0 dB"
+    assert metadata.parameter(2).raw_value_for(True) == 1.0
+
+    # A fresh cache object (as on the next launch) must not load the plugin again.
+    reopened = PluginMetadataCache(tmp_path / "cache").load("Fake", bundle, binary, loader)
+    assert reopened == metadata
+    assert len(loads) == 1
+
+
+def test_changed_binary_invalidates_cache(tmp_path):
+    bundle = tmp_path / "Fake.vst3"
+    binary = bundle / "Fake"
+    bundle.mkdir()
+    binary.write_bytes(b"")
+    cache = PluginMetadataCache(tmp_path / "cache")
+    cache.load("Fake", bundle, binary, lambda path: FakePlugin())
+    stale = cache.get("Fake", "", binary.stat().st_mtime + 1)
+    assert stale is None
+
+
+def test_cache_keeps_names_that_share_a_file_name_apart(tmp_path):
+    bundle = tmp_path / "Neve.vst3"
+    # No binary, so both plugins get the same version and mtime.
+    binary = bundle / "Neve"
+    names = ["Neve 1073", "Neve_1073", "Neve/1073"]
+    for name in names:
+        PluginMetadataCache(tmp_path / "cache").load(name, bundle, binary, lambda path: FakePlugin())
+    reopened = PluginMetadataCache(tmp_path / "cache")
+    assert [reopened.cached(name, bundle, binary).name for name in names] == names
+    assert reopened.cached("Neve-1073", bundle, binary) is None
+    assert len(list((tmp_path / "cache").glob("*.json"))) == len(names)
+
+
+def test_lookup_matches_nearest_value_search():
+    raw_values = [i / 999 for i in range(1000)]
+    parameter = ParameterMetadata("freq", "Freq", "float", "Hz", raw_values, [f"{i} Hz" for i in range(1000)], list(reversed(raw_values)))
+    rng = random.Random(4710)
+    for raw in [rng.random() for _ in range(2000)] + [0.0, 1.0, -0.5, 1.5]:
+        expected = min(range(1000), key=lambda i: abs(parameter.raw_values[i] - raw))
+        assert parameter.display_value_for(raw) == parameter.display_values[expected]
+    assert parameter.raw_value_for("0 Hz") == 1.0
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        parameter.display_value_for(0.5)
+    assert (time.perf_counter() - start) / 10_000 < 50e-6
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import copy
+
+from blinker import signal
+
+from uaaccess.plugin_catalog import PluginCatalog
+
+
+def plugin(name, status, unison, categories):
+    return {"properties": {
+        "Name": {"value": name},
+        "Status": {"value": status},
+        "Unison": {"value": unison},
+        "Categories": {"value": categories},
+    }}
+
+
+PLUGINS = {
+    "0": plugin("Neve 1073", "Authorized", True, "Preamp,EQ"),
+    "1": plugin("API Vision", "Trial Expired", True, "Channel Strip"),
+    "2": plugin("Pultec EQP-1A", "Authorized", False, "EQ"),
+    "3": plugin("1176 Classic", "Authorized (Demo)", True, "Compressor"),
+}
+
+
+def names(entries):
+    return [entry.name for entry in entries]
+
+
+def test_queries_use_facets_and_leave_tree_untouched():
+    tree = copy.deepcopy(PLUGINS)
+    catalog = PluginCatalog(tree)
+    assert names(catalog.query(unison_only=True)) == ["1176 Classic", "API Vision", "Neve 1073"]
+    assert names(catalog.query(authorized_only=True, unison_only=True)) == ["1176 Classic", "Neve 1073"]
+    assert names(catalog.query(category="EQ")) == ["Neve 1073", "Pultec EQP-1A"]
+    assert catalog.query(unison_only=True) is catalog.query(unison_only=True)
+    assert catalog.categories() == ["Channel Strip", "Compressor", "EQ", "Preamp"]
+    assert tree == PLUGINS
+
+
+def test_status_and_name_events_update_the_index():
+    catalog = PluginCatalog(PLUGINS)
+    catalog.connect()
+    try:
+        async def push():
+            await signal("Status").send_async(None, path="/plugins/1/Status/value", data="Authorized")
+            await signal("Name").send_async(None, path="/plugins/0/Name/value", data="Neve 1073 Preamp")
+            await signal("Name").send_async(None, path="/devices/0/inputs/0/Name/value", data="Vocal")
+        asyncio.run(push())
+    finally:
+        catalog.disconnect()
+    assert names(catalog.query(authorized_only=True, unison_only=True)) == ["1176 Classic", "API Vision", "Neve 1073 Preamp"]
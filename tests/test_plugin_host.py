@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from tests.stub_console import FakePlugin
+from uaaccess.plugin_cache import PluginMetadata
+from uaaccess.plugin_host import PluginHostError, PluginHostPool
+
+
+def load_fake(path):
+    if path.endswith("Crashing.vst3"):
+        os._exit(1)
+    if path.endswith("Hanging.vst3"):
+        time.sleep(60)
+    return FakePlugin()
+
+
+async def exercise_pool():
+    pool = PluginHostPool(size=2, loader="tests.test_plugin_host:load_fake", capacity=2)
+    try:
+        metadata = PluginMetadata.from_json(await pool.describe("/plugins/A.vst3", "A", "1.0", 0.0))
+        assert [p.python_name for p in metadata.parameters] == ["gain", "mode", "boost"]
+        assert await pool.to_string("/plugins/A.vst3", "gain", 1.0) == "+10 dB"
+        for name in ("B", "C", "D"):
+            await pool.request("loaded", f"/plugins/{name}.vst3")
+        # A, C share a host with capacity 2, so loading A, C and then E there evicts A.
+        await pool.request("loaded", "/plugins/E.vst3")
+        assert await pool.request("loaded", "/plugins/E.vst3") == ["/plugins/C.vst3", "/plugins/E.vst3"]
+        with pytest.raises(PluginHostError):
+            await pool.describe("/plugins/Crashing.vst3", "Crashing", "1.0", 0.0)
+        # The crashed worker is replaced and keeps serving requests.
+        assert await pool.to_string("/plugins/A.vst3", "mode", 1.0) == "Drive"
+    finally:
+        pool.stop()
+
+
+def test_pool_loads_describes_evicts_and_survives_crashes():
+    asyncio.run(exercise_pool())
+
+
+async def exercise_stuck_requests():
+    pool = PluginHostPool(size=1, loader="tests.test_plugin_host:load_fake", capacity=2, timeout=1.0)
+    try:
+        await pool.request("loaded", "/plugins/A.vst3")
+        with pytest.raises(PluginHostError):
+            await pool.describe("/plugins/Hanging.vst3", "Hanging", "1.0", 0.0)
+        assert await pool.request("loaded", "/plugins/A.vst3") == ["/plugins/A.vst3"]
+        # A cancelled request must not leave its reply to be read as the answer to the next one.
+        worker = pool.hosts[0].process.pid
+        task = asyncio.create_task(pool.to_string("/plugins/A.vst3", "gain", 1.0))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert await pool.request("loaded", "/plugins/B.vst3") == ["/plugins/B.vst3"]
+        assert pool.hosts[0].process.pid != worker
+    finally:
+        pool.stop()
+
+
+def test_stuck_and_cancelled_requests_replace_the_worker():
+    asyncio.run(exercise_stuck_requests())
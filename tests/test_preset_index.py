@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from uaaccess.preset_index import Preset, PresetIndex
+
+VALUES = [
+    {"type": "file", "value": "Default"},
+    {"type": "folder", "value": "Vocals", "children": [
+        {"type": "file", "value": "Bright Vocal"},
+        {"type": "folder", "value": "Rap", "children": [{"type": "file", "value": "Vocal Crunch"}]},
+    ]},
+    {"type": "folder", "value": "Drums", "children": [{"type": "file", "value": "Big Kick"}]},
+]
+
+
+def test_folders_expand_lazily():
+    index = PresetIndex(VALUES)
+    assert index.presets() == ["Default"]
+    assert set(index.expanded) == {""}
+    assert index.subfolders("Vocals") == ["Vocals / Rap"]
+    assert index.presets("Vocals / Rap") == ["Vocal Crunch"]
+    assert "Drums" not in index.expanded
+    assert index.folders() == ["", "Vocals", "Vocals / Rap", "Drums"]
+
+
+def test_search_ranks_prefix_matches_first():
+    index = PresetIndex(VALUES)
+    assert index.search("vocal") == [Preset("Vocals / Rap", "Vocal Crunch"), Preset("Vocals", "Bright Vocal")]
+    assert index.search("KICK") == [Preset("Drums", "Big Kick")]
+    assert index.search("  ") == []
+    assert index.locate("Big Kick").label == "Drums: Big Kick"
+    assert index.locate("Missing") is None
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import pstats
+import time
+
+from uaaccess import profiling
+from uaaccess.profiling import ProfileFormat, ProfileScope
+
+
+def busy_network_work():
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        pass
+
+
+def busy_ui_work():
+    deadline = time.monotonic() + 0.05
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_scoped_pstats_capture_only_records_scope(tmp_path):
+    profiling.start(ProfileScope.NETWORK, ProfileFormat.PSTATS)
+    with profiling.scope(ProfileScope.NETWORK):
+        busy_network_work()
+    with profiling.scope(ProfileScope.UI):
+        busy_ui_work()
+
+    async def handle_message():
+        busy_network_work()
+        # While the network scope is suspended here, the UI task below runs and must not be recorded.
+        await asyncio.sleep(0.01)
+        busy_network_work()
+        return "handled"
+
+    async def build_ui():
+        busy_ui_work()
+
+    async def scenario():
+        ui = asyncio.create_task(build_ui())
+        assert await profiling.scoped(ProfileScope.NETWORK, handle_message()) == "handled"
+        await ui
+    asyncio.run(scenario())
+    capture = profiling.stop()
+    capture.save(tmp_path / "capture.pstats")
+    functions = {name for _, _, name in pstats.Stats(str(tmp_path / "capture.pstats")).stats}
+    assert "busy_network_work" in functions
+    assert "busy_ui_work" not in functions
+
+
+def test_sampling_capture_writes_collapsed_stacks(tmp_path):
+    profiling.start(ProfileScope.ALL, ProfileFormat.COLLAPSED)
+    busy_network_work()
+    capture = profiling.stop()
+    capture.save(tmp_path / "capture.folded")
+    lines = (tmp_path / "capture.folded").read_text().splitlines()
+    assert any("busy_network_work" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+
+from tests.stub_console import StubConsole
+from uaaccess.network import NetworkManager
+from uaaccess.proxy import ConsoleProxy
+
+CLIENTS = 20
+
+
+async def wait_for(condition, timeout=5):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_clients_share_one_upstream_subscription():
+    async def scenario():
+        console = await StubConsole().start()
+        upstream = NetworkManager(log_packets=False)
+        await upstream.preload_tree("127.0.0.1", console.port)
+        await upstream.load_all_devices()
+        await upstream.handle_events_normally.wait()
+        gets, subscriptions = console.count("get "), console.count("subscribe ")
+        proxy = ConsoleProxy(upstream)
+        await proxy.start("127.0.0.1", 0)
+        clients = [NetworkManager(log_packets=False) for _ in range(CLIENTS)]
+        try:
+            await asyncio.gather(*(client.preload_tree("127.0.0.1", proxy.port) for client in clients))
+            await asyncio.gather(*(client.handle_events_normally.wait() for client in clients))
+            assert all(client.get("/devices/0/DeviceName/value") == "Apollo Twin" for client in clients)
+            await console.push("/devices/0/inputs/0/FaderLevel/value", -12.0)
+            await wait_for(lambda: all(client.get("/devices/0/inputs/0/FaderLevel/value") == -12.0 for client in clients))
+            await clients[3].send_request("set /devices/0/inputs/1/Mute/value true")
+            await wait_for(lambda: all(client.get("/devices/0/inputs/1/Mute/value") is True for client in clients))
+            assert console.count("get ") == gets
+            assert console.count("subscribe ") == subscriptions
+            assert console.count("set ") == 1
+            assert len(proxy.clients) == CLIENTS
+            assert proxy.forwarded == 1 and proxy.fanned_out == 2 * CLIENTS
+        finally:
+            for client in clients:
+                client.close()
+            await proxy.stop()
+            upstream.close()
+            await console.stop()
+    asyncio.run(scenario())
+
+
+def test_unknown_paths_and_unsubscribe():
+    async def scenario():
+        console = await StubConsole().start()
+        upstream = NetworkManager(log_packets=False)
+        await upstream.preload_tree("127.0.0.1", console.port)
+        await upstream.handle_events_normally.wait()
+        proxy = ConsoleProxy(upstream)
+        await proxy.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+        try:
+            writer.write(b"get /devices/0/inputs/9?x=1\x00subscribe /devices/0/inputs/1\x00get /devices/0/inputs/0/Name/value\x00")
+            assert b'"error": "Path not found"' in await reader.readuntil(b"\x00")
+            assert await reader.readuntil(b"\x00") == b'{"path": "/devices/0/inputs/0/Name/value", "data": "Input 1"}\x00'
+            await console.push("/devices/0/inputs/0/Mute/value", True)
+            await console.push("/devices/0/inputs/1/Mute/value", True)
+            assert await reader.readuntil(b"\x00") == b'{"path": "/devices/0/inputs/1/Mute/value", "data": true}\x00'
+        finally:
+            writer.close()
+            await proxy.stop()
+            upstream.close()
+            await console.stop()
+    asyncio.run(scenario())
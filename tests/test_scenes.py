@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+
+import pytest
+
+from tests.stub_console import make_manager
+from uaaccess import scenes
+from uaaccess.scenes import SceneError, SceneStore
+
+
+def test_capture_records_only_writable_values():
+    scene = scenes.capture(make_manager().snapshot(), 0, "Tracking")
+    assert scene.values == {
+        "/devices/0/inputs/0/FaderLevel/value": -6.0,
+        "/devices/0/inputs/0/Mute/value": False,
+        "/devices/0/inputs/0/Name/value": "Vox",
+        "/devices/0/inputs/1/FaderLevel/value": 0.0,
+        "/devices/0/inputs/1/Mute/value": True,
+        "/devices/0/inputs/1/Name/value": "Gtr",
+    }
+    with pytest.raises(SceneError):
+        scenes.capture(make_manager().snapshot(), 3, "Missing")
+
+
+def test_recall_sends_only_the_differences_in_one_write():
+    manager = make_manager()
+    scene = scenes.capture(manager.snapshot(), 0, "Tracking")
+    manager.set("/devices/0/inputs/0/Mute/value", True)
+    manager.set("/devices/0/inputs/1/Name/value", 'Gtr "DI"')
+    manager.set("/devices/0/inputs/1/FaderLevel/value", -3.5)
+    scene.values["/devices/0/inputs/1/Name/value"] = 'Gtr "Amp"'
+    assert asyncio.run(scenes.recall(manager, scene)) == 3
+    assert manager.writer.writes == [
+        b'set /devices/0/inputs/0/Mute/value false\x00'
+        b'set /devices/0/inputs/1/FaderLevel/value 0.0\x00'
+        b'set /devices/0/inputs/1/Name/value "Gtr \\"Amp\\""\x00'
+    ]
+    manager.writer.writes.clear()
+    assert asyncio.run(scenes.recall(manager, scenes.capture(manager.snapshot(), 0, "Current"))) == 0
+    assert manager.writer.writes == []
+
+
+def test_store_round_trips_scenes(tmp_path):
+    store = SceneStore(tmp_path / "scenes")
+    scene = scenes.capture(make_manager().snapshot(), 0, "Mix / Final")
+    store.save(scene)
+    store.save(scenes.capture(make_manager().snapshot(), 0, "tracking"))
+    assert store.names() == ["Mix / Final", "tracking"]
+    assert store.load("Mix / Final") == scene
+    store.delete("tracking")
+    assert store.names() == ["Mix / Final"]
+    with pytest.raises(SceneError):
+        store.load("tracking")
+
+
+def test_store_keeps_names_that_share_a_file_name_apart(tmp_path):
+    store = SceneStore(tmp_path / "scenes")
+    names = ["Mix 1", "Mix_1", "Mix/1", "Микс", "Ρυθμ"]
+    for name in names:
+        store.save(scenes.capture(make_manager().snapshot(), 0, name))
+    assert sorted(store.names()) == sorted(names)
+    assert [store.load(name).name for name in names] == names
+    store.delete("Mix/1")
+    assert sorted(store.names()) == sorted(set(names) - {"Mix/1"})
@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import time
+
+from blinker import signal
+
+from tests.stub_console import prop, small_console
+from uaaccess import tree
+from uaaccess.network import NetworkManager
+from uaaccess.search_index import SearchIndex
+
+FRIENDLY = {"FaderLevel": "Volume"}
+
+
+def build(data, devices=("0",)):
+    return SearchIndex(tree.compact(data), list(devices), lambda name: FRIENDLY.get(name, name))
+
+
+def labels(entries):
+    return [entry.label for entry in entries]
+
+
+def large_console(inputs=64, sends=16, properties=40):
+    def channel(name, i):
+        props = {"Name": prop("string", f"{name} {i + 1}"), "FaderLevel": prop("float", 0.0), "Mute": prop("bool", False)}
+        props.update({f"Setting{p}": prop("int", 0) for p in range(properties)})
+        return {"properties": props, "children": {
+            "sends": {"properties": {}, "children": {str(s): {"properties": {"Name": prop("string", f"Aux {s + 1}"), "Gain": prop("float", 0.0)}, "children": {}} for s in range(sends)}},
+            "preamps": {"properties": {}, "children": {"0": {"properties": {"Gain": prop("float", 0.0), "48V": prop("bool", False)}, "children": {}}}},
+        }}
+    return {"properties": {}, "children": {"devices": {"properties": {}, "children": {"0": {"properties": {"DeviceName": prop("string", "Apollo x16", readonly=True)}, "children": {
+        "inputs": {"properties": {}, "children": {str(i): channel("Input", i) for i in range(inputs)}},
+        "auxs": {"properties": {}, "children": {str(i): channel("Aux", i) for i in range(sends)}},
+    }}}}, "plugins": {"properties": {}, "children": {str(p): {"properties": {"Name": prop("string", f"Plugin {p}")}, "children": {}} for p in range(200)}}}}
+
+
+def test_search_matches_words_and_ranks_channels_first():
+    index = build(small_console())
+    assert labels(index.search("input 2")) == ["Input 2", "Input 2 Mute", "Input 2 Volume"]
+    assert index.search("in")[0].kind == "input"
+    assert labels(index.search("vol 1")) == ["Input 1 Volume"]
+    assert labels(index.search("pult")) == ["Pultec EQP-1A"]
+    assert labels(index.search("eqp")) == ["Pultec EQP-1A"]
+    assert index.search("INPUT 1 MUTE")[0].path == "/devices/0/inputs/0/Mute/value"
+    # Trigrams alone would accept "tum"; the substring check does not.
+    assert index.search("etum") == [] and index.search("") == [] and index.search("zz") == []
+
+
+def test_devices_are_named_when_there_are_several():
+    index = build(small_console(devices=2), devices=("0", "1"))
+    assert labels(index.search("x8 mute")) == ["Apollo x8 1 Input 1 Mute", "Apollo x8 1 Input 2 Mute"]
+    assert len(build(small_console(devices=2)).search("input 1")) == 3
+
+
+def test_renames_refile_only_affected_entries():
+    index = build(small_console())
+    manager = object()
+    index.connect(manager)
+    try:
+        asyncio.run(signal("Name").send_async(manager, path="/devices/0/inputs/1/Name/value", data="Bass DI"))
+    finally:
+        index.disconnect()
+    assert labels(index.search("bass")) == ["Bass DI", "Bass DI Mute", "Bass DI Volume"]
+    assert index.search("input 2") == []
+    assert index.rename("/devices/0/inputs/0", "Input 1") == 0
+
+
+def test_manager_rebuilds_the_index_when_plugins_come_and_go():
+    manager = NetworkManager(log_packets=False)
+    manager.tree = {"path": "/", "data": tree.compact(small_console())}
+    manager.loaded_devices = {"0"}
+    index = manager.get_search_index()
+    try:
+        assert manager.get_search_index() is index
+        plugin = {"properties": {"Name": prop("string", "LA-2A"), "Status": prop("string", "Authorized")}, "children": {}}
+        manager.tree, _ = tree.merge(manager.tree, "/plugins/1", tree.compact(plugin))
+        assert labels(manager.get_search_index().search("la-2a")) == ["LA-2A"]
+        data = manager.tree["data"]
+        plugins = data["children"]["plugins"]
+        manager.tree = {"path": "/", "data": {**data, "children": {**data["children"], "plugins": {**plugins, "children": {"1": plugins["children"]["1"]}}}}}
+        assert manager.get_search_index().search("pultec") == []
+    finally:
+        manager.close()
+
+
+def test_queries_on_a_large_tree_take_well_under_a_millisecond():
+    index = build(large_console())
+    assert len(index) > 5000
+    queries = ["i", "in", "inp", "input", "input 4", "input 42 mute", "aux 3", "send", "vol", "48v", "setting39", "plugin 1", "zzz"]
+    start = time.perf_counter()
+    rounds = 20
+    for _ in range(rounds):
+        for query in queries:
+            index.search(query)
+    average = (time.perf_counter() - start) / (rounds * len(queries))
+    assert average < 0.001, f"{average * 1e6:.0F} us per query"
+    assert labels(index.search("input 42 mute")) == ["Input 42 Mute"]
@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from uaaccess.dialogs.sends_matrix_dialog import SendsMatrixModel
+from uaaccess.network import NetworkManager
+
+
+def prop(value, **extra):
+    return {"value": value, **extra}
+
+
+def source(name, sends, active=True):
+    return {
+        "properties": {"Name": prop(name), "Active": prop(active)},
+        "children": {"sends": {"properties": {}, "children": {
+            str(i): {"properties": {"Name": prop(send), "Gain": prop(gain, min=-144.0, max=12.0, default=-144.0)}}
+            for i, (send, gain) in enumerate(sends)
+        }}},
+    }
+
+
+def synthetic_tree(inputs, auxs):
+    return {"path": "/", "data": {"properties": {}, "children": {"devices": {"properties": {}, "children": {"0": {
+        "properties": {"DeviceName": prop("Apollo x16")},
+        "children": {
+            "inputs": {"properties": {}, "children": {str(i): s for i, s in enumerate(inputs)}},
+            "auxs": {"properties": {}, "children": {str(i): s for i, s in enumerate(auxs)}},
+        },
+    }}}}}}
+
+
+def test_model_indexes_every_send_by_path():
+    manager = NetworkManager()
+    manager.tree = synthetic_tree(
+        [source("Kick", [("AUX 1", -10.0), ("CUE 1", 0.0)]), source("Off", [("AUX 1", 0.0)], active=False), source("Snare", [("CUE 1", -3.0)])],
+        [source("AUX 1", [("CUE 1", -6.0)])],
+    )
+    model = SendsMatrixModel(manager, 0)
+    assert model.rows == ["Kick", "Snare", "AUX 1"]
+    assert model.columns == ["AUX 1", "CUE 1"]
+    assert model.grid[1][0] is None
+    assert model.grid[1][1].path == "/devices/0/inputs/2/sends/0/Gain/value"
+    assert model.update("/devices/0/auxs/0/sends/0/Gain/value", 1.5) is model.grid[2][1]
+    assert model.grid[2][1].value == 1.5
+    assert model.update("/devices/0/inputs/1/sends/0/Gain/value", 1.0) is None
@@ -0,0 +1,170 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import json
+import time
+import tracemalloc
+
+from blinker import signal
+
+from uaaccess import tree
+from uaaccess.network import NetworkManager
+
+# Upper bound for diffing the largest synthetic tree below (about 70,000 property nodes) against a sparse change.
+MERGE_BUDGET_S = 0.25
+
+
+def make_tree():
+    def channel(name, gain):
+        return {"properties": {"Name": {"value": name}, "Gain": {"value": gain, "min": -144.0, "max": 12.0}}, "children": {}}
+    return {"path": "/", "data": {"properties": {}, "commands": {}, "children": {"devices": {"properties": {}, "children": {"0": {
+        "properties": {"DeviceName": {"value": "Apollo Twin"}},
+        "children": {"inputs": {"properties": {}, "children": {"0": channel("Vox", -6.0), "1": channel("Guitar", 0.0)}}},
+    }}}}}}
+
+
+def test_snapshot_is_unaffected_by_later_updates():
+    manager = NetworkManager()
+    manager.tree = make_tree()
+    snapshot = manager.snapshot()
+    manager.set("/devices/0/inputs/0/Gain/value", 3.0)
+    assert manager.get("/devices/0/inputs/0/Gain/value") == 3.0
+    assert snapshot.get("/devices/0/inputs/0/Gain/value") == -6.0
+    assert snapshot.data["children"]["devices"]["children"]["0"]["properties"]["DeviceName"]["value"] == "Apollo Twin"
+
+
+def test_set_copies_only_the_changed_path():
+    manager = NetworkManager()
+    manager.tree = make_tree()
+    before = manager.snapshot()
+    manager.set("/devices/0/inputs/0/Gain/value", 3.0)
+    assert manager.get("/devices/0/inputs/1") is before.get("/devices/0/inputs/1")
+    assert manager.get("/devices/0/inputs/0/Name") is before.get("/devices/0/inputs/0/Name")
+    assert manager.get("/devices/0/inputs/0/Gain") is not before.get("/devices/0/inputs/0/Gain")
+    assert manager.get("/devices/0/inputs/0/Gain/max") == 12.0
+    assert manager.get("/devices/0/DeviceName") is before.get("/devices/0/DeviceName")
+
+
+def large_tree(devices=4, channels=64, sends=24):
+    def node(properties, children=None):
+        return {"properties": {name: {"type": "float", "value": value} for name, value in properties.items()}, "children": children or {}}
+    return {"path": "/", "data": node({}, {"devices": node({}, {str(d): node({"DeviceName": f"Device {d}"}, {
+        "inputs": node({}, {str(c): node({"Name": f"Input {c}", "Gain": 0.0, "Pan": 0.0, "Mute": False}, {
+            "sends": node({}, {str(s): node({"Name": f"AUX {s}", "Gain": -144.0}) for s in range(sends)}),
+        }) for c in range(channels)}),
+    }) for d in range(devices)})})}
+
+
+def test_merge_reports_exactly_the_changed_leaves():
+    old = large_tree()
+    incoming = large_tree()["data"]
+    incoming["children"]["devices"]["children"]["2"]["children"]["inputs"]["children"]["7"]["properties"]["Gain"]["value"] = 4.5
+    incoming["children"]["devices"]["children"]["0"]["children"]["inputs"]["children"]["63"]["children"]["sends"]["children"]["3"]["properties"]["Gain"]["value"] = -3.0
+    # A non-recursive reply only has placeholders for children; those keep what the tree already holds.
+    incoming["children"]["devices"]["children"]["3"] = {}
+    root, changes = tree.merge(old, "/", incoming)
+    assert sorted(changes) == [("/devices/0/inputs/63/sends/3/Gain/value", -3.0), ("/devices/2/inputs/7/Gain/value", 4.5)]
+    assert tree.resolve(root, "/devices/2/inputs/7/Gain/value") == 4.5
+    assert tree.resolve(root, "/devices/3/inputs/0/Name/value") == "Input 0"
+    assert tree.resolve(root, "/devices/1") is tree.resolve(old, "/devices/1")
+    assert tree.resolve(root, "/devices/2/inputs/6") is tree.resolve(old, "/devices/2/inputs/6")
+    assert tree.resolve(old, "/devices/2/inputs/7/Gain/value") == 0.0
+
+
+def test_merge_applies_subtree_replies_at_their_path():
+    old = large_tree(devices=1, channels=2, sends=1)
+    incoming = large_tree(devices=1, channels=2, sends=1)["data"]["children"]["devices"]["children"]["0"]["children"]["inputs"]["children"]["1"]
+    incoming["properties"]["Mute"]["value"] = True
+    root, changes = tree.merge(old, "/devices/0/inputs/1", incoming)
+    assert changes == [("/devices/0/inputs/1/Mute/value", True)]
+    assert tree.resolve(root, "/devices/0/inputs/0") is tree.resolve(old, "/devices/0/inputs/0")
+    unchanged, changes = tree.merge(root, "/devices/0/inputs/1", incoming)
+    assert unchanged is root and changes == []
+
+
+def test_structural_reply_fires_signals_for_changed_values():
+    manager = NetworkManager()
+    manager.tree = large_tree(devices=1, channels=2, sends=1)
+    manager.handle_events_normally.set()
+    reply = large_tree(devices=1, channels=2, sends=1)
+    reply["data"]["children"]["devices"]["children"]["0"]["children"]["inputs"]["children"]["0"]["properties"]["Pan"]["value"] = -0.5
+    received = []
+
+    async def on_pan(sender, **kwargs):
+        received.append((kwargs["path"], kwargs["data"]))
+    signal("Pan").connect(on_pan)
+    try:
+        asyncio.run(manager.process_message(json.dumps(reply).encode()))
+    finally:
+        signal("Pan").disconnect(on_pan)
+    assert received == [("/devices/0/inputs/0/Pan/value", -0.5)]
+    assert manager.get("/devices/0/inputs/0/Pan/value") == -0.5
+
+
+def test_merge_of_a_large_tree_with_sparse_changes_is_fast():
+    old = large_tree(devices=8, channels=64, sends=32)
+    incoming = large_tree(devices=8, channels=64, sends=32)["data"]
+    for device in ("0", "3", "6"):
+        incoming["children"]["devices"]["children"][device]["children"]["inputs"]["children"]["5"]["properties"]["Gain"]["value"] = 1.0
+    started = time.perf_counter()
+    root, changes = tree.merge(old, "/", incoming)
+    elapsed = time.perf_counter() - started
+    assert len(changes) == 3
+    assert elapsed < MERGE_BUDGET_S, f"Diffing took {elapsed * 1000:.1f} ms"
+
+
+def plugin_library_tree(plugins=300, parameters=30, presets=20, channels=32, sends=24):
+    """A synthetic console with a full plugin library, built through json.loads like a real reply."""
+    def prop(type, value, **extra):
+        return {"type": type, "readonly": False, **extra, "value": value}
+
+    def gain(value):
+        return prop("float", value, min=-144.0, max=12.0, default=-144.0, units="dB")
+    library = {str(p): {"properties": {
+        "Name": prop("string", f"Plugin {p}"),
+        "Status": prop("string", "Authorized", readonly=True),
+        "Unison": prop("bool", p % 5 == 0, default=False, readonly=True),
+        "Categories": prop("string", "EQ,Channel Strip"),
+        "Preset": prop("string", "Default", values=[{"type": "file", "value": f"Preset {i}"} for i in range(presets)]),
+    }, "children": {"parameters": {"properties": {}, "children": {str(i): {"properties": {
+        "Name": prop("string", f"Parameter {i}", readonly=True),
+        "Value": prop("float", (i % 10) / 10, min=0.0, max=1.0, default=0.5),
+    }, "children": {}} for i in range(parameters)}}}} for p in range(plugins)}
+    devices = {str(d): {"properties": {"DeviceName": prop("string", f"Apollo {d}", readonly=True)}, "children": {"inputs": {"properties": {}, "children": {
+        str(c): {"properties": {"Name": prop("string", f"Input {c}"), "Gain": gain(0.0), "Mute": prop("bool", False, default=False)}, "children": {
+            "sends": {"properties": {}, "children": {str(s): {"properties": {"Name": prop("string", f"AUX {s}", readonly=True), "Gain": gain(-144.0)}, "children": {}} for s in range(sends)}},
+        }} for c in range(channels)}}}} for d in range(2)}
+    return json.dumps({"path": "/", "data": {"properties": {}, "children": {"plugins": {"properties": {}, "children": library}, "devices": {"properties": {}, "children": devices}}}})
+
+
+def measure(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_compact_tree_uses_less_memory_and_reads_the_same():
+    message = plugin_library_tree()
+    plain, plain_bytes = measure(lambda: json.loads(message))
+    tree.schemas.clear()
+    compacted, compact_bytes = measure(lambda: {"path": "/", "data": tree.compact(json.loads(message)["data"])})
+    assert compact_bytes < plain_bytes * 0.6, f"{compact_bytes} bytes compact vs {plain_bytes} bytes plain"
+    for path in ("/plugins/7/Status/value", "/plugins/7/Preset/values", "/plugins/12/parameters/3/Value", "/devices/1/inputs/4/sends/9/Gain"):
+        assert tree.resolve(compacted, path) == tree.resolve(plain, path)
+    assert json.loads(json.dumps(compacted, default=tree.to_json)) == plain
+    gain = tree.resolve(compacted, "/devices/1/inputs/4/sends/9/Gain")
+    assert gain.schema is tree.resolve(compacted, "/devices/0/inputs/0/sends/0/Gain").schema
+    assert "value" in gain and gain.get("units") == "dB" and len(gain) == 7
+
+
+def test_set_on_a_compact_tree_keeps_the_schema():
+    manager = NetworkManager()
+    manager.tree = {"path": "/", "data": tree.compact(json.loads(plugin_library_tree(plugins=2, channels=2, sends=2))["data"])}
+    before = manager.get("/devices/0/inputs/1/Gain")
+    manager.set("/devices/0/inputs/1/Gain/value", -3.0)
+    after = manager.get("/devices/0/inputs/1/Gain")
+    assert after["value"] == -3.0 and before["value"] == 0.0
+    assert after.schema is before.schema
@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import hashlib
+import json
+import os
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from uaaccess.updates import ChecksumError, ReleaseChecker, download
+
+RELEASE = {
+    "tag_name": "v0.0.4",
+    "assets": [{"name": "UAAccess-0.0.4.msi", "browser_download_url": "http://example/UAAccess-0.0.4.msi", "size": 10, "digest": "sha256:00"}],
+}
+
+
+class ReleaseStub:
+    def __init__(self):
+        self.requests = []
+
+    async def latest(self, request):
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == '"v4"':
+            return web.Response(status=304)
+        return web.json_response(RELEASE, headers={"ETag": '"v4"'})
+
+    async def check(self, tmp_path, ttl, times=1):
+        app = web.Application()
+        app.router.add_get("/latest", self.latest)
+        async with TestServer(app) as server:
+            checker = ReleaseChecker(tmp_path / "latest_release.json", url=str(server.make_url("/latest")), ttl=ttl)
+            return [await checker.latest_release() for _ in range(times)]
+
+
+def test_fresh_cache_skips_network(tmp_path):
+    stub = ReleaseStub()
+    first, second = asyncio.run(stub.check(tmp_path, ttl=60, times=2))
+    assert first.tag_name == second.tag_name == "v0.0.4"
+    assert first.assets[0].digest == "sha256:00"
+    assert len(stub.requests) == 1
+
+
+def test_stale_cache_revalidates_with_etag(tmp_path):
+    stub = ReleaseStub()
+    first, second = asyncio.run(stub.check(tmp_path, ttl=0, times=2))
+    assert len(stub.requests) == 2
+    assert stub.requests[1].headers["If-None-Match"] == '"v4"'
+    assert second == first
+    assert json.loads((tmp_path / "latest_release.json").read_text())["etag"] == '"v4"'
+
+
+def test_unreachable_server_falls_back_to_cache(tmp_path):
+    stub = ReleaseStub()
+    asyncio.run(stub.check(tmp_path, ttl=0))
+    checker = ReleaseChecker(tmp_path / "latest_release.json", url="http://127.0.0.1:9/latest", ttl=0, timeout=1.0)
+    assert asyncio.run(checker.latest_release()).tag_name == "v0.0.4"
+    assert asyncio.run(ReleaseChecker(tmp_path / "missing.json", url="http://127.0.0.1:9/latest", timeout=1.0).latest_release()) is None
+
+
+class DownloadStub:
+    """Serves a payload with Range support, dropping the connection after `cut_after` bytes for the first `disconnects` requests."""
+
+    def __init__(self, payload, disconnects=0, cut_after=0):
+        self.payload = payload
+        self.disconnects = disconnects
+        self.cut_after = cut_after
+        self.ranges = []
+
+    async def serve(self, request):
+        start = 0
+        if "Range" in request.headers:
+            start = int(request.headers["Range"].removeprefix("bytes=").rstrip("-"))
+            if start >= len(self.payload):
+                return web.Response(status=416)
+        self.ranges.append(start)
+        body = self.payload[start:]
+        resp = web.StreamResponse(status=206 if start else 200, headers={"Content-Length": str(len(body))})
+        await resp.prepare(request)
+        if self.disconnects > 0:
+            self.disconnects -= 1
+            await resp.write(body[:self.cut_after])
+            await asyncio.sleep(0.05)
+            request.transport.close()
+            return resp
+        await resp.write(body)
+        return resp
+
+    async def download(self, destination, sha256):
+        app = web.Application()
+        app.router.add_get("/installer.msi", self.serve)
+        async with TestServer(app) as server:
+            return await download(str(server.make_url("/installer.msi")), destination, sha256, retries=3)
+
+
+def test_download_resumes_after_disconnects(tmp_path, monkeypatch):
+    monkeypatch.setattr(asyncio, "sleep", fast_sleep)
+    payload = os.urandom(3 * 1024 * 1024)
+    stub = DownloadStub(payload, disconnects=2, cut_after=1024 * 1024)
+    destination = asyncio.run(stub.download(tmp_path / "installer.msi", hashlib.sha256(payload).hexdigest()))
+    assert destination.read_bytes() == payload
+    assert stub.ranges[0] == 0 and stub.ranges[1] > 0 and stub.ranges[2] > stub.ranges[1]
+    assert not (tmp_path / "installer.msi.part").exists()
+
+
+def test_download_resumes_existing_part_file(tmp_path):
+    payload = os.urandom(256 * 1024)
+    (tmp_path / "installer.msi.part").write_bytes(payload[:100_000])
+    stub = DownloadStub(payload)
+    destination = asyncio.run(stub.download(tmp_path / "installer.msi", hashlib.sha256(payload).hexdigest()))
+    assert destination.read_bytes() == payload
+    assert stub.ranges == [100_000]
+
+
+def test_download_rejects_checksum_mismatch(tmp_path):
+    stub = DownloadStub(os.urandom(1024))
+    with pytest.raises(ChecksumError):
+        asyncio.run(stub.download(tmp_path / "installer.msi", "0" * 64))
+    assert not (tmp_path / "installer.msi").exists()
+    assert not (tmp_path / "installer.msi.part").exists()
+
+
+real_sleep = asyncio.sleep
+
+
+async def fast_sleep(delay, *args, **kwargs):
+    # Skips the retry backoff without starving the stub server.
+    await real_sleep(min(delay, 0.05), *args, **kwargs)
@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import time
+
+from uaaccess import metrics
+from uaaccess.watchdog import LoopWatchdog
+
+
+def build_input_widgets():
+    # Stands in for a UI builder that blocks the loop.
+    time.sleep(0.3)
+
+
+async def watch_a_stall():
+    watchdog = LoopWatchdog(interval=0.02, threshold=0.1)
+    watchdog.start(asyncio.get_running_loop())
+    await asyncio.sleep(0.05)
+    build_input_widgets()
+    await asyncio.sleep(0.1)
+    watchdog.stop()
+    return watchdog
+
+
+def test_stall_is_attributed_to_blocking_function():
+    watchdog = asyncio.run(watch_a_stall())
+    worst = watchdog.worst_offenders()[0]
+    assert worst.name == "build_input_widgets"
+    assert worst.worst >= 0.2
+    assert watchdog.stalls == 1
+    assert metrics.values["Event loop max lag (s)"] >= 0.2